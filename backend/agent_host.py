@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Agent Host - The one process that runs the Fetch.ai agents
+For multi-worker deployments (see serve.py): the Bureau and its agent ports
+live here, and the stateless API workers reach this process over a Unix
+socket or localhost (AGENT_HOST_URL) for agent status and addresses.
+
+Usage (from backend/):
+    AGENT_HOST_URL=unix:///tmp/clientsight-agent-host.sock python agent_host.py
+"""
+
+import os
+import asyncio
+from datetime import datetime
+from fastapi import FastAPI
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from agents.bureau import start_agents, agent_addresses
+from services.agent_readiness import agent_readiness
+from services.agent_host_client import AGENT_HOST_URL, DEFAULT_AGENT_HOST_URL, parse_host_url
+
+host_app = FastAPI(title="ClientSight Agent Host")
+
+@host_app.on_event("startup")
+async def startup_event():
+    """Start the Bureau without blocking: /status reports not ready until the agents are up"""
+    print(f"[AGENT-HOST] Starting agents (pid {os.getpid()})")
+    host_app.state.agents_task = asyncio.create_task(start_agents())
+
+@host_app.get("/healthz")
+async def healthz():
+    """Liveness: the host process is up"""
+    return {"status": "ok", "timestamp": datetime.now().isoformat()}
+
+@host_app.get("/status")
+async def status():
+    """Agent readiness and addresses, polled by the API workers"""
+    return {
+        **agent_readiness.get_stats(),
+        "addresses": agent_addresses(),
+        "pid": os.getpid(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+def run_agent_host(url: str = AGENT_HOST_URL or DEFAULT_AGENT_HOST_URL):
+    """Serve the agent host on a Unix socket or a localhost port"""
+    import uvicorn
+
+    target = parse_host_url(url)
+    if "uds" in target and os.path.exists(target["uds"]):
+        # Stale socket from a previous run
+        os.remove(target["uds"])
+    print(f"[AGENT-HOST] Serving agent status on {url}")
+    uvicorn.run(host_app, log_level="warning", **target)
+
+if __name__ == "__main__":
+    run_agent_host()
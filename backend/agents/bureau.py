@@ -0,0 +1,84 @@
+"""
+Agent Bureau - Runs the Fetch.ai agents on a background thread
+Used by main.py in single-process agent mode and by agent_host.py, the one
+process that owns the agents when the API runs with several workers. The
+agents' message handlers are also registered with the agent dispatcher,
+so requests from this process reach them without a uagents round trip.
+"""
+
+import os
+import threading
+import traceback
+from typing import Dict
+import uagents.asgi
+from uagents import Bureau
+
+from agents.component_generator_agent import component_generator, ComponentGenerationRequest, handle_generation_request
+from agents.gaze_optimizer_agent import gaze_optimizer, GazeOptimizationRequest, handle_optimization_request
+from services.agent_readiness import agent_readiness, AGENT_STARTUP_TIMEOUT
+from services.agent_dispatcher import agent_dispatcher
+from services.agent_host_client import AGENT_BUREAU_HOST, agent_bureau_port
+
+AGENTS = (component_generator, gaze_optimizer)
+
+def report_ready(agent):
+    """Extra startup handler: the agent has started inside the Bureau (runs on the Bureau thread)"""
+    async def mark_ready(ctx):
+        agent_readiness.mark_ready(agent.name)
+    agent.on_event("startup")(mark_ready)
+
+# Port of the Bureau's own HTTP server (uagents defaults to 8000, the API's PORT)
+AGENT_BUREAU_PORT = agent_bureau_port(int(os.getenv("PORT", "8000")))
+
+# uagents binds its server to 0.0.0.0; only local API workers query the Bureau
+uagents.asgi.HOST = AGENT_BUREAU_HOST
+
+# Create Bureau to manage agents (binds the agents' ports once started)
+bureau = Bureau(port=AGENT_BUREAU_PORT)
+for agent in AGENTS:
+    bureau.add(agent)
+    report_ready(agent)
+
+# Co-located agents: the dispatcher calls these handlers in-process
+agent_dispatcher.register(component_generator.name, ComponentGenerationRequest, handle_generation_request)
+agent_dispatcher.register(gaze_optimizer.name, GazeOptimizationRequest, handle_optimization_request)
+
+def agent_addresses() -> Dict[str, str]:
+    """Agent name -> address"""
+    return {agent.name: agent.address for agent in AGENTS}
+
+async def start_agents() -> Dict[str, str]:
+    """Run the Bureau on a background thread and wait for the agents to report ready"""
+    print("📡 Connecting to Fetch.ai agents...")
+
+    # Start Bureau in background (this starts the agents)
+    try:
+        # Run Bureau in a background thread (it's a blocking call)
+        def run_bureau():
+            try:
+                bureau.run()
+                agent_readiness.mark_failed("Bureau stopped")
+            except Exception as e:
+                print(f"[WARN] Bureau runtime error: {e}")
+                agent_readiness.mark_failed(str(e))
+
+        agent_readiness.expect([agent.name for agent in AGENTS])
+        bureau_thread = threading.Thread(target=run_bureau, daemon=True)
+        bureau_thread.start()
+
+        # Wait for the agents' startup handlers rather than a fixed delay
+        ready = await agent_readiness.wait(AGENT_STARTUP_TIMEOUT)
+
+        print(f"[OK] Component Generator: {component_generator.address}")
+        print(f"[OK] Gaze Optimizer: {gaze_optimizer.address}")
+        if ready:
+            print(f"[SUCCESS] All agents ready in {agent_readiness.waited:.2f}s!")
+        else:
+            reason = agent_readiness.error or f"timed out after {AGENT_STARTUP_TIMEOUT:.0f}s"
+            print(f"[WARN] Agents not ready ({reason}): {', '.join(agent_readiness.missing()) or 'none'} missing - /readyz reports 503")
+        print("💡 Note: Agents communicate via Bureau internally")
+    except Exception as e:
+        print(f"[WARN] Agent startup issue (will continue): {e}")
+        traceback.print_exc()
+    # Addresses are known either way (they might still work)
+    return agent_addresses()
@@ -10,9 +10,11 @@ from uagents import Agent, Context, Model
 from typing import Optional, List, Dict
 import os
 import json
-from openai import AsyncOpenAI
 from dotenv import load_dotenv
 
+from services.openai_fallback import openai_client
+from utils.component_utils import extract_code_block, extract_dependencies, detect_component_type, generate_mock_component
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -36,15 +38,6 @@ class ComponentGenerationResponse(Model):
     gaze_optimizations: Optional[List[str]] = None
     error: Optional[str] = None
 
-# Initialize OpenAI client (optional - will use mocks if not available)
-openai_api_key = os.getenv("OPENAI_API_KEY")
-if openai_api_key:
-    print("[OK] OpenAI API key found and loaded")
-    openai_client = AsyncOpenAI(api_key=openai_api_key)
-else:
-    print("[WARN] No OpenAI API key found - will use mock generation")
-    openai_client = None
-
 # Create Component Generator Agent
 # For cloud deployment: agents communicate via Bureau internally, no separate HTTP endpoints needed
 # In Railway, we only expose the FastAPI server on PORT, agents communicate via Bureau
@@ -63,7 +56,8 @@ async def introduce(ctx: Context):
     ctx.logger.info(f"📍 Address: {component_generator.address}")
     ctx.logger.info(f"🔌 Running via Bureau (internal communication)")
 
-@component_generator.on_message(model=ComponentGenerationRequest)
+# allow_unverified: uagents.query sends from an unsigned user address
+@component_generator.on_message(model=ComponentGenerationRequest, allow_unverified=True)
 async def handle_generation_request(ctx: Context, sender: str, msg: ComponentGenerationRequest):
     """
     Handle component generation requests
@@ -203,24 +197,6 @@ OPTIMIZE the component layout to:
     
     return base_prompt
 
-def extract_code_block(text: str) -> str:
-    """Extract code from markdown code blocks"""
-    import re
-    match = re.search(r'```(?:tsx?|jsx?)?\n(.*?)```', text, re.DOTALL)
-    return match.group(1).strip() if match else text.strip()
-
-def extract_dependencies(code: str) -> List[str]:
-    """Extract npm dependencies from import statements"""
-    import re
-    imports = re.findall(r'import .* from [\'"]([^\'"]+)[\'"]', code)
-    return [imp for imp in imports if not imp.startswith('.') and not imp.startswith('@/')]
-
-def detect_component_type(code: str) -> str:
-    """Detect component name from code"""
-    import re
-    match = re.search(r'(?:export\s+)?(?:function|const)\s+(\w+)', code)
-    return match.group(1) if match else 'Component'
-
 def build_gaze_optimizations(gaze_context: Dict) -> List[str]:
     """Generate optimization suggestions based on gaze data"""
     optimizations = []
@@ -239,215 +215,6 @@ def build_gaze_optimizations(gaze_context: Dict) -> List[str]:
     
     return optimizations
 
-def generate_mock_component(prompt: str) -> str:
-    """Generate mock component when OpenAI API is not available"""
-    prompt_lower = prompt.lower()
-    
-    # Full landing page / web app
-    if any(word in prompt_lower for word in ['landing page', 'website', 'web app', 'homepage', 'full page']):
-        return '''export function LandingPage() {
-  return (
-    <div className="min-h-screen">
-      {/* Navigation */}
-      <nav className="bg-white shadow-sm">
-        <div className="max-w-7xl mx-auto px-4 py-4 flex justify-between items-center">
-          <div className="text-2xl font-bold text-blue-600">YourBrand</div>
-          <div className="flex gap-6">
-            <a href="#features" className="text-gray-600 hover:text-blue-600">Features</a>
-            <a href="#pricing" className="text-gray-600 hover:text-blue-600">Pricing</a>
-            <a href="#contact" className="text-gray-600 hover:text-blue-600">Contact</a>
-          </div>
-          <button className="bg-blue-600 hover:bg-blue-700 text-white px-6 py-2 rounded-lg">
-            Get Started
-          </button>
-        </div>
-      </nav>
-
-      {/* Hero Section */}
-      <section className="bg-gradient-to-br from-blue-50 to-purple-50 py-20">
-        <div className="max-w-7xl mx-auto px-4 text-center">
-          <h1 className="text-6xl font-bold text-gray-900 mb-6">
-            Build Amazing Products
-          </h1>
-          <p className="text-xl text-gray-600 mb-8 max-w-2xl mx-auto">
-            The platform that helps you create, ship, and scale your ideas faster than ever before.
-          </p>
-          <div className="flex gap-4 justify-center">
-            <button className="bg-blue-600 hover:bg-blue-700 text-white px-8 py-4 rounded-lg text-lg font-semibold">
-              Start Free Trial
-            </button>
-            <button className="bg-white hover:bg-gray-50 text-gray-800 px-8 py-4 rounded-lg text-lg font-semibold border-2 border-gray-300">
-              Watch Demo
-            </button>
-          </div>
-        </div>
-      </section>
-
-      {/* Features Section */}
-      <section id="features" className="py-20">
-        <div className="max-w-7xl mx-auto px-4">
-          <h2 className="text-4xl font-bold text-center mb-12">Powerful Features</h2>
-          <div className="grid md:grid-cols-3 gap-8">
-            <div className="p-6 bg-white rounded-lg shadow-md">
-              <div className="text-4xl mb-4">⚡</div>
-              <h3 className="text-xl font-bold mb-2">Lightning Fast</h3>
-              <p className="text-gray-600">Built for speed with cutting-edge technology</p>
-            </div>
-            <div className="p-6 bg-white rounded-lg shadow-md">
-              <div className="text-4xl mb-4">🔒</div>
-              <h3 className="text-xl font-bold mb-2">Secure</h3>
-              <p className="text-gray-600">Enterprise-grade security built in</p>
-            </div>
-            <div className="p-6 bg-white rounded-lg shadow-md">
-              <div className="text-4xl mb-4">📈</div>
-              <h3 className="text-xl font-bold mb-2">Scalable</h3>
-              <p className="text-gray-600">Grows with your business needs</p>
-            </div>
-          </div>
-        </div>
-      </section>
-
-      {/* CTA Section */}
-      <section className="bg-blue-600 py-20">
-        <div className="max-w-4xl mx-auto px-4 text-center text-white">
-          <h2 className="text-4xl font-bold mb-4">Ready to Get Started?</h2>
-          <p className="text-xl mb-8 opacity-90">Join thousands of teams building better products</p>
-          <button className="bg-white hover:bg-gray-100 text-blue-600 px-8 py-4 rounded-lg text-lg font-semibold">
-            Start Your Free Trial
-          </button>
-        </div>
-      </section>
-
-      {/* Footer */}
-      <footer className="bg-gray-900 text-white py-12">
-        <div className="max-w-7xl mx-auto px-4 text-center">
-          <p className="text-gray-400">© 2024 YourBrand. All rights reserved.</p>
-        </div>
-      </footer>
-    </div>
-  )
-}'''
-    
-    # Button
-    if 'button' in prompt_lower:
-        return '''export function Button() {
-  return (
-    <button className="bg-blue-600 hover:bg-blue-700 text-white font-bold py-3 px-6 rounded-lg transition-colors">
-      Click Me
-    </button>
-  )
-}'''
-    
-    # Form / Login
-    if 'form' in prompt_lower or 'login' in prompt_lower:
-        return '''export function LoginForm() {
-  const [email, setEmail] = React.useState('')
-  const [password, setPassword] = React.useState('')
-
-  const handleSubmit = (e) => {
-    e.preventDefault()
-    console.log('Login:', { email, password })
-  }
-
-  return (
-    <form onSubmit={handleSubmit} className="max-w-md mx-auto p-6 bg-white rounded-lg shadow-lg">
-      <h2 className="text-2xl font-bold mb-6 text-gray-900">Login</h2>
-      
-      <div className="mb-4">
-        <label htmlFor="email" className="block text-sm font-medium text-gray-700 mb-2">
-          Email
-        </label>
-        <input
-          id="email"
-          type="email"
-          value={email}
-          onChange={(e) => setEmail(e.target.value)}
-          className="w-full px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent"
-          required
-        />
-      </div>
-
-      <div className="mb-6">
-        <label htmlFor="password" className="block text-sm font-medium text-gray-700 mb-2">
-          Password
-        </label>
-        <input
-          id="password"
-          type="password"
-          value={password}
-          onChange={(e) => setPassword(e.target.value)}
-          className="w-full px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent"
-          required
-        />
-      </div>
-
-      <button
-        type="submit"
-        className="w-full bg-blue-600 hover:bg-blue-700 text-white font-semibold py-3 rounded-lg transition-colors"
-      >
-        Sign In
-      </button>
-    </form>
-  )
-}'''
-    
-    # Card
-    if 'card' in prompt_lower:
-        return '''export function Card() {
-  return (
-    <div className="bg-white rounded-lg shadow-md overflow-hidden hover:shadow-lg transition-shadow max-w-sm">
-      <img
-        src="https://via.placeholder.com/400x200"
-        alt="Card image"
-        className="w-full h-48 object-cover"
-      />
-      <div className="p-6">
-        <h3 className="text-xl font-bold mb-2 text-gray-900">Card Title</h3>
-        <p className="text-gray-600 mb-4">This is a card component with an image, title, and description.</p>
-        <button className="bg-blue-600 hover:bg-blue-700 text-white px-4 py-2 rounded-lg transition-colors">
-          Learn More
-        </button>
-      </div>
-    </div>
-  )
-}'''
-    
-    # Hero
-    if 'hero' in prompt_lower:
-        return '''export function Hero() {
-  return (
-    <div className="bg-gradient-to-r from-blue-600 to-purple-600 text-white py-20 px-4">
-      <div className="max-w-4xl mx-auto text-center">
-        <h1 className="text-5xl font-bold mb-6">
-          Build Better UIs with Eye-Tracking AI
-        </h1>
-        <p className="text-xl mb-8 opacity-90">
-          Understand where users actually look, not just where they click
-        </p>
-        <div className="flex gap-4 justify-center">
-          <button className="bg-white text-blue-600 px-8 py-3 rounded-lg font-semibold hover:bg-gray-100 transition-colors">
-            Get Started
-          </button>
-          <button className="border-2 border-white px-8 py-3 rounded-lg font-semibold hover:bg-white hover:text-blue-600 transition-colors">
-            Learn More
-          </button>
-        </div>
-      </div>
-    </div>
-  )
-}'''
-    
-    # Default
-    return f'''export function Component() {{
-  return (
-    <div className="p-6 bg-white rounded-lg shadow-md">
-      <h2 className="text-2xl font-bold mb-4 text-gray-900">Generated Component</h2>
-      <p className="text-gray-600">Mock component for: {prompt}</p>
-      <p className="text-sm text-gray-500 mt-4">Add OpenAI API key for custom generation</p>
-    </div>
-  )
-}}'''
-
 if __name__ == "__main__":
     component_generator.run()
 
@@ -61,7 +61,8 @@ async def introduce(ctx: Context):
     ctx.logger.info(f"📍 Address: {gaze_optimizer.address}")
     ctx.logger.info(f"🔌 Running via Bureau (internal communication)")
 
-@gaze_optimizer.on_message(model=GazeOptimizationRequest)
+# allow_unverified: uagents.query sends from an unsigned user address
+@gaze_optimizer.on_message(model=GazeOptimizationRequest, allow_unverified=True)
 async def handle_optimization_request(ctx: Context, sender: str, msg: GazeOptimizationRequest):
     """
     Handle gaze optimization requests
@@ -0,0 +1,144 @@
+"""
+Benchmark - Per-message overhead of in-process dispatch vs uagents query
+Starts the agents' Bureau in this process and sends the same gaze
+optimization request to the gaze optimizer through each path:
+
+- direct: the message handler called by hand (no dispatcher, the floor)
+- local: agent_dispatcher in-process fast path (no serialisation)
+- serialise: request and reply JSON round trip only, no transport (the
+  least any wire path adds)
+- query: uagents.query to the Bureau's submit endpoint on localhost
+  (signing, HTTP, envelope decoding; no Almanac lookup)
+
+Reports median/p95/mean latency per message and the overhead of each path
+over direct. Needs uagents installed. In agent mode the agents only start
+after uagents has reported to the Almanac/Agentverse; offline that takes
+a while, so the query path waits at most --startup-timeout seconds.
+
+Usage (from backend/):
+    python -m benchmarks.bench_agent_dispatch --messages 200 --points 200
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import statistics
+import importlib.util
+
+BUREAU_PORT = int(os.getenv("AGENT_BUREAU_PORT", "8790"))
+
+
+def make_message(points: int):
+    from agents.gaze_optimizer_agent import GazePoint, GazeOptimizationRequest
+    rng = random.Random(7)
+    return GazeOptimizationRequest(
+        request_id="bench",
+        component_id="hero",
+        current_code="export function Hero() { return <section /> }",
+        gaze_data=[
+            GazePoint(x=rng.uniform(0, 1920), y=rng.uniform(0, 1080), timestamp=i * 16, confidence=rng.uniform(0.5, 1))
+            for i in range(points)
+        ]
+    )
+
+
+async def measure(send, messages: int) -> dict:
+    await send()  # warm-up (imports, first connection)
+    samples = []
+    for _ in range(messages):
+        started = time.perf_counter()
+        await send()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "median_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 3),
+        "mean_ms": round(statistics.mean(samples), 3),
+        "messages": messages
+    }
+
+
+async def run(bureau, messages: int, points: int, startup_timeout: float) -> dict:
+    from agents.gaze_optimizer_agent import GazeOptimizationResponse, handle_optimization_request
+    from services.agent_dispatcher import AgentDispatcher, LocalContext, agent_dispatcher, DISPATCHER_SENDER
+    from services.agent_readiness import agent_readiness
+
+    message = make_message(points)
+    address = bureau.agent_addresses()["gaze_optimizer"]
+
+    async def direct():
+        await handle_optimization_request(LocalContext("gaze_optimizer"), DISPATCHER_SENDER, message)
+
+    async def local():
+        await agent_dispatcher.dispatch(address, message, GazeOptimizationResponse)
+
+    reply = await agent_dispatcher.dispatch(address, message, GazeOptimizationResponse)
+
+    async def serialise():
+        type(message).parse_raw(message.json())
+        GazeOptimizationResponse.parse_raw(reply.json())
+
+    results = {
+        "gaze_points": points,
+        "request_bytes": len(message.json()),
+        "reply_bytes": len(reply.json()),
+        "direct": await measure(direct, messages),
+        "local": await measure(local, messages),
+        "serialise": await measure(serialise, messages)
+    }
+
+    # The query path needs the Bureau's agents running
+    started = time.monotonic()
+    await bureau.start_agents()
+    while not agent_readiness.is_ready() and time.monotonic() - started < startup_timeout:
+        await asyncio.sleep(0.1)
+    if not agent_readiness.is_ready():
+        results["query"] = f"skipped (agents not ready after {startup_timeout:.0f}s)"
+    else:
+        remote = AgentDispatcher(mode="query", query_endpoint=f"http://127.0.0.1:{BUREAU_PORT}/submit")
+
+        async def query():
+            await remote.dispatch(address, message, GazeOptimizationResponse)
+
+        results["query"] = await measure(query, messages)
+
+    direct_ms = results["direct"]["median_ms"]
+    results["overhead_over_direct_ms"] = {
+        path: round(results[path]["median_ms"] - direct_ms, 3)
+        for path in ("local", "serialise", "query") if isinstance(results[path], dict)
+    }
+    if isinstance(results["query"], dict) and results["local"]["median_ms"]:
+        results["query_vs_local"] = round(results["query"]["median_ms"] / results["local"]["median_ms"], 1)
+    return results
+
+
+def main(messages: int, points: int, startup_timeout: float):
+    if importlib.util.find_spec("uagents") is None:
+        print(json.dumps({"skipped": "uagents not installed"}, indent=2))
+        return
+    os.environ["AGENT_BUREAU_PORT"] = str(BUREAU_PORT)
+    os.environ["AGENT_STARTUP_TIMEOUT"] = "0"  # the benchmark does its own (longer) wait
+    # Create the Bureau outside the benchmark's event loop (it runs on its own thread, as in main.py)
+    from agents import bureau
+    results = asyncio.run(run(bureau, messages, points, startup_timeout))
+    print(json.dumps(results, indent=2))
+    sys.stdout.flush()
+    # The Bureau thread does not stop on its own
+    os._exit(0)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200, help="messages timed per path")
+    parser.add_argument("--points", type=int, default=200, help="gaze points per request")
+    parser.add_argument("--startup-timeout", type=float, default=60, help="seconds to wait for the agents (query path)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    main(args.messages, args.points, args.startup_timeout)
@@ -0,0 +1,106 @@
+"""
+Micro-benchmark - Code extraction on large, prose-heavy LLM responses
+Compares the previous per-attempt extraction (uncompiled patterns, line
+split, per-line prose regex) with utils.code_extractor, both on the
+complete text and incrementally over streamed deltas.
+
+Usage (from backend/):
+    python -m benchmarks.bench_code_extraction --number 200
+"""
+
+import os
+import re
+import sys
+import json
+import timeit
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.code_extractor import extract_code, StreamingCodeExtractor
+
+PROSE = (
+    "Here is a detailed explanation of the component and how it fits into the page layout. "
+    "This section uses Tailwind utility classes for spacing, colour and responsive behaviour."
+)
+
+CODE = """export function HeroSection() {
+  const [open, setOpen] = useState(false)
+  return (
+    <section className="py-24 px-6 bg-gradient-to-br from-blue-600 to-indigo-700 text-white">
+      <h1 className="text-5xl font-bold">Ship faster with confidence</h1>
+      <p className="mt-6 text-lg">Plan, track and release work in one place.</p>
+      <button onClick={() => setOpen(!open)} className="mt-8 px-6 py-3 bg-white text-blue-700 rounded-lg">Get Started</button>
+    </section>
+  )
+}"""
+
+
+def legacy_extract(raw_response: str) -> str:
+    """Extraction as it ran inline in every attempt before utils.code_extractor"""
+    temp_code = raw_response
+    code_block_match = re.search(r'```(?:tsx?|jsx?|typescript|javascript)?\n(.*?)```', raw_response, re.DOTALL)
+    if code_block_match:
+        return code_block_match.group(1).strip()
+    lines = raw_response.split('\n')
+    code_start_idx = None
+    for i, line in enumerate(lines):
+        if re.match(r'^\s*(export\s+)?(function|const)\s+\w+', line):
+            code_start_idx = i
+            break
+    if code_start_idx is not None:
+        return '\n'.join(lines[code_start_idx:]).strip()
+    code_lines = []
+    for line in lines:
+        if not re.match(r'^(Apologies|Here|This|Note:|Please|You|We|I|The|As|For|In|On|At|To|From|With|Without|Using|When|Where|Why|How|What|Which|That|This|These|Those)', line, re.IGNORECASE):
+            code_lines.append(line)
+    temp_code = '\n'.join(code_lines).strip()
+    return temp_code
+
+
+def build_cases(prose_lines: int):
+    prose = "\n".join(f"{PROSE} ({i})" for i in range(prose_lines))
+    return {
+        "prose_then_fence": f"{prose}\n```tsx\n{CODE}\n```\n{prose}",
+        "prose_then_declaration": f"{prose}\n{CODE}",
+        "prose_only": f"{prose}\n<div className=\"p-4\">Fallback markup</div>\n{prose}",
+    }
+
+
+def stream_extract(text: str, chunk: int) -> str:
+    extractor = StreamingCodeExtractor()
+    for i in range(0, len(text), chunk):
+        extractor.feed(text[i:i + chunk])
+    return extractor.result()
+
+
+def run(prose_lines: int, number: int, chunk: int):
+    results = {}
+    for name, text in build_cases(prose_lines).items():
+        # The unclosed-fence edge case differs by design; these cases must agree
+        assert legacy_extract(text) == extract_code(text) == stream_extract(text, chunk), name
+
+        legacy = timeit.timeit(lambda: legacy_extract(text), number=number) / number
+        compiled = timeit.timeit(lambda: extract_code(text), number=number) / number
+        streamed = timeit.timeit(lambda: stream_extract(text, chunk), number=number) / number
+        results[name] = {
+            "chars": len(text),
+            "legacy_us": round(legacy * 1e6, 1),
+            "extract_code_us": round(compiled * 1e6, 1),
+            "streaming_us": round(streamed * 1e6, 1),
+            "speedup": round(legacy / compiled, 1) if compiled else None
+        }
+    print(json.dumps(results, indent=2))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prose-lines", type=int, default=400, help="prose lines around the code")
+    parser.add_argument("--number", type=int, default=200, help="timeit iterations per case")
+    parser.add_argument("--chunk", type=int, default=16, help="characters per streamed delta")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    run(args.prose_lines, args.number, args.chunk)
@@ -0,0 +1,108 @@
+"""
+Benchmark - Cold start with and without the Fetch.ai agents
+Boots the API in fresh interpreters with AGENTS_ENABLED=true and false
+and reports, per mode (median of --runs):
+
+- import_s: `import main` (uagents, the agents and the Bureau in agent mode)
+- startup_s: the FastAPI startup handlers (agent mode waits for the agents,
+  at most AGENT_STARTUP_TIMEOUT)
+- ready_s: process spawn until startup finished, interpreter start included
+- max_rss_mb: peak resident memory at that point
+- agents_ready: runs in which the agents reported ready within the timeout
+
+Agent mode needs uagents installed; it is reported as skipped otherwise.
+
+Usage (from backend/):
+    python -m benchmarks.bench_cold_start --runs 5
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+import importlib.util
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child interpreter: time the import and startup, report, exit without waiting on threads
+CHILD = """
+import os, sys, json, time, asyncio, resource
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+asyncio.run(main.startup_event())
+ready = time.perf_counter()
+print(json.dumps({
+    "import_s": imported - started,
+    "startup_s": ready - imported,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "uagents_loaded": "uagents" in sys.modules,
+    "agents_ready": main.AGENTS_ENABLED and main.agent_readiness.is_ready()
+}), flush=True)
+os._exit(0)
+"""
+
+
+def boot_once(agents_enabled: bool) -> dict:
+    env = {
+        **os.environ,
+        "AGENTS_ENABLED": "true" if agents_enabled else "false",
+        "WARM_POOL_ENABLED": "false"
+    }
+    env.setdefault("OPENROUTER_API_KEY", "benchmark")
+    spawned = time.perf_counter()
+    child = subprocess.Popen(
+        [sys.executable, "-c", CHILD], cwd=BACKEND_DIR, env=env,
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+    )
+    # The report is the only JSON line the child prints (the app logs to stdout too)
+    result = None
+    for line in child.stdout:
+        if line.startswith("{"):
+            result = json.loads(line)
+            result["ready_s"] = time.perf_counter() - spawned
+            break
+    child.wait()
+    if result is None:
+        raise RuntimeError(f"boot failed (exit code {child.returncode})")
+    return result
+
+
+def run_mode(agents_enabled: bool, runs: int) -> dict:
+    samples = [boot_once(agents_enabled) for _ in range(runs)]
+    report = {
+        key: round(statistics.median(sample[key] for sample in samples), 3)
+        for key in ("import_s", "startup_s", "ready_s", "max_rss_mb")
+    }
+    report["uagents_loaded"] = samples[0]["uagents_loaded"]
+    report["agents_ready"] = sum(sample["agents_ready"] for sample in samples)
+    report["runs"] = runs
+    return report
+
+
+def main(runs: int):
+    results = {"fast_boot": run_mode(False, runs)}
+    if importlib.util.find_spec("uagents") is None:
+        results["agents"] = "skipped (uagents not installed)"
+    else:
+        results["agents"] = run_mode(True, runs)
+        agents, fast = results["agents"], results["fast_boot"]
+        results["fast_boot_vs_agents"] = {
+            "ready_s_saved": round(agents["ready_s"] - fast["ready_s"], 3),
+            "ready_ratio": round(fast["ready_s"] / agents["ready_s"], 2) if agents["ready_s"] else None,
+            "rss_mb_saved": round(agents["max_rss_mb"] - fast["max_rss_mb"], 1)
+        }
+    print(json.dumps(results, indent=2))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="boots per mode (median reported)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(parse_args().runs)
@@ -0,0 +1,145 @@
+"""
+Benchmark - Import time per module and time to the first request
+Boots the API in a fresh interpreter under `python -X importtime` and
+reports:
+
+- the slowest imports by cumulative and by self time (parsed from the
+  -X importtime output), and the total for `import main`
+- FastAPI startup time, and the time from the start of the import to the
+  first successful request (first_success_s)
+- the first and second /healthz and multi-section generation requests,
+  served in-process against a mock OpenRouter provider, so first-use
+  costs (lazy imports, pattern compilation, pool setup) show up as the
+  gap between the first and second request
+
+Runs in fast-boot mode (AGENTS_ENABLED=false) unless --agents is given.
+
+Usage (from backend/):
+    python -m benchmarks.bench_import_time --top 15
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child interpreter; prints one JSON line with the timings
+CHILD = """
+import os, json, time, asyncio
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+import httpx
+from services.openrouter_client import openrouter_client
+
+CODE = '''export function Section() {
+  return (
+    <section className="py-20 px-4">
+      <h2 className="text-3xl font-bold">Plan, track and ship</h2>
+      <p className="mt-4 text-gray-600">Everything your team needs in one place.</p>
+      <button className="mt-6 px-6 py-3 bg-blue-600 text-white rounded-lg">Get Started</button>
+    </section>
+  )
+}'''
+
+def handler(request):
+    return httpx.Response(200, json={
+        "choices": [{"message": {"content": CODE}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+    })
+
+async def run():
+    timings = {"import_s": imported - started}
+    begin = time.perf_counter()
+    await main.startup_event()
+    timings["startup_s"] = time.perf_counter() - begin
+    openrouter_client.available = True
+    openrouter_client._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://api") as client:
+        for label, method, path, body in (
+            ("healthz", "GET", "/healthz", None),
+            ("generate", "POST", "/api/generate-multi-section", {"prompt": "landing page for a project management SaaS", "fresh": True})
+        ):
+            for attempt in ("first", "second"):
+                begin = time.perf_counter()
+                response = await client.request(method, path, json=body)
+                response.raise_for_status()
+                timings[f"{attempt}_{label}_s"] = time.perf_counter() - begin
+                if "first_success_s" not in timings:
+                    timings["first_success_s"] = time.perf_counter() - started
+    print(json.dumps(timings), flush=True)
+
+asyncio.run(run())
+os._exit(0)
+"""
+
+# "import time: self [us] | cumulative | imported package"
+_IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def parse_importtime(stderr: str):
+    """(module, self_ms, cumulative_ms, depth) for every -X importtime line"""
+    rows = []
+    for line in stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us) / 1000, int(cumulative_us) / 1000, len(indent) // 2))
+    return rows
+
+
+def main(top: int, agents: bool):
+    env = {
+        **os.environ,
+        "AGENTS_ENABLED": "true" if agents else "false",
+        "WARM_POOL_ENABLED": "false",
+        "LLM_CACHE_ENABLED": "false"
+    }
+    env.setdefault("OPENROUTER_API_KEY", "benchmark")
+    child = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    report = next((json.loads(line) for line in child.stdout.splitlines() if line.startswith("{")), None)
+    if report is None:
+        raise RuntimeError(f"boot failed (exit code {child.returncode}):\n{child.stderr[-2000:]}")
+
+    rows = parse_importtime(child.stderr)
+    main_row = next((row for row in rows if row[0] == "main"), None)
+    local = ("main", "services", "utils", "prompts", "agents")
+
+    def table(rows, key):
+        return [
+            {"module": module, "self_ms": round(self_ms, 1), "cumulative_ms": round(cumulative_ms, 1)}
+            for module, self_ms, cumulative_ms, _ in sorted(rows, key=key, reverse=True)[:top]
+        ]
+
+    results = {
+        "mode": "agents" if agents else "fast_boot",
+        "import_main_ms": round(main_row[2], 1) if main_row else None,
+        "modules_imported": len(rows),
+        "slowest_cumulative": table(rows, key=lambda row: row[2]),
+        "slowest_self": table(rows, key=lambda row: row[1]),
+        "slowest_project_modules": table(
+            [row for row in rows if row[0].split(".")[0] in local], key=lambda row: row[2]
+        ),
+        "timings": {key: round(value, 4) for key, value in report.items()}
+    }
+    print(json.dumps(results, indent=2))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=15, help="modules listed per table")
+    parser.add_argument("--agents", action="store_true", help="boot in agent mode (needs uagents)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    main(args.top, args.agents)
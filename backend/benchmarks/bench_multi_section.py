@@ -0,0 +1,99 @@
+"""
+Benchmark - Sequential vs concurrent /api/generate-multi-section
+Runs the endpoint against a mock OpenRouter provider (fixed latency plus
+jitter, always-valid code) and compares wall-clock time with
+MULTI_SECTION_CONCURRENCY=1 (the old one-section-at-a-time behaviour)
+against the configured concurrency.
+
+Usage (from backend/):
+    python -m benchmarks.bench_multi_section --latency 2 --concurrency 4
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("OPENROUTER_API_KEY", "benchmark")
+os.environ["LLM_CACHE_ENABLED"] = "false"  # Every run must reach the mock provider
+
+import httpx
+
+import main
+from services.openrouter_client import openrouter_client
+from services.section_pipeline import pipeline_stats
+
+PROMPT = "Create a landing page for a project management SaaS"
+
+MOCK_SECTION = """export function MockSection() {
+  return (
+    <section className="py-20 px-4 bg-white">
+      <h2 className="text-3xl font-bold text-gray-900">Benchmark Section</h2>
+      <p className="mt-4 text-gray-600">Generated by the mock provider for timing runs.</p>
+      <button className="mt-6 px-6 py-3 bg-blue-600 text-white rounded-lg">Get Started</button>
+    </section>
+  )
+}"""
+
+
+def mock_provider(latency: float, jitter: float) -> httpx.MockTransport:
+    """OpenRouter stand-in answering every completion after latency ± jitter seconds"""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(max(latency + random.uniform(-jitter, jitter), 0.0))
+        return httpx.Response(200, json={
+            "choices": [{"message": {"content": MOCK_SECTION}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 500, "completion_tokens": 150, "total_tokens": 650}
+        })
+
+    return httpx.MockTransport(handler)
+
+
+async def time_run(concurrency: int) -> float:
+    """Wall-clock seconds for one full page at the given section concurrency"""
+    main.MULTI_SECTION_CONCURRENCY = concurrency
+    started = time.perf_counter()
+    result = await main.generate_multi_section(main.ComponentRequest(prompt=PROMPT, fresh=True), x_request_deadline=None)
+    elapsed = time.perf_counter() - started
+
+    orders = [section["sectionOrder"] for section in result["sections"]]
+    assert orders == sorted(orders), "sections must come back in sectionOrder"
+    return elapsed
+
+
+async def run_benchmark(latency: float, jitter: float, concurrency: int, runs: int):
+    openrouter_client.available = True
+    openrouter_client._http_client = httpx.AsyncClient(transport=mock_provider(latency, jitter))
+
+    results = {}
+    for label, value in (("sequential", 1), (f"concurrency={concurrency}", concurrency)):
+        timings = [await time_run(value) for _ in range(runs)]
+        results[label] = {
+            "mean": round(sum(timings) / len(timings), 3),
+            "min": round(min(timings), 3),
+            "max": round(max(timings), 3)
+        }
+
+    sequential = results["sequential"]["mean"]
+    concurrent = results[f"concurrency={concurrency}"]["mean"]
+    results["speedup"] = round(sequential / concurrent, 2) if concurrent else None
+    results["pipeline_stages"] = pipeline_stats.get_stats()["stages"]
+    print(json.dumps(results, indent=2))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=1.0, help="mock provider latency per call (seconds)")
+    parser.add_argument("--jitter", type=float, default=0.2, help="random ± jitter on each call (seconds)")
+    parser.add_argument("--concurrency", type=int, default=main.MULTI_SECTION_CONCURRENCY)
+    parser.add_argument("--runs", type=int, default=3)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    asyncio.run(run_benchmark(args.latency, args.jitter, args.concurrency, args.runs))
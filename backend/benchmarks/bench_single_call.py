@@ -0,0 +1,159 @@
+"""
+Benchmark - Single-call page generation vs per-section fan-out
+Generates the same landing page through page_section_events() in both
+modes against a mock OpenRouter provider that streams at a fixed speed
+(time to first token plus tokens/sec) and reports usage computed from
+the real prompts (~4 chars per token). Compares upstream calls, prompt
+and completion tokens, cost, time to the first section and total
+wall-clock.
+
+Usage (from backend/):
+    python -m benchmarks.bench_single_call --ttfb 0.5 --tps 400 --output-format typescript
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("OPENROUTER_API_KEY", "benchmark")
+os.environ["LLM_CACHE_ENABLED"] = "false"  # Every run must reach the mock provider
+
+import httpx
+
+import main
+from services.openrouter_client import openrouter_client
+from utils.section_delimiters import SECTION_MARKER, END_MARKER
+
+PROMPT = "Create a landing page for a project management SaaS"
+CHARS_PER_TOKEN = 4
+_SECTION_LINE = re.compile(r'^\d+\. (\w+)$', re.MULTILINE)
+
+
+def section_code(name: str, tokens: int) -> str:
+    """A valid section component of roughly `tokens` completion tokens"""
+    item = '      <li className="py-2 text-gray-600">Plan, track and ship work with your whole team.</li>\n'
+    items = item * max((tokens * CHARS_PER_TOKEN - 300) // len(item), 1)
+    return f"""export function {name}Section() {{
+  return (
+    <section className="py-20 px-4 bg-white">
+      <h2 className="text-3xl font-bold text-gray-900">{name}</h2>
+      <ul className="mt-6">
+{items}      </ul>
+      <button className="mt-6 px-6 py-3 bg-blue-600 text-white rounded-lg">Get Started</button>
+    </section>
+  )
+}}
+"""
+
+
+class MockProvider:
+    """OpenRouter stand-in streaming at ttfb + tokens/tps and recording usage per call"""
+
+    def __init__(self, ttfb: float, tps: float, section_tokens: int):
+        self.ttfb = ttfb
+        self.tps = tps
+        self.section_tokens = section_tokens
+        self.calls = []
+
+    def content(self, user_prompt: str) -> str:
+        names = _SECTION_LINE.findall(user_prompt)
+        if SECTION_MARKER.split()[0] not in user_prompt or not names:
+            return section_code("Mock", self.section_tokens)
+        # Single-call page: every listed section between delimiter lines
+        blocks = [f"{SECTION_MARKER.format(name=name)}\n{section_code(name, self.section_tokens)}" for name in names]
+        return "".join(blocks) + END_MARKER + "\n"
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        content = self.content(payload["messages"][1]["content"])
+        usage = {
+            "prompt_tokens": sum(len(message["content"]) for message in payload["messages"]) // CHARS_PER_TOKEN,
+            "completion_tokens": len(content) // CHARS_PER_TOKEN
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        self.calls.append(usage)
+
+        chunk_chars = 40
+
+        async def body():
+            await asyncio.sleep(self.ttfb)
+            for i in range(0, len(content), chunk_chars):
+                await asyncio.sleep(chunk_chars / CHARS_PER_TOKEN / self.tps)
+                yield f"data: {json.dumps({'choices': [{'delta': {'content': content[i:i + chunk_chars]}}]})}\n\n".encode()
+            yield f"data: {json.dumps({'choices': [{'delta': {}, 'finish_reason': 'stop'}], 'usage': usage})}\n\n".encode()
+            yield b"data: [DONE]\n\n"
+
+        return httpx.Response(200, content=body())
+
+
+async def time_mode(mode: str, provider: MockProvider, output_format: str) -> dict:
+    """Run one page in the given mode; return calls, tokens and timings"""
+    provider.calls.clear()
+    request = main.ComponentRequest(prompt=PROMPT, fresh=True, generationMode=mode, outputFormat=output_format)
+    deadline = main.Deadline.for_endpoint("generate-multi-section-stream")
+
+    started = time.perf_counter()
+    first_section = None
+    completed = 0
+    async for event in main.page_section_events(request, deadline):
+        if event.get("type") == "section_complete":
+            completed += 1
+            if first_section is None:
+                first_section = time.perf_counter() - started
+    elapsed = time.perf_counter() - started
+
+    return {
+        "sections": completed,
+        "upstream_calls": len(provider.calls),
+        "prompt_tokens": sum(call["prompt_tokens"] for call in provider.calls),
+        "completion_tokens": sum(call["completion_tokens"] for call in provider.calls),
+        "first_section_s": round(first_section or 0.0, 3),
+        "wall_clock_s": round(elapsed, 3)
+    }
+
+
+async def run_benchmark(
+    ttfb: float, tps: float, section_tokens: int, output_format: str, input_price: float, output_price: float
+):
+    provider = MockProvider(ttfb, tps, section_tokens)
+    openrouter_client.available = True
+    openrouter_client._http_client = httpx.AsyncClient(transport=httpx.MockTransport(provider.handler))
+
+    results = {}
+    for mode in ("sections", "single-call"):
+        result = await time_mode(mode, provider, output_format)
+        result["cost_usd"] = round(
+            (result["prompt_tokens"] * input_price + result["completion_tokens"] * output_price) / 1e6, 5
+        )
+        results[mode] = result
+
+    fanout, single = results["sections"], results["single-call"]
+    results["single_call_vs_sections"] = {
+        "prompt_tokens_saved": fanout["prompt_tokens"] - single["prompt_tokens"],
+        "cost_ratio": round(single["cost_usd"] / fanout["cost_usd"], 3) if fanout["cost_usd"] else None,
+        "wall_clock_ratio": round(single["wall_clock_s"] / fanout["wall_clock_s"], 2) if fanout["wall_clock_s"] else None
+    }
+    print(json.dumps(results, indent=2))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ttfb", type=float, default=0.5, help="mock time to first token (seconds)")
+    parser.add_argument("--tps", type=float, default=400.0, help="mock streaming speed (tokens/sec per request)")
+    parser.add_argument("--section-tokens", type=int, default=600, help="completion tokens per section")
+    parser.add_argument("--output-format", default="vanilla", choices=["vanilla", "typescript"])
+    parser.add_argument("--input-price", type=float, default=2.5, help="USD per 1M prompt tokens")
+    parser.add_argument("--output-price", type=float, default=10.0, help="USD per 1M completion tokens")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    asyncio.run(run_benchmark(
+        args.ttfb, args.tps, args.section_tokens, args.output_format, args.input_price, args.output_price
+    ))
@@ -8,7 +8,7 @@ This server:
 3. Returns responses back to frontend
 """
 
-from fastapi import FastAPI, HTTPException, Response
+from fastapi import FastAPI, HTTPException, Request, Response, Header
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
@@ -21,21 +21,114 @@ import json
 import zipfile
 import io
 import os
+import traceback
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Fetch.ai imports
-from uagents import Bureau
-from uagents.query import query
+# Sections generated at once by the non-streaming multi-section endpoint
+MULTI_SECTION_CONCURRENCY = int(os.getenv("MULTI_SECTION_CONCURRENCY", "4"))
+# Seconds between client-disconnect checks while a stream waits on sections
+DISCONNECT_POLL_INTERVAL = float(os.getenv("DISCONNECT_POLL_INTERVAL", "1.0"))
 
-# Import our agents
-from agents.component_generator_agent import component_generator, ComponentGenerationRequest, ComponentGenerationResponse
-from agents.gaze_optimizer_agent import gaze_optimizer, GazeOptimizationRequest, GazeOptimizationResponse
+# Agent mode runs the Fetch.ai agents in a Bureau next to the API. The HTTP
+# endpoints call the generation helpers directly, so with AGENTS_ENABLED=false
+# the API boots without importing uagents (faster cold start, less memory)
+AGENTS_ENABLED = os.getenv("AGENTS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+from services.agent_host_client import agent_host
+
+# With AGENT_HOST_URL set the agents run in agent_host.py and this process is
+# one of several stateless API workers (no Bureau, no agent ports, no uagents)
+USE_AGENT_HOST = AGENTS_ENABLED and agent_host.enabled
+RUN_BUREAU = AGENTS_ENABLED and not agent_host.enabled
+
+if AGENTS_ENABLED:
+    # Message models of the gaze endpoint (the Bureau or the agent host answers them)
+    from agents.gaze_optimizer_agent import GazePoint, GazeOptimizationRequest, GazeOptimizationResponse
+
+if RUN_BUREAU:
+    # Importing the Bureau imports our agents and creates it with them
+    from agents.bureau import start_agents
 
 # Import new services
+from prompts.landing_page_prompts import get_landing_page_system_prompt, get_component_system_prompt, detect_page_type
 from prompts.typescript_prompts import get_typescript_landing_page_prompt, get_typescript_component_prompt
+from utils.section_splitter import split_into_sections
+from utils.component_utils import extract_dependencies, detect_component_type
+from services.openai_fallback import openai_client
+from services.suggestion_generator import generate_suggestions as gen_suggestions, apply_suggestion_to_code
 from services.project_builder import create_project_structure
+from services.openrouter_client import openrouter_client
+from services.llm_cache import llm_cache
+from services.single_flight import single_flight
+from services.hedging import hedge_policy
+from services.model_router import model_router
+from services.rate_limiter import openrouter_limiter, openai_limiter
+from services.circuit_breaker import circuit_breakers
+from services.deadline import Deadline
+from services.job_store import job_store, JobLimitError
+from services.section_scheduler import section_scheduler
+from services.warm_pool import warm_pool
+from services.code_repair import code_repairer
+from services.agent_readiness import agent_readiness, AGENT_STARTUP_TIMEOUT
+from services.agent_dispatcher import agent_dispatcher, AgentDispatchError
+from services.section_pipeline import (
+    SectionPipeline, SectionJob, OpenRouterProvider, OpenAIProvider, MockProvider, PrefetchedProvider, pipeline_stats
+)
+from services.page_stream import stream_page_sections, PAGE_GENERATION_MODE, PAGE_GENERATION_MODES
+
+# Generation pipelines: providers are tried in order, each for max_attempts
+STREAM_SECTION_PIPELINE = SectionPipeline(
+    providers=[
+        OpenRouterProvider(stream=True, hedge=True, max_attempts=2, max_tokens=2500, temperature_step=0.1),
+        OpenAIProvider(max_tokens=2500),
+        MockProvider()
+    ],
+    hooks=[pipeline_stats],
+    repairer=code_repairer
+)
+# Single-call page mode: sections cut from the page completion, regenerated one by one if invalid
+SINGLE_CALL_SECTION_PIPELINE = SectionPipeline(
+    providers=[
+        PrefetchedProvider(),
+        OpenRouterProvider(stream=True, hedge=True, max_tokens=2500),
+        OpenAIProvider(max_tokens=2500),
+        MockProvider()
+    ],
+    hooks=[pipeline_stats],
+    repairer=code_repairer
+)
+SECTION_PIPELINE = SectionPipeline(
+    providers=[
+        OpenRouterProvider(max_attempts=3, max_tokens=3000, temperature_step=0.1),
+        OpenAIProvider(max_attempts=3, max_tokens=3000, temperature_step=0.1),
+        MockProvider()
+    ],
+    hooks=[pipeline_stats],
+    repairer=code_repairer
+)
+# Single components are returned as generated (no section extraction/validation)
+COMPONENT_PIPELINE = SectionPipeline(
+    providers=[
+        OpenRouterProvider(max_tokens=4000),
+        OpenAIProvider(max_tokens=3000),
+        MockProvider()
+    ],
+    extract=False,
+    validate=False,
+    clean=False,
+    hooks=[pipeline_stats]
+)
+# Warm pool: only validated model output is pooled (no mock fallback), sampled fresh for variety
+WARM_POOL_PIPELINE = SectionPipeline(
+    providers=[
+        OpenRouterProvider(max_attempts=2, max_tokens=3000, temperature_step=0.1),
+        OpenAIProvider(max_tokens=3000)
+    ],
+    hooks=[pipeline_stats],
+    repairer=code_repairer
+)
 
 # Create FastAPI app
 app = FastAPI(
@@ -72,6 +165,8 @@ class ComponentRequest(BaseModel):
     designTokens: Optional[Dict] = None
     constraints: Optional[List[str]] = None
     outputFormat: Optional[str] = "vanilla"  # "vanilla" or "typescript"
+    fresh: Optional[bool] = False  # Bypass the LLM response cache
+    generationMode: Optional[str] = None  # "sections" or "single-call" (default: PAGE_GENERATION_MODE)
 
 class GazePointAPI(BaseModel):
     x: float
@@ -107,48 +202,50 @@ class ApplyEditRequest(BaseModel):
 # Agent addresses (will be populated on startup)
 AGENT_ADDRESSES = {}
 
-# Create Bureau to manage agents
-bureau = Bureau()
-bureau.add(component_generator)
-bureau.add(gaze_optimizer)
-
 @app.on_event("startup")
 async def startup_event():
     """Initialize Fetch.ai agents on startup"""
     print("[STARTING] Starting ClientSight Agent API...")
-    print("📡 Connecting to Fetch.ai agents...")
     
-    # Start Bureau in background (this starts the agents)
-    try:
-        # Run Bureau in a background thread (it's a blocking call)
-        import threading
-        def run_bureau():
-            try:
-                bureau.run()
-            except Exception as e:
-                print(f"[WARN] Bureau runtime error: {e}")
-        
-        bureau_thread = threading.Thread(target=run_bureau, daemon=True)
-        bureau_thread.start()
-        
-        # Give agents a moment to start and register
-        await asyncio.sleep(3)
-        
-        # Store agent addresses
-        AGENT_ADDRESSES['component_generator'] = component_generator.address
-        AGENT_ADDRESSES['gaze_optimizer'] = gaze_optimizer.address
-        
-        print(f"[OK] Component Generator: {component_generator.address}")
-        print(f"[OK] Gaze Optimizer: {gaze_optimizer.address}")
-        print("[SUCCESS] All agents ready!")
-        print("💡 Note: Agents communicate via Bureau internally")
-    except Exception as e:
-        print(f"[WARN] Agent startup issue (will continue): {e}")
-        import traceback
-        traceback.print_exc()
-        # Store addresses anyway (they might still work)
-        AGENT_ADDRESSES['component_generator'] = component_generator.address
-        AGENT_ADDRESSES['gaze_optimizer'] = gaze_optimizer.address
+    # Open the pooled OpenRouter HTTP client (reused by every generation)
+    await openrouter_client.start()
+    # Open the LLM cache's disk tier now rather than on the first request
+    await llm_cache.start()
+    
+    # Pre-generate sections for the predictable prompts (WARM_POOL_ENABLED)
+    warm_pool.start(generate_warm_variant)
+    
+    if not AGENTS_ENABLED:
+        print("[FAST-BOOT] AGENTS_ENABLED=false - serving the API without Fetch.ai agents")
+    elif USE_AGENT_HOST:
+        # Worker mode: the agents run in the agent host process
+        print(f"📡 Waiting for the agent host at {agent_host.url} (worker pid {os.getpid()})...")
+        AGENT_ADDRESSES.update(await agent_host.wait(AGENT_STARTUP_TIMEOUT))
+        if agent_host.last_status and agent_host.last_status.get("ready"):
+            print(f"[SUCCESS] Agent host ready in {agent_host.waited:.2f}s")
+        else:
+            print(f"[WARN] Agent host not ready ({agent_host.error or 'agents starting'}) - /readyz reports 503")
+    else:
+        AGENT_ADDRESSES.update(await start_agents())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the warm pool and release pooled connections on shutdown"""
+    await warm_pool.stop()
+    await openrouter_client.close()
+    await agent_host.close()
+
+async def generate_warm_variant(section_info: Dict, output_format: str) -> Optional[str]:
+    """Generate one validated variant of a section for the warm pool (None if no provider succeeded)"""
+    # Only takes a worker slot while no live request's section is waiting
+    async with section_scheduler.slot("warm-pool", section_info['order'], background=True):
+        result = await WARM_POOL_PIPELINE.run(SectionJob(
+            name=section_info['name'],
+            prompt=section_info['prompt'],
+            output_format=output_format,
+            use_cache=False
+        ))
+    return result.code if result.provider != "none" else None
 
 @app.get("/")
 async def root():
@@ -156,21 +253,321 @@ async def root():
     return {
         "service": "ClientSight Agent API",
         "status": "running",
+        "agents_enabled": AGENTS_ENABLED,
+        "agent_host": agent_host.url or None,
         "agents": {
             "component_generator": AGENT_ADDRESSES.get('component_generator'),
             "gaze_optimizer": AGENT_ADDRESSES.get('gaze_optimizer')
         },
+        "circuit_breakers": circuit_breakers.get_stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/healthz")
+async def healthz():
+    """Liveness: the process is up and serving requests"""
+    return {"status": "ok", "timestamp": datetime.now().isoformat()}
+
+@app.get("/readyz")
+async def readyz(response: Response):
+    """Readiness: agents started, provider connection pool open, LLM cache tiers open (503 until then)"""
+    checks = {
+        "agents": await agent_host.is_ready() if USE_AGENT_HOST else agent_readiness.is_ready(),
+        "providers": openrouter_client.is_ready(),
+        "cache": llm_cache.is_ready()
+    }
+    ready = all(checks.values())
+    if not ready:
+        response.status_code = 503
+    return {
+        "status": "ready" if ready else "not_ready",
+        "checks": checks,
+        "agents": agent_host.get_stats() if USE_AGENT_HOST else agent_readiness.get_stats(),
         "timestamp": datetime.now().isoformat()
     }
 
 @app.get("/api/models")
 async def get_models():
-    """Get available AI models"""
-    from services.openrouter_client import openrouter_client
-    return openrouter_client.get_model_list()
+    """Get available AI models with live routing stats (TTFB, tokens/sec, error and pass rates)"""
+    return {
+        "models": openrouter_client.get_model_list(),
+        "openrouter_available": openrouter_client.is_available(),
+        "routing": model_router.get_stats()
+    }
 
-from fastapi.responses import StreamingResponse
-import json
+@app.get("/api/stats")
+async def get_stats():
+    """Runtime performance statistics (connection pool reuse, cache hits, etc.)"""
+    return {
+        "openrouter_pool": openrouter_client.get_pool_stats(),
+        "llm_cache": llm_cache.get_stats(),
+        "single_flight": single_flight.get_stats(),
+        "hedging": hedge_policy.get_stats(),
+        "pipeline": pipeline_stats.get_stats(),
+        "jobs": job_store.get_stats(),
+        "section_scheduler": section_scheduler.get_stats(),
+        "warm_pool": warm_pool.get_stats(),
+        "repair": code_repairer.get_stats(),
+        "agent_host": agent_host.get_stats(),
+        "agent_dispatch": agent_dispatcher.get_stats(),
+        "worker_pid": os.getpid(),
+        "rate_limits": {
+            "openrouter": openrouter_limiter.get_stats(),
+            "openai": openai_limiter.get_stats()
+        },
+        "timestamp": datetime.now().isoformat()
+    }
+
+def coalesce_section_deltas(events: List) -> List:
+    """Merge consecutive queued deltas for the same section attempt into one SSE event"""
+    merged = []
+    for event in events:
+        previous = merged[-1] if merged else None
+        if (
+            isinstance(event, dict) and event.get('type') == 'section_delta'
+            and isinstance(previous, dict) and previous.get('type') == 'section_delta'
+            and previous['section'] == event['section'] and previous['attempt'] == event['attempt']
+        ):
+            merged[-1] = {**previous, 'delta': previous['delta'] + event['delta']}
+        else:
+            merged.append(event)
+    return merged
+
+# Queued by the disconnect watcher when the SSE client has gone away
+CLIENT_DISCONNECTED = object()
+
+async def watch_disconnect(http_request: Request, event_queue: asyncio.Queue):
+    """Queue CLIENT_DISCONNECTED once the client closes the connection"""
+    while not await http_request.is_disconnected():
+        await asyncio.sleep(DISCONNECT_POLL_INTERVAL)
+    event_queue.put_nowait(CLIENT_DISCONNECTED)
+
+def format_sse(event: Dict, event_id: Optional[int] = None) -> str:
+    """One SSE message; event_id adds an id line so clients can resume with Last-Event-ID"""
+    try:
+        data = json.dumps(event)
+    except (TypeError, ValueError) as json_error:
+        print(f"[ERROR] Failed to serialize {event.get('type', 'unknown')} event: {json_error}")
+        data = json.dumps({'type': 'error', 'section': event.get('section', 'unknown'), 'message': 'Failed to serialize section data'})
+    prefix = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{prefix}data: {data}\n\n"
+
+async def page_section_events(
+    request: ComponentRequest,
+    deadline: Deadline,
+    http_request: Optional[Request] = None,
+    request_id: Optional[str] = None
+):
+    """
+    Generate a landing page section by section, yielding event dicts
+
+    Shared by the streaming endpoint and background jobs. Sections run in
+    parallel; their token deltas and results are yielded as they arrive.
+    Closing the generator (or a disconnect of http_request, when given)
+    cancels unfinished sections and their upstream requests.
+    
+    In "single-call" mode one completion produces every section; each is
+    validated and sent as soon as its delimiter block ends, and sections
+    the completion missed (or got wrong) are generated one by one.
+    """
+    tasks: List[asyncio.Task] = []
+    watcher: Optional[asyncio.Task] = None
+    try:
+        request_id = request_id or str(uuid.uuid4())
+        
+        print(f"[RECEIVED] Received multi-section streaming request: {request.prompt}")
+        print(f"[DEBUG] Request ID: {request_id}")
+        print(f"[DEBUG] Output format: {request.outputFormat}")
+        
+        # Check OpenRouter availability
+        print(f"[DEBUG] OpenRouter available: {openrouter_client.available}")
+        print(f"[DEBUG] OpenAI client available: {openai_client is not None}")
+        
+        # Analyze prompt
+        analysis = split_into_sections(request.prompt)
+        
+        if not analysis['is_landing_page']:
+            yield {'error': 'Not a landing page request'}
+            return
+        
+        page_type = analysis['page_type']
+        section_prompts = analysis['sections']
+        mode = request.generationMode if request.generationMode in PAGE_GENERATION_MODES else PAGE_GENERATION_MODE
+        
+        # Send initial status with section names
+        yield {'type': 'init', 'total_sections': len(section_prompts), 'section_names': [s['name'] for s in section_prompts], 'page_type': page_type, 'deadline': deadline.budget, 'mode': mode}
+        
+        # Section tasks push 'section_delta' events and final results here
+        event_queue: asyncio.Queue = asyncio.Queue()
+        
+        # Helper function to generate a single section
+        async def generate_single_section(section_info: Dict, idx: int, prefetched: Optional[str] = None) -> Dict:
+            """Generate a single section (or finish one cut from the page completion) and return result"""
+            section_name = section_info['name']
+            
+            print(f"[INFO] Processing section {idx}/{len(section_prompts)}: {section_name}")
+            print(f"[PROCESSING] Generating {section_name}...")
+            
+            # The page completion already streamed attempt 1 of a prefetched section
+            attempt_offset = 1 if prefetched is not None else 0
+            
+            def forward_delta(attempt: int, delta: str):
+                event_queue.put_nowait({
+                    'type': 'section_delta',
+                    'section': section_name,
+                    'attempt': attempt + attempt_offset,
+                    'delta': delta
+                })
+            
+            pipeline = SINGLE_CALL_SECTION_PIPELINE if prefetched is not None else STREAM_SECTION_PIPELINE
+            # Shared worker pool: Navigation/Hero first, requests take turns
+            async with section_scheduler.slot(request_id, section_info.get('order', idx - 1)):
+                result = await pipeline.run(SectionJob(
+                    name=section_name,
+                    prompt=section_info['prompt'],
+                    output_format=request.outputFormat,
+                    use_cache=not request.fresh,
+                    deadline=deadline,
+                    on_delta=forward_delta,
+                    prefetched=prefetched
+                ))
+            
+            return section_complete_event(section_info, idx, result.code)
+        
+        def section_complete_event(section_info: Dict, idx: int, code: str) -> Dict:
+            return {
+                'type': 'section_complete',
+                'section': section_info['name'],
+                'status': 'completed',
+                'data': {
+                    'code': code,
+                    'sectionName': section_info['name'],
+                    'componentType': section_info.get('type', 'section'),
+                    'dependencies': [],
+                    'sectionOrder': section_info.get('order', idx - 1),
+                    'requestId': request_id
+                },
+                'idx': idx
+            }
+        
+        # Send "generating" status for all sections immediately
+        print(f"[INFO] Starting PARALLEL generation of {len(section_prompts)} sections")
+        for idx, section_info in enumerate(section_prompts, 1):
+            section_name = section_info['name']
+            yield {'type': 'status', 'section': section_name, 'status': 'generating'}
+        
+        # Sections with a pre-generated variant in the warm pool complete instantly
+        pooled = set()
+        if not request.fresh:
+            for idx, section_info in enumerate(section_prompts, 1):
+                code = warm_pool.get(section_info['prompt'], request.outputFormat)
+                if code is not None:
+                    pooled.add(idx)
+                    event_queue.put_nowait(section_complete_event(section_info, idx, code))
+        if pooled:
+            print(f"[WARM-POOL] Serving {len(pooled)}/{len(section_prompts)} section(s) from the warm pool")
+        pending = [(idx, section_info) for idx, section_info in enumerate(section_prompts, 1) if idx not in pooled]
+        
+        async def run_section(section_info: Dict, idx: int, prefetched: Optional[str] = None):
+            """Generate a section and push its result (or exception) onto the event queue"""
+            try:
+                event_queue.put_nowait(await generate_single_section(section_info, idx, prefetched))
+            except Exception as e:
+                event_queue.put_nowait(e)
+        
+        async def run_page_stream():
+            """Single-call mode: start each section's validation as the page completion delivers it"""
+            positions = {section_info['name']: idx for idx, section_info in pending}
+            started = set()
+            
+            async def consume():
+                async for kind, section_name, text in stream_page_sections(
+                    [section_info for _, section_info in pending], request.outputFormat,
+                    use_cache=not request.fresh, deadline=deadline
+                ):
+                    if kind == 'delta':
+                        event_queue.put_nowait({'type': 'section_delta', 'section': section_name, 'attempt': 1, 'delta': text})
+                        continue
+                    started.add(section_name)
+                    idx = positions[section_name]
+                    tasks.append(asyncio.create_task(run_section(section_prompts[idx - 1], idx, prefetched=text)))
+            
+            try:
+                async with section_scheduler.slot(request_id, 0):
+                    await deadline.run(consume())
+            except Exception as e:
+                print(f"[WARN] Single-call page completion failed: {e}")
+            
+            missing = [idx for name, idx in positions.items() if name not in started]
+            if missing:
+                print(f"[SINGLE-CALL] Generating {len(missing)} missing section(s) one by one")
+            for idx in missing:
+                tasks.append(asyncio.create_task(run_section(section_prompts[idx - 1], idx)))
+        
+        if mode == "single-call":
+            if pending:
+                tasks.append(asyncio.create_task(run_page_stream()))
+        else:
+            # Generate all sections in parallel using asyncio tasks
+            tasks.extend(
+                asyncio.create_task(run_section(section_info, idx)) 
+                for idx, section_info in pending
+            )
+        if http_request is not None:
+            # Notices disconnects even while no events are being written
+            watcher = asyncio.create_task(watch_disconnect(http_request, event_queue))
+        
+        # Multiplex token deltas and results from all sections as they arrive
+        # (not necessarily in order) so the client sees progress immediately
+        completed_count = 0
+        
+        while completed_count < len(section_prompts):
+            events = [await event_queue.get()]
+            while not event_queue.empty():
+                events.append(event_queue.get_nowait())
+            
+            for event in coalesce_section_deltas(events):
+                if event is CLIENT_DISCONNECTED:
+                    print(f"[DISCONNECT] Client closed the stream for request {request_id}")
+                    return
+                
+                if isinstance(event, Exception):
+                    completed_count += 1
+                    print(f"[ERROR] Section generation failed: {str(event)}")
+                    yield {'type': 'error', 'section': 'unknown', 'message': str(event)}
+                    continue
+                
+                if event['type'] == 'section_delta':
+                    yield event
+                    continue
+                
+                section_result = event
+                completed_count += 1
+                yield section_result
+                print(f"[OK] Section {section_result['section']} complete ({completed_count}/{len(section_prompts)}), sent to client")
+                print(f"[DEBUG] Section {section_result['section']} code length: {len(section_result['data']['code'])} chars")
+        
+        # Single-call mode: the page completion may still be finishing (and caching) after its last section
+        await asyncio.gather(*tasks, return_exceptions=True)
+        
+        # Send final completion message
+        yield {'type': 'complete', 'message': 'All sections generated'}
+        print(f"[SUCCESS] All sections generated and streamed")
+        
+    except Exception as e:
+        print(f"[ERROR] Error in streaming generation: {str(e)}")
+        traceback.print_exc()
+        yield {'type': 'error', 'message': str(e)}
+    finally:
+        # Runs on normal completion, on disconnect, and when the consumer
+        # closes or cancels this generator (e.g. because a write failed)
+        if watcher is not None:
+            watcher.cancel()
+        unfinished = [task for task in tasks if not task.done()]
+        for task in unfinished:
+            task.cancel()
+        if unfinished:
+            print(f"[DISCONNECT] Cancelled {len(unfinished)} unfinished generation task(s) and their upstream requests")
 
 @app.options("/api/generate-multi-section-stream")
 async def generate_multi_section_stream_options():
@@ -178,262 +575,42 @@ async def generate_multi_section_stream_options():
     return Response(status_code=200, headers={
         "Access-Control-Allow-Origin": "*",
         "Access-Control-Allow-Methods": "POST, OPTIONS",
-        "Access-Control-Allow-Headers": "Content-Type",
+        "Access-Control-Allow-Headers": "Content-Type, X-Request-Deadline",
     })
 
 @app.post("/api/generate-multi-section-stream")
-async def generate_multi_section_stream(request: ComponentRequest):
+async def generate_multi_section_stream(
+    request: ComponentRequest,
+    http_request: Request,
+    x_request_deadline: Optional[str] = Header(default=None)
+):
     """
     Generate multiple sections with real-time streaming updates
     Sends updates as each section completes
+    
+    Event types: init, status, section_delta, section_complete, error, complete.
+    'section_delta' carries raw code tokens for one section as they stream in;
+    a new 'attempt' number means the previous attempt was discarded. The final
+    validated code is always sent in 'section_complete'.
+    
+    The whole request shares one deadline (DEADLINE_GENERATE_MULTI_SECTION_STREAM
+    or the X-Request-Deadline header, in seconds); sections that run out of
+    budget get the degraded mock result.
+    
+    If the client disconnects, unfinished sections are cancelled, which
+    aborts their upstream requests (see "cancelled" in /api/stats).
     """
     print(f"[ENDPOINT] /api/generate-multi-section-stream called")
     print(f"[ENDPOINT] Request prompt: {request.prompt[:100]}...")
+    deadline = Deadline.for_endpoint("generate-multi-section-stream", x_request_deadline)
     
     async def generate_sections_stream():
+        events = page_section_events(request, deadline, http_request)
         try:
-            request_id = str(uuid.uuid4())
-            
-            print(f"[RECEIVED] Received multi-section streaming request: {request.prompt}")
-            print(f"[DEBUG] Request ID: {request_id}")
-            print(f"[DEBUG] Output format: {request.outputFormat}")
-            
-            # Import utilities
-            from utils.section_splitter import split_into_sections
-            from agents.component_generator_agent import generate_mock_component, openai_client
-            from services.openrouter_client import openrouter_client
-            from prompts.landing_page_prompts import get_landing_page_system_prompt, get_component_system_prompt
-            from prompts.typescript_prompts import get_typescript_landing_page_prompt, get_typescript_component_prompt
-            from utils.code_validator import validate_component_code, clean_and_validate_code
-            
-            # Check OpenRouter availability
-            print(f"[DEBUG] OpenRouter available: {openrouter_client.available}")
-            print(f"[DEBUG] OpenAI client available: {openai_client is not None}")
-            
-            # Analyze prompt
-            analysis = split_into_sections(request.prompt)
-            
-            if not analysis['is_landing_page']:
-                yield f"data: {json.dumps({'error': 'Not a landing page request'})}\n\n"
-                return
-            
-            page_type = analysis['page_type']
-            section_prompts = analysis['sections']
-            
-            # Send initial status with section names
-            yield f"data: {json.dumps({'type': 'init', 'total_sections': len(section_prompts), 'section_names': [s['name'] for s in section_prompts], 'page_type': page_type})}\n\n"
-            
-            # Helper function to generate a single section
-            async def generate_single_section(section_info: Dict, idx: int) -> Dict:
-                """Generate a single section and return result"""
-                section_name = section_info['name']
-                section_prompt = section_info['prompt']
-                
-                print(f"[INFO] Processing section {idx}/{len(section_prompts)}: {section_name}")
-                print(f"[PROCESSING] Generating {section_name}...")
-                
-                # Choose system prompt
-                if request.outputFormat == "typescript":
-                    system_prompt = get_typescript_component_prompt()
-                else:
-                    system_prompt = get_component_system_prompt()
-                
-                # Try to generate with retry logic
-                code = None
-                attempt = 0
-                max_attempts = 2  # Reduced from 3 for speed
-                
-                while attempt < max_attempts and not code:
-                    attempt += 1
-                    
-                    try:
-                        print(f"[DEBUG] Attempting OpenRouter generation for {section_name} (Attempt {attempt})...")
-                        raw_response = await openrouter_client.generate(
-                            prompt=section_prompt,
-                            system_prompt=system_prompt,
-                            model="auto",
-                            temperature=0.7 + (attempt * 0.1),
-                            max_tokens=2500  # Slightly reduced for speed
-                        )
-                        
-                        # Extract code from markdown/explanatory text
-                        import re
-                        temp_code = raw_response
-                        
-                        # Try to extract code block first
-                        code_block_match = re.search(r'```(?:tsx?|jsx?|typescript|javascript)?\n(.*?)```', raw_response, re.DOTALL)
-                        if code_block_match:
-                            temp_code = code_block_match.group(1).strip()
-                            print(f"[DEBUG] Extracted code from markdown block ({len(temp_code)} chars)")
-                        else:
-                            # If no code block, try to find the first function/export statement
-                            # Remove explanatory text before the actual code
-                            lines = raw_response.split('\n')
-                            code_start_idx = None
-                            for i, line in enumerate(lines):
-                                if re.match(r'^\s*(export\s+)?(function|const)\s+\w+', line):
-                                    code_start_idx = i
-                                    break
-                            
-                            if code_start_idx is not None:
-                                temp_code = '\n'.join(lines[code_start_idx:]).strip()
-                                print(f"[DEBUG] Extracted code starting at line {code_start_idx} ({len(temp_code)} chars)")
-                            else:
-                                # Last resort: remove lines that look like explanations
-                                code_lines = []
-                                for line in lines:
-                                    # Skip lines that are clearly explanations (not code)
-                                    if not re.match(r'^(Apologies|Here|This|Note:|Please|You|We|I|The|As|For|In|On|At|To|From|With|Without|Using|When|Where|Why|How|What|Which|That|This|These|Those)', line, re.IGNORECASE):
-                                        code_lines.append(line)
-                                temp_code = '\n'.join(code_lines).strip()
-                                print(f"[DEBUG] Cleaned explanatory text ({len(temp_code)} chars)")
-                        
-                        print(f"[DEBUG] OpenRouter returned code ({len(temp_code)} chars)")
-                        is_valid, error_msg = validate_component_code(temp_code, section_name)
-                        if is_valid:
-                            code = temp_code
-                            print(f"[OK] Generated {section_name} - Attempt {attempt} ({len(temp_code)} chars)")
-                        else:
-                            print(f"[WARN] Invalid code (Attempt {attempt}): {error_msg}")
-                    except Exception as e:
-                        print(f"[ERROR] OpenRouter generation failed (Attempt {attempt}): {str(e)}")
-                    
-                    # Fallback to OpenAI if needed (only on last attempt)
-                    if not code and openai_client and attempt == max_attempts:
-                        try:
-                            response = await openai_client.chat.completions.create(
-                                model="gpt-4",
-                                messages=[
-                                    {"role": "system", "content": system_prompt},
-                                    {"role": "user", "content": section_prompt}
-                                ],
-                                temperature=0.7,
-                                max_tokens=2500
-                            )
-                            raw_response = response.choices[0].message.content
-                            
-                            # Extract code from markdown/explanatory text (same logic as OpenRouter)
-                            import re
-                            temp_code = raw_response
-                            
-                            # Try to extract code block first
-                            code_block_match = re.search(r'```(?:tsx?|jsx?|typescript|javascript)?\n(.*?)```', raw_response, re.DOTALL)
-                            if code_block_match:
-                                temp_code = code_block_match.group(1).strip()
-                                print(f"[DEBUG] Extracted code from markdown block ({len(temp_code)} chars)")
-                            else:
-                                # If no code block, try to find the first function/export statement
-                                lines = raw_response.split('\n')
-                                code_start_idx = None
-                                for i, line in enumerate(lines):
-                                    if re.match(r'^\s*(export\s+)?(function|const)\s+\w+', line):
-                                        code_start_idx = i
-                                        break
-                                
-                                if code_start_idx is not None:
-                                    temp_code = '\n'.join(lines[code_start_idx:]).strip()
-                                    print(f"[DEBUG] Extracted code starting at line {code_start_idx} ({len(temp_code)} chars)")
-                                else:
-                                    # Remove explanatory text
-                                    code_lines = []
-                                    for line in lines:
-                                        if not re.match(r'^(Apologies|Here|This|Note:|Please|You|We|I|The|As|For|In|On|At|To|From|With|Without|Using|When|Where|Why|How|What|Which|That|This|These|Those)', line, re.IGNORECASE):
-                                            code_lines.append(line)
-                                    temp_code = '\n'.join(code_lines).strip()
-                                    print(f"[DEBUG] Cleaned explanatory text ({len(temp_code)} chars)")
-                            
-                            is_valid, error_msg = validate_component_code(temp_code, section_name)
-                            if is_valid:
-                                code = temp_code
-                                print(f"[OK] Generated {section_name} with GPT-4 fallback")
-                        except Exception as e:
-                            print(f"[WARN] OpenAI failed: {e}")
-                
-                # Last resort: mock or fallback
-                if not code:
-                    code = generate_mock_component(section_prompt)
-                    print(f"[WARN] Using mock for {section_name}")
-                
-                # Final validation
-                try:
-                    code = clean_and_validate_code(code, section_name)
-                except ValueError:
-                    code = f"""export function {section_name.replace(' ', '')}Section() {{
-  return (
-    <div className="py-16 px-4 text-center bg-gray-50">
-      <h2 className="text-3xl font-bold mb-4">{section_name}</h2>
-      <p className="text-gray-600">Content generated successfully!</p>
-    </div>
-  )
-}}"""
-                
-                return {
-                    'type': 'section_complete',
-                    'section': section_name,
-                    'status': 'completed',
-                    'data': {
-                        'code': code,
-                        'sectionName': section_name,
-                        'componentType': section_info.get('type', 'section'),
-                        'dependencies': [],
-                        'sectionOrder': section_info.get('order', idx - 1),
-                        'requestId': request_id
-                    },
-                    'idx': idx
-                }
-            
-            # Send "generating" status for all sections immediately
-            print(f"[INFO] Starting PARALLEL generation of {len(section_prompts)} sections")
-            for idx, section_info in enumerate(section_prompts, 1):
-                section_name = section_info['name']
-                yield f"data: {json.dumps({'type': 'status', 'section': section_name, 'status': 'generating'})}\n\n"
-            
-            # Generate all sections in parallel using asyncio tasks
-            tasks = [
-                asyncio.create_task(generate_single_section(section_info, idx)) 
-                for idx, section_info in enumerate(section_prompts, 1)
-            ]
-            
-            # Process results as they complete (not necessarily in order)
-            # This allows faster sections to be sent to the client immediately
-            completed_count = 0
-            pending = set(tasks)
-            
-            while pending:
-                # Wait for at least one task to complete
-                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
-                
-                for task in done:
-                    try:
-                        section_result = await task
-                        completed_count += 1
-                        
-                        # Ensure the data is properly serialized
-                        try:
-                            section_json = json.dumps(section_result)
-                            yield f"data: {section_json}\n\n"
-                            print(f"[OK] Section {section_result['section']} complete ({completed_count}/{len(section_prompts)}), sent to client")
-                            print(f"[DEBUG] Section {section_result['section']} code length: {len(section_result['data']['code'])} chars")
-                        except Exception as json_error:
-                            print(f"[ERROR] Failed to serialize section {section_result.get('section', 'unknown')}: {json_error}")
-                            import traceback
-                            traceback.print_exc()
-                            yield f"data: {json.dumps({'type': 'error', 'section': section_result.get('section', 'unknown'), 'message': 'Failed to serialize section data'})}\n\n"
-                    except Exception as e:
-                        print(f"[ERROR] Section generation failed: {str(e)}")
-                        import traceback
-                        traceback.print_exc()
-                        yield f"data: {json.dumps({'type': 'error', 'section': 'unknown', 'message': str(e)})}\n\n"
-            
-            # Send final completion message
-            yield f"data: {json.dumps({'type': 'complete', 'message': 'All sections generated'})}\n\n"
-            print(f"[SUCCESS] All sections generated and streamed")
-            
-        except Exception as e:
-            print(f"[ERROR] Error in streaming generation: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+            async for event in events:
+                yield format_sse(event)
+        finally:
+            await events.aclose()
     
     return StreamingResponse(
         generate_sections_stream(),
@@ -448,33 +625,101 @@ async def generate_multi_section_stream(request: ComponentRequest):
         }
     )
 
+@app.post("/api/jobs")
+async def create_generation_job(
+    request: ComponentRequest,
+    x_request_deadline: Optional[str] = Header(default=None)
+):
+    """
+    Start a multi-section generation in the background
+    
+    Returns the job id right away. The job keeps running whether or not a
+    client is listening; read its events from GET /api/jobs/{id}/events.
+    """
+    print(f"[ENDPOINT] /api/jobs called")
+    deadline = Deadline.for_endpoint("jobs", x_request_deadline)
+    try:
+        job = job_store.create(lambda job_id: page_section_events(request, deadline, request_id=job_id))
+    except JobLimitError as e:
+        raise HTTPException(status_code=503, detail=f"Too many generation jobs running: {e}")
+    print(f"[JOBS] Started job {job.id}")
+    return job.to_dict()
+
+@app.get("/api/jobs/{job_id}/events")
+async def get_job_events(
+    job_id: str,
+    lastEventId: Optional[int] = None,
+    last_event_id: Optional[str] = Header(default=None)
+):
+    """
+    Server-sent events of a job: everything logged so far, then live events
+    
+    Same event types as /api/generate-multi-section-stream, each with an SSE
+    id. To resume after a dropped connection, send the last id received as
+    the Last-Event-ID header (EventSource does this automatically) or as
+    ?lastEventId=. Completed sections are replayed from the job's log, so
+    resuming never triggers new LLM calls. Token deltas of sections that have
+    completed are dropped from the log; their section_complete event carries
+    the final code. The stream ends when the job is done.
+    """
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    
+    resume_from = lastEventId or 0
+    if last_event_id:
+        try:
+            resume_from = int(last_event_id)
+        except ValueError:
+            print(f"[WARN] Ignoring invalid Last-Event-ID header: {last_event_id!r}")
+    
+    async def job_event_stream():
+        replayed, logged_until = 0, job.last_event_id
+        try:
+            async for event_id, event in job.events_after(resume_from):
+                if event_id <= logged_until:
+                    replayed += 1
+                yield format_sse(event, event_id)
+        finally:
+            if resume_from:
+                job_store.record_replay(replayed)
+    
+    return StreamingResponse(
+        job_event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",  # Disable nginx buffering
+        }
+    )
+
 @app.options("/api/generate-multi-section")
 async def generate_multi_section_options():
     """Handle CORS preflight for multi-section endpoint"""
     return Response(status_code=200, headers={
         "Access-Control-Allow-Origin": "*",
         "Access-Control-Allow-Methods": "POST, OPTIONS",
-        "Access-Control-Allow-Headers": "Content-Type",
+        "Access-Control-Allow-Headers": "Content-Type, X-Request-Deadline",
     })
 
 @app.post("/api/generate-multi-section")
-async def generate_multi_section(request: ComponentRequest):
+async def generate_multi_section(
+    request: ComponentRequest,
+    x_request_deadline: Optional[str] = Header(default=None)
+):
     """
     Generate multiple sections for a full landing page
     Splits request into individual section prompts
+    
+    Bounded by DEADLINE_GENERATE_MULTI_SECTION (or the X-Request-Deadline header)
     """
+    deadline = Deadline.for_endpoint("generate-multi-section", x_request_deadline)
     try:
         request_id = str(uuid.uuid4())
         
         print(f"[RECEIVED] Received multi-section generation request: {request.prompt}")
         
-        # Import utilities
-        from utils.section_splitter import split_into_sections
-        from agents.component_generator_agent import generate_mock_component, openai_client
-        from services.openrouter_client import openrouter_client
-        from prompts.landing_page_prompts import get_landing_page_system_prompt, get_component_system_prompt
-        from prompts.typescript_prompts import get_typescript_landing_page_prompt, get_typescript_component_prompt
-        
         # Analyze prompt and generate section prompts
         analysis = split_into_sections(request.prompt)
         
@@ -487,123 +732,40 @@ async def generate_multi_section(request: ComponentRequest):
         
         print(f"[BUILDING] Generating {len(section_prompts)} sections for {page_type} page")
         
-        # Import validation utilities
-        from utils.code_validator import validate_component_code, clean_and_validate_code
+        # Sections are independent - generate them concurrently, at most
+        # MULTI_SECTION_CONCURRENCY at a time, each with its own retry loop,
+        # within the process-wide section worker pool
+        semaphore = asyncio.Semaphore(max(MULTI_SECTION_CONCURRENCY, 1))
         
-        # Generate each section with validation and retry
-        sections = []
-        for section_info in section_prompts:
-            section_prompt = section_info['prompt']
+        async def generate_section(section_info: Dict) -> Dict:
+            """Generate, validate and clean one section (or take a pre-generated one from the warm pool)"""
             section_name = section_info['name']
-            
-            print(f"[PROCESSING] Generating {section_name}...")
-            
-            # Choose system prompt based on output format
-            if request.outputFormat == "typescript":
-                system_prompt = get_typescript_component_prompt()
+            code = None if request.fresh else warm_pool.get(section_info['prompt'], request.outputFormat)
+            if code is not None:
+                print(f"[OK] Section {section_name} served from the warm pool")
             else:
-                system_prompt = get_component_system_prompt()
-            
-            # Try up to 3 times to generate valid code
-            code = None
-            attempt = 0
-            max_attempts = 3
-            
-            while attempt < max_attempts and not code:
-                attempt += 1
-                
-                # Try OpenRouter first (Auto-select best model)
-                try:
-                    temp_code = await openrouter_client.generate(
-                        prompt=section_prompt,
-                        system_prompt=system_prompt,
-                        model="auto",  # Let OpenRouter choose the best model
-                        temperature=0.7 + (attempt * 0.1),  # Increase temperature on retries
-                        max_tokens=3000  # Increased for complex sections
-                    )
-                    
-                    # Validate generated code
-                    is_valid, error_msg = validate_component_code(temp_code, section_name)
-                    if is_valid:
-                        code = temp_code
-                        print(f"[OK] Generated with OpenRouter (Auto-selected model) - Attempt {attempt}")
-                    else:
-                        print(f"[WARN] OpenRouter generated invalid code (Attempt {attempt}): {error_msg}")
-                        if attempt < max_attempts:
-                            print(f"[RETRY] Retrying {section_name} generation...")
-                except Exception as e:
-                    print(f"[WARN] OpenRouter failed (Attempt {attempt}): {e}")
-                
-                # Fallback to OpenAI GPT-4 if OpenRouter failed
-                if not code and openai_client:
-                    try:
-                        response = await openai_client.chat.completions.create(
-                            model="gpt-4",
-                            messages=[
-                                {"role": "system", "content": system_prompt},
-                                {"role": "user", "content": section_prompt}
-                            ],
-                            temperature=0.7 + (attempt * 0.1),
-                            max_tokens=3000  # Increased for complex sections
-                        )
-                        temp_code = response.choices[0].message.content
-                        
-                        # Validate
-                        is_valid, error_msg = validate_component_code(temp_code, section_name)
-                        if is_valid:
-                            code = temp_code
-                            print(f"[OK] Generated with OpenAI GPT-4 (fallback) - Attempt {attempt}")
-                        else:
-                            print(f"[WARN] OpenAI generated invalid code (Attempt {attempt}): {error_msg}")
-                    except Exception as e:
-                        print(f"[WARN] OpenAI failed (Attempt {attempt}): {e}")
-            
-            # Last resort: mock generation if all attempts failed
-            if not code:
-                print(f"[WARN] All AI generation attempts failed for {section_name}, using mock")
-                code = generate_mock_component(section_prompt)
-                # Mock should always be valid, but validate anyway
-                is_valid, error_msg = validate_component_code(code, section_name)
-                if not is_valid:
-                    print(f"[ERROR] Even mock generation failed validation: {error_msg}")
-                    # Create a minimal valid component
-                    code = f"""export function {section_name.replace(' ', '')}Section() {{
-  return (
-    <div className="py-16 px-4 text-center">
-      <h2 className="text-3xl font-bold mb-4">{section_name}</h2>
-      <p className="text-gray-600">This section is under construction.</p>
-    </div>
-  )
-}}"""
-            
-            # Final validation and cleaning
-            try:
-                code = clean_and_validate_code(code, section_name)
-                print(f"[OK] Section {section_name} validated ({len(code)} chars)")
-            except ValueError as e:
-                print(f"[ERROR] Final validation failed for {section_name}: {e}")
-                # Use fallback component
-                code = f"""export function {section_name.replace(' ', '')}Section() {{
-  return (
-    <div className="py-16 px-4 text-center bg-gray-50">
-      <h2 className="text-3xl font-bold mb-4">{section_name}</h2>
-      <p className="text-gray-600">Content generation in progress...</p>
-    </div>
-  )
-}}"""
-            
-            section_result = {
+                async with semaphore, section_scheduler.slot(request_id, section_info['order']):
+                    print(f"[PROCESSING] Generating {section_name}...")
+                    result = await SECTION_PIPELINE.run(SectionJob(
+                        name=section_name,
+                        prompt=section_info['prompt'],
+                        output_format=request.outputFormat,
+                        use_cache=not request.fresh,
+                        deadline=deadline
+                    ))
+                code = result.code
+                print(f"[OK] Section {section_name} complete ({result.provider}, {result.attempts} attempts)")
+            return {
                 "code": code,
                 "sectionName": section_name,
                 "componentType": section_info.get('type', 'section'),
                 "dependencies": [],
-                "requestId": request_id
+                "requestId": request_id,
+                "sectionOrder": section_info['order']
             }
-            
-            section_result['sectionOrder'] = section_info['order']
-            
-            sections.append(section_result)
-            print(f"[OK] Section {section_name} complete")
+        
+        sections = await asyncio.gather(*(generate_section(info) for info in section_prompts))
+        sections = sorted(sections, key=lambda section: section['sectionOrder'])
         
         print(f"[SUCCESS] All {len(sections)} sections generated successfully!")
         
@@ -616,7 +778,6 @@ async def generate_multi_section(request: ComponentRequest):
         
     except Exception as e:
         print(f"[ERROR] Error in multi-section generation: {str(e)}")
-        import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -626,26 +787,26 @@ async def generate_component_options():
     return Response(status_code=200, headers={
         "Access-Control-Allow-Origin": "*",
         "Access-Control-Allow-Methods": "POST, OPTIONS",
-        "Access-Control-Allow-Headers": "Content-Type",
+        "Access-Control-Allow-Headers": "Content-Type, X-Request-Deadline",
     })
 
 @app.post("/api/generate-component")
-async def generate_component(request: ComponentRequest):
+async def generate_component(
+    request: ComponentRequest,
+    x_request_deadline: Optional[str] = Header(default=None)
+):
     """
     Generate a React component using Component Generator Agent
     Now with OpenRouter support and TypeScript output!
+    
+    Bounded by DEADLINE_GENERATE_COMPONENT (or the X-Request-Deadline header)
     """
+    deadline = Deadline.for_endpoint("generate-component", x_request_deadline)
     try:
         request_id = str(uuid.uuid4())
         
         print(f"[RECEIVED] Received generation request: {request.prompt}")
         
-        # Import generation logic
-        from agents.component_generator_agent import generate_mock_component, extract_dependencies, detect_component_type, openai_client
-        from services.openrouter_client import openrouter_client
-        from prompts.landing_page_prompts import get_landing_page_system_prompt, get_component_system_prompt, detect_page_type
-        from prompts.typescript_prompts import get_typescript_landing_page_prompt, get_typescript_component_prompt
-        
         # Detect if this is a full page or single component
         is_landing_page = any(keyword in request.prompt.lower() for keyword in [
             'landing page', 'full page', 'complete page', 'entire page', 
@@ -669,39 +830,17 @@ async def generate_component(request: ComponentRequest):
         print(f"🎨 Output format: {request.outputFormat}")
         print(f"📄 Page type: {'Landing Page' if is_landing_page else 'Single Component'}")
         
-        # Try OpenRouter (Auto-select best model) first
-        code = None
-        try:
-            code = await openrouter_client.generate(
-                prompt=request.prompt,
-                system_prompt=system_prompt,
-                model="auto"  # Let OpenRouter choose the best model
-            )
-            print("[OK] Generated with OpenRouter (Auto-selected model)")
-        except Exception as e:
-            print(f"[WARN] OpenRouter failed: {e}")
-        
-        # Fallback to OpenAI GPT-4
-        if not code and openai_client:
-            try:
-                response = await openai_client.chat.completions.create(
-                    model="gpt-4",
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": request.prompt}
-                    ],
-                    temperature=0.7,
-                    max_tokens=3000
-                )
-                code = response.choices[0].message.content
-                print("[OK] Generated with OpenAI GPT-4 (fallback)")
-            except Exception as e:
-                print(f"[WARN] OpenAI failed: {e}")
-        
-        # Last resort: mock generation
-        if not code:
-            code = generate_mock_component(request.prompt)
-            print("[OK] Generated with mock fallback")
+        # OpenRouter, then OpenAI GPT-4, then mock generation
+        result = await COMPONENT_PIPELINE.run(SectionJob(
+            name="Component",
+            prompt=request.prompt,
+            output_format=request.outputFormat,
+            system_prompt=system_prompt,
+            use_cache=not request.fresh,
+            deadline=deadline
+        ))
+        code = result.code
+        print(f"[OK] Generated with {result.provider}")
         
         # Extract component metadata
         dependencies = extract_dependencies(code)
@@ -718,7 +857,6 @@ async def generate_component(request: ComponentRequest):
         
     except Exception as e:
         print(f"[ERROR] Error generating component: {str(e)}")
-        import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -783,7 +921,6 @@ async def export_project(request: ProjectExportRequest):
         
     except Exception as e:
         print(f"[ERROR] Error exporting project: {str(e)}")
-        import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -800,41 +937,49 @@ async def optimize_with_gaze_options():
 async def optimize_with_gaze(request: OptimizationRequest):
     """
     Optimize a component using gaze data via Gaze Optimizer Agent
+    (in-process when the agent is co-located, uagents query otherwise)
     """
+    if not AGENTS_ENABLED:
+        raise HTTPException(status_code=503, detail="Gaze optimization needs the agents (AGENTS_ENABLED=false)")
+    
     try:
         request_id = str(uuid.uuid4())
         
         print(f"[STATS] Received optimization request for component: {request.componentId}")
         print(f"   Gaze points: {len(request.gazeData)}")
         
-        # Direct agent logic call (simplified for demo)
-        from agents.gaze_optimizer_agent import analyze_gaze_data, generate_optimization_suggestions, openai_client
-        
-        # Analyze gaze data
-        gaze_analysis = analyze_gaze_data([{
-            'x': p.x,
-            'y': p.y,
-            'timestamp': p.timestamp,
-            'confidence': p.confidence
-        } for p in request.gazeData])
-        
-        # Generate suggestions using OpenAI
-        suggestions = generate_optimization_suggestions(
-            component_code=request.currentCode,
-            gaze_analysis=gaze_analysis
+        message = GazeOptimizationRequest(
+            request_id=request_id,
+            component_id=request.componentId,
+            current_code=request.currentCode,
+            gaze_data=[GazePoint(x=p.x, y=p.y, timestamp=p.timestamp, confidence=p.confidence) for p in request.gazeData]
+        )
+        response = await agent_dispatcher.dispatch(
+            AGENT_ADDRESSES.get('gaze_optimizer'), message, GazeOptimizationResponse
         )
+        if response.error:
+            raise HTTPException(status_code=500, detail=response.error)
         
         return {
             "requestId": request_id,
             "componentId": request.componentId,
-            "gazeMetrics": gaze_analysis,
-            "suggestions": suggestions,
+            "gazeMetrics": {
+                "gazePoints": len(request.gazeData),
+                "heatmapZones": response.heatmap_zones
+            },
+            "suggestions": [suggestion.dict() for suggestion in response.suggestions],
+            "predictedImpact": response.predicted_impact,
+            "priority": response.priority,
             "success": True
         }
         
+    except HTTPException:
+        raise
+    except AgentDispatchError as e:
+        print(f"[ERROR] Gaze optimizer unreachable: {str(e)}")
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         print(f"[ERROR] Error optimizing component: {str(e)}")
-        import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -860,8 +1005,6 @@ async def generate_suggestions(request: SuggestionRequest):
         print(f"   Element text: '{request.elementText[:50]}...'")
         print(f"   Dwell time: {request.dwellTime:.2f}s")
         
-        from services.suggestion_generator import generate_suggestions as gen_suggestions
-        
         suggestions = await gen_suggestions(
             element_type=request.elementType,
             element_text=request.elementText,
@@ -882,7 +1025,6 @@ async def generate_suggestions(request: SuggestionRequest):
         
     except Exception as e:
         print(f"[ERROR] Error generating suggestions: {str(e)}")
-        import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -906,15 +1048,11 @@ async def apply_edit(request: ApplyEditRequest):
         
         print(f"[APPLY-EDIT] Applying edit to section {request.sectionId}")
         
-        from services.suggestion_generator import apply_suggestion_to_code
-        
         if request.customEdit:
             # Handle custom text edit
             print(f"   Custom edit: '{request.customEdit}'")
             
             # Use AI to interpret and apply custom edit
-            from agents.component_generator_agent import openai_client
-            
             if openai_client:
                 prompt = f"""Modify this React component based on the user's instruction: "{request.customEdit}"
 
@@ -966,7 +1104,6 @@ Apply the requested change and return ONLY the modified component code, no expla
         
     except Exception as e:
         print(f"[ERROR] Error applying edit: {str(e)}")
-        import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
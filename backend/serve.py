@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Multi-Worker Server - One agent host plus N stateless API workers
+Starts agent_host.py (the only process running the Fetch.ai agents) and
+then `uvicorn main:app --workers N`, with AGENT_HOST_URL pointing every
+worker at the host. Workers share the LLM cache's SQLite file; everything
+else they keep per process.
+
+Rate limits (OPENROUTER_RPM, OPENAI_TPM, ..._MAX_IN_FLIGHT, ...) are
+enforced by each process on its own, so N workers would send N times the
+configured rate. The configured values are totals: every process that
+calls the providers (the workers and the agent host) gets an equal share
+through its environment. Circuit breakers also trip per process.
+
+Usage (from backend/):
+    python serve.py --workers 4
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+from pathlib import Path
+from typing import Dict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from services.agent_host_client import DEFAULT_AGENT_HOST_URL, agent_bureau_port
+from services.rate_limiter import PROVIDER_LIMITS, provider_limit
+
+BACKEND_DIR = Path(__file__).parent
+
+def per_process_limits(processes: int) -> Dict[str, str]:
+    """Each process's share of the provider limits (at least 1 request in flight; 0 stays off)"""
+    limits = {}
+    for name in PROVIDER_LIMITS:
+        total = provider_limit(name)
+        if name.endswith("_MAX_IN_FLIGHT"):
+            limits[name] = str(max(int(total) // processes, 1))
+        else:
+            limits[name] = f"{total / processes:g}"
+    return limits
+
+def serve(workers: int, host: str, port: int):
+    """Run the agent host in a child process and the API workers in this one"""
+    import uvicorn
+
+    agents_enabled = os.getenv("AGENTS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+    # The agent host's component generator calls the providers too
+    limits = per_process_limits(workers + 1 if agents_enabled else workers)
+    os.environ.update(limits)
+    print(f"🚦 Provider limits per process: {', '.join(f'{name}={value}' for name, value in limits.items())}")
+
+    agent_host = None
+    if agents_enabled:
+        # Workers inherit the URL, so they wait for this host instead of starting a Bureau
+        os.environ.setdefault("AGENT_HOST_URL", DEFAULT_AGENT_HOST_URL)
+        # Agent requests from the workers go to the host's Bureau as uagents queries
+        bureau_port = agent_bureau_port(port)
+        os.environ["AGENT_BUREAU_PORT"] = str(bureau_port)
+        os.environ.setdefault("AGENT_QUERY_ENDPOINT", f"http://127.0.0.1:{bureau_port}/submit")
+        print(f"🤖 Starting agent host on {os.environ['AGENT_HOST_URL']}")
+        agent_host = subprocess.Popen([sys.executable, str(BACKEND_DIR / "agent_host.py")], cwd=BACKEND_DIR)
+
+    print(f"🌐 Starting {workers} API worker(s) on {host}:{port}")
+    try:
+        uvicorn.run("main:app", host=host, port=port, workers=workers, log_level="info", app_dir=str(BACKEND_DIR))
+    finally:
+        if agent_host is not None:
+            agent_host.terminate()
+            try:
+                agent_host.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                agent_host.kill()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--workers", type=int, default=int(os.getenv("API_WORKERS", str(os.cpu_count() or 1))),
+        help="API worker processes (default: API_WORKERS or the CPU count)"
+    )
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        serve(args.workers, args.host, args.port)
+    except KeyboardInterrupt:
+        print("\n🛑 Shutting down...")
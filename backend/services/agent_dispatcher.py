@@ -0,0 +1,149 @@
+"""
+Agent Dispatcher - Deliver agent requests in-process or over uagents
+When an agent runs in this process, its message handler is called
+directly: the request Model goes in, the reply the handler sends comes
+back, and nothing is serialised. Otherwise (API workers in front of
+agent_host.py) the request goes out with uagents.query and the reply
+envelope is decoded.
+
+AGENT_DISPATCH_MODE:
+- auto: in-process when a handler is registered, uagents.query otherwise
+- local: in-process only (error if the agent is not co-located)
+- query: always uagents.query (the old round trip, e.g. for comparison)
+
+AGENT_QUERY_ENDPOINT sends queries straight to a Bureau's submit URL
+(e.g. http://127.0.0.1:8010/submit for the agent host's Bureau) instead
+of resolving agent addresses through the Almanac.
+"""
+
+import os
+import time
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+AGENT_DISPATCH_MODE = os.getenv("AGENT_DISPATCH_MODE", "auto").lower()
+AGENT_DISPATCH_MODES = ("auto", "local", "query")
+AGENT_QUERY_TIMEOUT = int(os.getenv("AGENT_QUERY_TIMEOUT", "30"))  # seconds
+AGENT_QUERY_ENDPOINT = os.getenv("AGENT_QUERY_ENDPOINT", "")
+
+# Sender address in-process handlers see (their reply is captured, not sent)
+DISPATCHER_SENDER = "agent-dispatcher"
+
+
+class AgentDispatchError(Exception):
+    """The agent could not be reached or sent no reply"""
+    pass
+
+
+class LocalContext:
+    """Stand-in for uagents' Context when a handler runs in-process: captures the reply"""
+
+    def __init__(self, agent_name: str):
+        self.logger = logging.getLogger(agent_name)
+        self.reply: Optional[Any] = None
+
+    async def send(self, destination: str, message: Any, **kwargs):
+        self.reply = message
+
+
+class EndpointResolver:
+    """uagents resolver that maps every address to one fixed endpoint (no Almanac lookup)"""
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+
+    async def resolve(self, destination: str) -> Tuple[Optional[str], List[str]]:
+        return destination, [self.endpoint]
+
+
+class AgentDispatcher:
+    """Route agent requests to a co-located handler or over uagents.query"""
+
+    def __init__(
+        self,
+        mode: str = AGENT_DISPATCH_MODE,
+        query_timeout: int = AGENT_QUERY_TIMEOUT,
+        query_endpoint: str = AGENT_QUERY_ENDPOINT
+    ):
+        if mode not in AGENT_DISPATCH_MODES:
+            print(f"[WARN] Unknown AGENT_DISPATCH_MODE '{mode}', using 'auto'")
+            mode = "auto"
+        self.mode = mode
+        self.query_timeout = query_timeout
+        self.query_endpoint = query_endpoint
+        self._handlers: Dict[type, Tuple[str, Callable]] = {}  # request model -> (agent name, handler)
+        self._stats = {
+            path: {"messages": 0, "errors": 0, "total_ms": 0.0}
+            for path in ("local", "query")
+        }
+
+    def register(self, agent_name: str, request_model: type, handler: Callable):
+        """Make an agent's message handler callable in-process (the agent is co-located)"""
+        self._handlers[request_model] = (agent_name, handler)
+
+    def is_local(self, request_model: type) -> bool:
+        return self.mode != "query" and request_model in self._handlers
+
+    async def dispatch(self, destination: Optional[str], message: Any, response_model: type) -> Any:
+        """Deliver a request to an agent and return its reply (an instance of response_model)"""
+        path = "local" if self.is_local(type(message)) else "query"
+        if path == "query" and self.mode == "local":
+            raise AgentDispatchError(f"No in-process handler for {type(message).__name__} (AGENT_DISPATCH_MODE=local)")
+
+        started = time.perf_counter()
+        try:
+            if path == "local":
+                reply = await self._dispatch_local(message)
+            else:
+                reply = await self._dispatch_query(destination, message, response_model)
+        except Exception:
+            self._stats[path]["errors"] += 1
+            raise
+        finally:
+            self._stats[path]["messages"] += 1
+            self._stats[path]["total_ms"] += (time.perf_counter() - started) * 1000
+        return reply
+
+    async def _dispatch_local(self, message: Any) -> Any:
+        agent_name, handler = self._handlers[type(message)]
+        ctx = LocalContext(agent_name)
+        await handler(ctx, DISPATCHER_SENDER, message)
+        if ctx.reply is None:
+            raise AgentDispatchError(f"{agent_name} sent no reply to {type(message).__name__}")
+        return ctx.reply
+
+    async def _dispatch_query(self, destination: Optional[str], message: Any, response_model: type) -> Any:
+        if not destination:
+            raise AgentDispatchError(f"No agent address for {type(message).__name__}")
+        # Only the fallback needs the uagents messaging stack
+        from uagents.query import query
+
+        resolver = EndpointResolver(self.query_endpoint) if self.query_endpoint else None
+        envelope = await query(destination, message, resolver=resolver, timeout=self.query_timeout)
+        # Envelope on success; None (older uagents) or a MsgStatus on failure
+        if not hasattr(envelope, "decode_payload"):
+            raise AgentDispatchError(f"uagents query to {destination} failed: {envelope}")
+        return response_model.parse_raw(envelope.decode_payload())
+
+    def get_stats(self) -> Dict:
+        """Mode, co-located request models and per-path message counts and mean latency"""
+        return {
+            "mode": self.mode,
+            "local_models": sorted(model.__name__ for model in self._handlers),
+            "query_endpoint": self.query_endpoint or None,
+            **{
+                path: {
+                    "messages": stats["messages"],
+                    "errors": stats["errors"],
+                    "avg_ms": round(stats["total_ms"] / stats["messages"], 3) if stats["messages"] else None
+                }
+                for path, stats in self._stats.items()
+            }
+        }
+
+
+# Singleton instance
+agent_dispatcher = AgentDispatcher()
@@ -0,0 +1,119 @@
+"""
+Agent Host Client - API workers talking to the shared agent process
+`uvicorn --workers N` cannot run the agents in every worker (each would
+start its own Bureau and bind the agent ports). With AGENT_HOST_URL set,
+the agents run once in agent_host.py and every worker asks that process,
+over a Unix socket or localhost, whether the agents are up and where
+they are.
+
+AGENT_HOST_URL is either unix:///path/to/socket or http://127.0.0.1:<port>.
+"""
+
+import os
+import time
+import asyncio
+import httpx
+from typing import Dict, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+AGENT_HOST_URL = os.getenv("AGENT_HOST_URL", "")
+DEFAULT_AGENT_HOST_URL = "unix:///tmp/clientsight-agent-host.sock"
+AGENT_HOST_TIMEOUT = float(os.getenv("AGENT_HOST_TIMEOUT", "2"))  # seconds per status request
+AGENT_HOST_POLL_INTERVAL = 0.1  # seconds between status checks while waiting
+# The Bureau's HTTP server only talks to this machine; by default it sits
+# this far above the API port (past the agents' own 8001/8002)
+AGENT_BUREAU_HOST = os.getenv("AGENT_BUREAU_HOST", "127.0.0.1")
+AGENT_BUREAU_PORT_OFFSET = 10
+
+
+def agent_bureau_port(api_port: int) -> int:
+    """AGENT_BUREAU_PORT, or the API port + AGENT_BUREAU_PORT_OFFSET; never the API port itself"""
+    port = int(os.getenv("AGENT_BUREAU_PORT") or api_port + AGENT_BUREAU_PORT_OFFSET)
+    if port == api_port:
+        print(f"[WARN] AGENT_BUREAU_PORT {port} is the API port, using {api_port + AGENT_BUREAU_PORT_OFFSET}")
+        port = api_port + AGENT_BUREAU_PORT_OFFSET
+    return port
+
+
+def parse_host_url(url: str) -> Dict:
+    """{"uds": path} for unix:// URLs, {"host": ..., "port": ...} for http:// URLs"""
+    if url.startswith("unix://"):
+        return {"uds": url[len("unix://"):]}
+    parsed = httpx.URL(url)
+    return {"host": parsed.host, "port": parsed.port or 80}
+
+
+class AgentHostClient:
+    """Status of the agents running in the agent host process"""
+
+    def __init__(self, url: str = AGENT_HOST_URL):
+        self.url = url
+        self.enabled = bool(url)
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self.last_status: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.waited: Optional[float] = None  # Seconds startup spent waiting
+        self._stats = {"requests": 0, "failures": 0}
+
+    async def start(self):
+        """Open the IPC client (called on FastAPI startup)"""
+        if self._http_client is None and self.enabled:
+            target = parse_host_url(self.url)
+            if "uds" in target:
+                transport = httpx.AsyncHTTPTransport(uds=target["uds"])
+                self._http_client = httpx.AsyncClient(
+                    transport=transport, base_url="http://agent-host", timeout=AGENT_HOST_TIMEOUT
+                )
+            else:
+                self._http_client = httpx.AsyncClient(base_url=self.url, timeout=AGENT_HOST_TIMEOUT)
+
+    async def close(self):
+        """Close the IPC client (called on FastAPI shutdown)"""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+    async def status(self) -> Optional[Dict]:
+        """Fetch the host's agent status; None while the host is unreachable"""
+        await self.start()
+        self._stats["requests"] += 1
+        try:
+            response = await self._http_client.get("/status")
+            response.raise_for_status()
+            self.last_status = response.json()
+            self.error = None
+        except (httpx.HTTPError, ValueError) as e:
+            self._stats["failures"] += 1
+            self.last_status = None
+            self.error = str(e) or type(e).__name__
+        return self.last_status
+
+    async def is_ready(self) -> bool:
+        status = await self.status()
+        return bool(status and status.get("ready"))
+
+    async def wait(self, timeout: float) -> Dict[str, str]:
+        """Wait until the host reports every agent ready; returns the agent addresses known by then"""
+        started = time.monotonic()
+        while not await self.is_ready() and time.monotonic() - started < timeout:
+            await asyncio.sleep(AGENT_HOST_POLL_INTERVAL)
+        self.waited = time.monotonic() - started
+        return (self.last_status or {}).get("addresses", {})
+
+    def get_stats(self) -> Dict:
+        """Host URL, its last reported agent status and IPC request counts"""
+        return {
+            "url": self.url,
+            "enabled": self.enabled,
+            "ready": bool(self.last_status and self.last_status.get("ready")),
+            "status": self.last_status,
+            "error": self.error,
+            "startup_wait": round(self.waited, 3) if self.waited is not None else None,
+            **self._stats
+        }
+
+
+# Singleton instance
+agent_host = AgentHostClient()
@@ -0,0 +1,82 @@
+"""
+Agent Readiness - Wait for the Bureau's agents instead of sleeping
+The Bureau runs on a daemon thread with its own event loop. Each agent's
+startup handler calls mark_ready() from that thread; FastAPI's startup
+waits for all expected agents (at most AGENT_STARTUP_TIMEOUT seconds)
+and /readyz reports them.
+
+A crash of the Bureau thread is recorded with mark_failed(), which ends
+the wait at once instead of at the timeout.
+"""
+
+import os
+import time
+import asyncio
+import threading
+from typing import Dict, Iterable, List, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+AGENT_STARTUP_TIMEOUT = float(os.getenv("AGENT_STARTUP_TIMEOUT", "10"))  # seconds
+READINESS_POLL_INTERVAL = 0.05  # seconds between checks while waiting
+
+
+class AgentReadiness:
+    """Thread-safe record of which agents have started"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._expected: List[str] = []
+        self._ready: Dict[str, float] = {}  # agent name -> seconds after expect()
+        self._started_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self.waited: Optional[float] = None  # Seconds startup spent waiting
+
+    def expect(self, names: Iterable[str]):
+        """Agents startup should wait for (call before starting the Bureau)"""
+        with self._lock:
+            self._expected = list(names)
+            self._started_at = time.monotonic()
+
+    def mark_ready(self, name: str):
+        """Called by an agent's startup handler (on the Bureau thread)"""
+        with self._lock:
+            started_at = self._started_at if self._started_at is not None else time.monotonic()
+            self._ready.setdefault(name, time.monotonic() - started_at)
+
+    def mark_failed(self, error: str):
+        """The Bureau stopped; agents that have not started never will"""
+        with self._lock:
+            self.error = error
+
+    def missing(self) -> List[str]:
+        with self._lock:
+            return [name for name in self._expected if name not in self._ready]
+
+    def is_ready(self) -> bool:
+        return self.error is None and not self.missing()
+
+    async def wait(self, timeout: float = AGENT_STARTUP_TIMEOUT) -> bool:
+        """Wait until every expected agent is ready; False on timeout or Bureau failure"""
+        started = time.monotonic()
+        while not self.is_ready() and self.error is None and time.monotonic() - started < timeout:
+            await asyncio.sleep(READINESS_POLL_INTERVAL)
+        self.waited = time.monotonic() - started
+        return self.is_ready()
+
+    def get_stats(self) -> Dict:
+        """Expected/ready agents, their startup times and any Bureau error"""
+        with self._lock:
+            ready = {name: round(seconds, 3) for name, seconds in self._ready.items()}
+        return {
+            "ready": self.is_ready(),
+            "agents": ready,
+            "missing": self.missing(),
+            "error": self.error,
+            "startup_wait": round(self.waited, 3) if self.waited is not None else None
+        }
+
+
+# Singleton instance
+agent_readiness = AgentReadiness()
@@ -0,0 +1,250 @@
+"""
+Circuit Breaker - Fail fast while an LLM provider or model is down
+Without a breaker every section waits out the full httpx timeout (twice,
+with retries) before falling back, so a degraded provider turns a page
+into minutes of waiting. Each provider and each model gets a breaker:
+
+- closed: calls pass; failures and timeouts are counted in a rolling window
+- open: calls fail immediately with CircuitOpenError for CIRCUIT_OPEN_SECONDS
+- half-open: a single probe call is let through; success closes the
+  breaker, failure re-opens it. A probe that ends without a verdict (429,
+  cancellation) is released so the next call can probe.
+"""
+
+import os
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CIRCUIT_ENABLED = os.getenv("CIRCUIT_ENABLED", "true").lower() in ("1", "true", "yes")
+CIRCUIT_FAILURE_RATE = float(os.getenv("CIRCUIT_FAILURE_RATE", "0.5"))
+CIRCUIT_MIN_CALLS = int(os.getenv("CIRCUIT_MIN_CALLS", "4"))
+CIRCUIT_WINDOW = int(os.getenv("CIRCUIT_WINDOW", "20"))
+# Timeouts are expensive (a full OPENROUTER_TIMEOUT each) so a few in a row open the breaker
+CIRCUIT_CONSECUTIVE_TIMEOUTS = int(os.getenv("CIRCUIT_CONSECUTIVE_TIMEOUTS", "2"))
+CIRCUIT_OPEN_SECONDS = float(os.getenv("CIRCUIT_OPEN_SECONDS", "30"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider/model whose breaker is open"""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"Circuit open for {name} (retry in {retry_in:.0f}s)")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker driven by error rate and timeouts"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = CIRCUIT_FAILURE_RATE,
+        min_calls: int = CIRCUIT_MIN_CALLS,
+        window: int = CIRCUIT_WINDOW,
+        consecutive_timeouts: int = CIRCUIT_CONSECUTIVE_TIMEOUTS,
+        open_seconds: float = CIRCUIT_OPEN_SECONDS
+    ):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.consecutive_timeouts = consecutive_timeouts
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probe_started: Optional[float] = None  # half-open probe in flight
+        self._outcomes = deque(maxlen=window)  # True if the call failed
+        self._timeouts_in_a_row = 0
+        self._stats = {
+            "calls": 0,
+            "failures": 0,
+            "timeouts": 0,
+            "rejected": 0,
+            "opened": 0
+        }
+
+    def available(self) -> bool:
+        """True if a call may go out now (claims nothing)"""
+        self._refresh()
+        if self.state == HALF_OPEN:
+            # One probe at a time; a probe that never reports back expires after open_seconds
+            return self.probe_started is None or time.monotonic() - self.probe_started >= self.open_seconds
+        return self.state == CLOSED
+
+    def allow(self) -> bool:
+        """True if a call may go out now (claims the probe when half-open)"""
+        if not self.available():
+            self._stats["rejected"] += 1
+            return False
+        if self.state == HALF_OPEN:
+            self.probe_started = time.monotonic()
+        return True
+
+    def check(self):
+        """Raise CircuitOpenError unless a call may go out now"""
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_in())
+
+    def release(self, probe_started: float):
+        """Free a half-open probe that ended without a success or failure"""
+        if self.state == HALF_OPEN and self.probe_started == probe_started:
+            self.probe_started = None
+
+    def retry_in(self) -> float:
+        """Seconds until the next probe is allowed"""
+        if self.state == CLOSED or (self.state == HALF_OPEN and self.probe_started is None):
+            return 0.0
+        started = self.opened_at if self.state == OPEN else self.probe_started
+        return max(started + self.open_seconds - time.monotonic(), 0.0)
+
+    def record_success(self):
+        self._stats["calls"] += 1
+        self._outcomes.append(False)
+        self._timeouts_in_a_row = 0
+        if self.state == HALF_OPEN:
+            self.state = CLOSED
+            self.probe_started = None
+            self._outcomes.clear()
+            print(f"[CIRCUIT] {self.name}: closed")
+
+    def record_failure(self, timeout: bool = False):
+        self._stats["calls"] += 1
+        self._stats["failures"] += 1
+        self._outcomes.append(True)
+        if timeout:
+            self._stats["timeouts"] += 1
+            self._timeouts_in_a_row += 1
+        else:
+            self._timeouts_in_a_row = 0
+
+        if self.state == HALF_OPEN:
+            self._open("probe failed")
+        elif self.state == CLOSED:
+            if self._timeouts_in_a_row >= self.consecutive_timeouts:
+                self._open(f"{self._timeouts_in_a_row} timeouts in a row")
+            elif len(self._outcomes) >= self.min_calls and self.error_rate() >= self.failure_rate:
+                self._open(f"error rate {self.error_rate():.0%}")
+
+    def error_rate(self) -> float:
+        return sum(self._outcomes) / len(self._outcomes) if self._outcomes else 0.0
+
+    def _refresh(self):
+        """Move open -> half-open once the pause is over"""
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.open_seconds:
+            self.state = HALF_OPEN
+            self.probe_started = None
+            print(f"[CIRCUIT] {self.name}: half-open, probing")
+
+    def _open(self, reason: str):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.probe_started = None
+        self._timeouts_in_a_row = 0
+        self._stats["opened"] += 1
+        print(f"[CIRCUIT] {self.name}: open for {self.open_seconds:.0f}s ({reason})")
+
+    def get_stats(self) -> Dict:
+        """State, window error rate and counters"""
+        self._refresh()
+        return {
+            **self._stats,
+            "state": self.state,
+            "error_rate": round(self.error_rate(), 3),
+            "retry_in": round(self.retry_in(), 1)
+        }
+
+
+class CircuitBreakers:
+    """Registry of breakers per provider and per (provider, model)"""
+
+    def __init__(self, enabled: bool = CIRCUIT_ENABLED):
+        self.enabled = enabled
+        self._providers: Dict[str, CircuitBreaker] = {}
+        self._models: Dict[str, Dict[str, CircuitBreaker]] = {}
+
+    def provider(self, provider: str) -> CircuitBreaker:
+        if provider not in self._providers:
+            self._providers[provider] = CircuitBreaker(provider)
+        return self._providers[provider]
+
+    def model(self, provider: str, model: str) -> CircuitBreaker:
+        models = self._models.setdefault(provider, {})
+        if model not in models:
+            models[model] = CircuitBreaker(f"{provider}/{model}")
+        return models[model]
+
+    def check(self, provider: str, model: str) -> List[Tuple[CircuitBreaker, float]]:
+        """
+        Raise CircuitOpenError if the provider or the model breaker is open
+
+        Both breakers are checked before either half-open probe is claimed,
+        so a rejection by one never strands the other's probe. Returns the
+        probes claimed; pass them to release() once the call is over.
+        """
+        if not self.enabled:
+            return []
+        breakers = (self.provider(provider), self.model(provider, model))
+        for breaker in breakers:
+            if not breaker.available():
+                breaker.check()  # Counts the rejection and raises
+        probes = []
+        for breaker in breakers:
+            breaker.check()
+            if breaker.state == HALF_OPEN:
+                probes.append((breaker, breaker.probe_started))
+        return probes
+
+    def release(self, probes: List[Tuple[CircuitBreaker, float]]):
+        """
+        End a call that check() let through (call it in a finally block)
+
+        No-op once record_success()/record_failure() settled the probes; frees
+        them after calls without a verdict (429s, cancellation).
+        """
+        for breaker, probe_started in probes:
+            breaker.release(probe_started)
+
+    def record_success(self, provider: str, model: str):
+        self.provider(provider).record_success()
+        self.model(provider, model).record_success()
+
+    def record_failure(self, provider: str, model: str, timeout: bool = False):
+        self.provider(provider).record_failure(timeout)
+        self.model(provider, model).record_failure(timeout)
+
+    def is_open(self, provider: str, model: Optional[str] = None) -> bool:
+        """True while calls would be rejected (without consuming a half-open probe)"""
+        if not self.enabled:
+            return False
+        if model is None:
+            breaker = self._providers.get(provider)
+        else:
+            breaker = self._models.get(provider, {}).get(model)
+        return breaker is not None and breaker.state != CLOSED and breaker.retry_in() > 0
+
+    def open_models(self, provider: str) -> List[str]:
+        """Models of a provider whose own breaker currently rejects calls"""
+        return [model for model in self._models.get(provider, {}) if self.is_open(provider, model)]
+
+    def get_stats(self) -> Dict:
+        """Breaker state per provider and model for the health endpoint"""
+        return {
+            "enabled": self.enabled,
+            "providers": {name: breaker.get_stats() for name, breaker in self._providers.items()},
+            "models": {
+                provider: {model: breaker.get_stats() for model, breaker in models.items()}
+                for provider, models in self._models.items()
+            }
+        }
+
+
+# Singleton instance
+circuit_breakers = CircuitBreakers()
@@ -0,0 +1,174 @@
+"""
+Code Repair - Fix code that failed validation instead of regenerating it
+A failed validation used to cost a full new attempt: the section prompt
+and the long component system prompt again, plus up to max_tokens of
+completion. The repair step runs first:
+
+1. local fixes for common shapes the validator rejects (bare JSX, an
+   anonymous default export, an arrow component with an implicit return)
+2. otherwise a short repair request to a fast model (REPAIR_MODEL): only
+   the failing code, the validator error and a brief instruction
+
+The repaired code is validated again; a full regeneration only happens
+when the repair fails. Success rate and the tokens saved compared to a
+regeneration are reported for /api/stats.
+"""
+
+import os
+import re
+from typing import Dict, Optional
+from dotenv import load_dotenv
+
+from utils.code_validator import validate_component_code
+from utils.code_extractor import extract_code
+from .openrouter_client import openrouter_client
+from .deadline import Deadline
+
+load_dotenv()
+
+REPAIR_ENABLED = os.getenv("REPAIR_ENABLED", "true").lower() in ("1", "true", "yes")
+REPAIR_MODEL = os.getenv("REPAIR_MODEL", "gemini-2.5-flash")  # Key in OpenRouterClient.MODELS
+REPAIR_MAX_TOKENS = int(os.getenv("REPAIR_MAX_TOKENS", "2000"))
+REPAIR_MIN_CHARS = 50  # Shorter output has nothing worth repairing
+CHARS_PER_TOKEN = 4
+
+_BARE_JSX = re.compile(r'\s*<')
+_ANONYMOUS_DEFAULT = re.compile(r'export\s+default\s+function\s*\(')
+_ARROW_IMPLICIT = re.compile(
+    r'\s*(?:export\s+)?const\s+(\w+)\s*=\s*\(([^)]*)\)\s*(?::\s*[\w.]+\s*)?=>\s*\((?P<body>.*)\)\s*;?\s*$',
+    re.DOTALL
+)
+
+
+def _component_name(section_name: str) -> str:
+    return f"{re.sub(r'[^A-Za-z0-9]', '', section_name) or 'Generated'}Section"
+
+
+def fix_locally(code: str, section_name: str) -> Optional[str]:
+    """Rewrite a known invalid shape into a declared, exported component (None if none applies)"""
+    name = _component_name(section_name)
+    if _BARE_JSX.match(code):
+        body = "\n".join(f"    {line}" for line in code.strip().splitlines())
+        return f"export function {name}() {{\n  return (\n{body}\n  )\n}}"
+    if _ANONYMOUS_DEFAULT.search(code):
+        return _ANONYMOUS_DEFAULT.sub(f"export function {name}(", code, count=1)
+    match = _ARROW_IMPLICIT.match(code)
+    if match:
+        component, params, body = match.group(1), match.group(2), match.group("body").rstrip()
+        return f"export function {component}({params}) {{\n  return ({body}\n  )\n}}"
+    return None
+
+
+def build_repair_prompts(code: str, error_msg: str, section_name: str, output_format: str):
+    """(system prompt, user prompt) for a model repair - a fraction of the generation prompts"""
+    if output_format == "typescript":
+        rules = "TypeScript React (TSX). Keep the existing imports and types."
+    else:
+        rules = "Vanilla React via CDN: no import statements, use React.useState, Tailwind classes only."
+    system_prompt = f"""You repair React components that failed an automatic check.
+Return ONLY the complete corrected component - no explanations, no markdown fences.
+Keep the design and content; change only what the error requires.
+The component must be declared as: export function {_component_name(section_name)}() {{ return ( ... ) }}
+{rules}"""
+    prompt = f"Check failed: {error_msg}\n\n{section_name} section component:\n{code}"
+    return system_prompt, prompt
+
+
+class CodeRepairer:
+    """Local fixes first, then one cheap model call; tracks success rate and tokens saved"""
+
+    def __init__(self, enabled: bool = REPAIR_ENABLED, model: str = REPAIR_MODEL, max_tokens: int = REPAIR_MAX_TOKENS):
+        self.enabled = enabled
+        self.model = model
+        self.max_tokens = max_tokens
+        self._stats = {
+            "attempts": 0,
+            "local_repaired": 0,
+            "model_repaired": 0,
+            "failed": 0,
+            "skipped": 0,  # Too short to repair
+            "repair_tokens": 0,  # Estimated prompt + completion tokens of model repairs
+            "est_tokens_saved": 0  # Regeneration estimate minus repair tokens, over successful repairs
+        }
+
+    def _valid(self, code: Optional[str], section_name: str) -> bool:
+        return bool(code) and validate_component_code(code, section_name)[0]
+
+    async def repair(
+        self,
+        code: str,
+        error_msg: str,
+        section_name: str,
+        output_format: str,
+        regeneration_tokens: int,
+        use_cache: bool = True,
+        deadline: Optional[Deadline] = None
+    ) -> Optional[str]:
+        """
+        Return validated repaired code, or None if a full regeneration is needed
+
+        regeneration_tokens is the caller's estimate of what a new attempt
+        would cost (prompt plus completion).
+        """
+        if not self.enabled:
+            return None
+        if not code or len(code.strip()) < REPAIR_MIN_CHARS:
+            self._stats["skipped"] += 1
+            return None
+        self._stats["attempts"] += 1
+
+        fixed = fix_locally(code, section_name)
+        if self._valid(fixed, section_name):
+            self._stats["local_repaired"] += 1
+            self._stats["est_tokens_saved"] += regeneration_tokens
+            print(f"[REPAIR] Fixed {section_name} locally ({error_msg})")
+            return fixed
+
+        if not openrouter_client.is_available():
+            self._stats["failed"] += 1
+            return None
+
+        system_prompt, prompt = build_repair_prompts(code, error_msg, section_name, output_format)
+        max_tokens = min(self.max_tokens, len(code) // CHARS_PER_TOKEN + 500)
+        try:
+            response = await openrouter_client.generate(
+                prompt=prompt,
+                system_prompt=system_prompt,
+                model=self.model,
+                temperature=0.2,
+                max_tokens=max_tokens,
+                use_cache=use_cache,
+                deadline=deadline
+            )
+        except Exception as e:
+            print(f"[REPAIR] Repair request for {section_name} failed: {e}")
+            self._stats["failed"] += 1
+            return None
+
+        repaired = extract_code(response)
+        repair_tokens = (len(system_prompt) + len(prompt) + len(response)) // CHARS_PER_TOKEN
+        self._stats["repair_tokens"] += repair_tokens
+        if not self._valid(repaired, section_name):
+            print(f"[REPAIR] Repaired {section_name} still invalid - regenerating")
+            self._stats["failed"] += 1
+            return None
+
+        self._stats["model_repaired"] += 1
+        self._stats["est_tokens_saved"] += max(regeneration_tokens - repair_tokens, 0)
+        print(f"[REPAIR] Fixed {section_name} with {self.model} (~{repair_tokens} tokens)")
+        return repaired
+
+    def get_stats(self) -> Dict:
+        """Repair outcomes, success rate and estimated tokens saved"""
+        attempts = self._stats["attempts"]
+        repaired = self._stats["local_repaired"] + self._stats["model_repaired"]
+        return {
+            **self._stats,
+            "enabled": self.enabled,
+            "model": self.model,
+            "success_rate": round(repaired / attempts, 3) if attempts else 0.0
+        }
+
+
+# Singleton instance
+code_repairer = CodeRepairer()
@@ -0,0 +1,125 @@
+"""
+Request Deadlines - One time budget per request, shared by every stage
+Without a budget the per-attempt timeouts stack up across OpenRouter
+retries, the OpenAI fallback and mock generation. A Deadline is created
+when a request arrives (per-endpoint default, overridable with the
+X-Request-Deadline header) and every stage consults it:
+
+- timeouts shrink to the remaining budget
+- max_tokens shrinks to what the model can produce in the remaining budget
+- attempts that cannot finish are skipped (DeadlineExceeded)
+
+DEADLINE_RESERVE seconds are always kept back so the degraded result
+(mock section) is returned before the deadline instead of after it.
+"""
+
+import os
+import math
+import time
+import asyncio
+from typing import Awaitable, Dict, Optional, TypeVar
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Per-endpoint budgets in seconds
+DEADLINES = {
+    "generate-component": float(os.getenv("DEADLINE_GENERATE_COMPONENT", "45")),
+    "generate-multi-section": float(os.getenv("DEADLINE_GENERATE_MULTI_SECTION", "120")),
+    "generate-multi-section-stream": float(os.getenv("DEADLINE_GENERATE_MULTI_SECTION_STREAM", "120")),
+    "jobs": float(os.getenv("DEADLINE_JOBS", "120")),
+}
+DEADLINE_DEFAULT = float(os.getenv("DEADLINE_DEFAULT", "60"))
+DEADLINE_MAX = float(os.getenv("DEADLINE_MAX", "600"))  # Upper bound for header overrides
+DEADLINE_RESERVE = float(os.getenv("DEADLINE_RESERVE", "2"))  # Kept back for the degraded result
+DEADLINE_MIN_TOKENS = int(os.getenv("DEADLINE_MIN_TOKENS", "600"))  # Smallest useful completion
+DEADLINE_SAFETY = 0.8  # Only plan on 80% of the measured generation speed
+
+DEADLINE_HEADER = "X-Request-Deadline"
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(Exception):
+    """Not enough budget left for a stage to finish"""
+
+
+class Deadline:
+    """Absolute request deadline on the monotonic clock"""
+
+    def __init__(self, seconds: float, reserve: float = DEADLINE_RESERVE):
+        self.budget = seconds
+        self.reserve = min(reserve, seconds / 4)  # Short budgets still get time for real attempts
+        self.started = time.monotonic()
+        self.expires_at = self.started + seconds
+
+    @classmethod
+    def for_endpoint(cls, endpoint: str, header_value: Optional[str] = None) -> "Deadline":
+        """Budget for an endpoint, overridden by the X-Request-Deadline header (seconds)"""
+        seconds = DEADLINES.get(endpoint, DEADLINE_DEFAULT)
+        if header_value:
+            try:
+                value = float(header_value)
+                if not math.isfinite(value):  # "nan" and "inf" parse but are no budget
+                    raise ValueError(header_value)
+                seconds = min(max(value, 1.0), DEADLINE_MAX)
+            except ValueError:
+                print(f"[WARN] Ignoring invalid {DEADLINE_HEADER} header: {header_value!r}")
+        return cls(seconds)
+
+    def remaining(self) -> float:
+        """Seconds left until the deadline (never negative)"""
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def usable(self) -> float:
+        """Seconds left for upstream work once the reserve is kept back"""
+        return max(self.remaining() - self.reserve, 0.0)
+
+    def expired(self) -> bool:
+        """True once only the reserve is left"""
+        return self.usable() <= 0.0
+
+    def timeout(self, cap: Optional[float] = None) -> float:
+        """Timeout for the next stage: the usable budget, capped at the stage's own timeout"""
+        usable = self.usable()
+        return min(usable, cap) if cap is not None else usable
+
+    def fit_max_tokens(self, max_tokens: int, ttfb: float, tokens_per_sec: float) -> int:
+        """
+        Shrink max_tokens to what fits in the usable budget
+
+        Raises DeadlineExceeded if not even DEADLINE_MIN_TOKENS would fit,
+        so the caller skips the attempt instead of starting it.
+        """
+        generation_time = self.usable() - ttfb
+        fits = int(generation_time * tokens_per_sec * DEADLINE_SAFETY) if generation_time > 0 else 0
+        if fits < min(DEADLINE_MIN_TOKENS, max_tokens):
+            raise DeadlineExceeded(
+                f"{self.remaining():.1f}s left - not enough for a {min(DEADLINE_MIN_TOKENS, max_tokens)}-token completion"
+            )
+        if fits < max_tokens:
+            print(f"[DEADLINE] max_tokens {max_tokens} -> {fits} ({self.remaining():.1f}s left)")
+            return fits
+        return max_tokens
+
+    async def run(self, awaitable: Awaitable[T], cap: Optional[float] = None) -> T:
+        """Await a stage within the usable budget (raises DeadlineExceeded on timeout)"""
+        timeout = self.timeout(cap)
+        if timeout <= 0:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise DeadlineExceeded("Deadline reached before the stage started")
+        try:
+            return await asyncio.wait_for(awaitable, timeout)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(f"Stage cut off after {timeout:.1f}s to meet the deadline")
+
+    def to_dict(self) -> Dict:
+        return {
+            "budget": self.budget,
+            "elapsed": round(self.elapsed(), 3),
+            "remaining": round(self.remaining(), 3)
+        }
@@ -0,0 +1,132 @@
+"""
+Hedged Requests - Cut tail latency of section generation
+If an attempt has not produced valid code by a percentile of observed
+section latency, a backup request is launched on a second model. The
+first result that passes validation wins and the loser is cancelled.
+A primary that fails before the hedge delay (error or invalid output)
+launches the backup right away.
+"""
+
+import os
+import time
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Dict, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "false").lower() in ("1", "true", "yes")
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "0.9"))
+HEDGE_BACKUP_MODEL = os.getenv("HEDGE_BACKUP_MODEL", "gpt-4o")
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "10"))
+HEDGE_DEFAULT_DELAY = float(os.getenv("HEDGE_DEFAULT_DELAY", "15"))  # seconds, until enough samples
+HEDGE_WINDOW = int(os.getenv("HEDGE_WINDOW", "200"))
+
+# An attempt returns validated code, or None if its output failed validation
+Attempt = Callable[[], Awaitable[Optional[str]]]
+
+
+class HedgePolicy:
+    """Rolling latency window plus the hedge-or-wait decision"""
+
+    def __init__(
+        self,
+        enabled: bool = HEDGE_ENABLED,
+        percentile: float = HEDGE_PERCENTILE,
+        backup_model: str = HEDGE_BACKUP_MODEL,
+        min_samples: int = HEDGE_MIN_SAMPLES,
+        default_delay: float = HEDGE_DEFAULT_DELAY,
+        window: int = HEDGE_WINDOW
+    ):
+        self.enabled = enabled
+        self.percentile = percentile
+        self.backup_model = backup_model
+        self.min_samples = min_samples
+        self.default_delay = default_delay
+        self._latencies = deque(maxlen=window)
+        self._stats = {
+            "attempts": 0,
+            "hedged": 0,
+            "early_backups": 0,
+            "backup_wins": 0,
+            "primary_wins": 0
+        }
+
+    def record(self, latency: float):
+        """Record how long a successful section attempt took (seconds)"""
+        self._latencies.append(latency)
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait for the primary before launching the backup"""
+        if len(self._latencies) < self.min_samples:
+            return self.default_delay
+        ordered = sorted(self._latencies)
+        index = min(int(len(ordered) * self.percentile), len(ordered) - 1)
+        return ordered[index]
+
+    async def run(self, primary: Attempt, backup: Attempt) -> Optional[str]:
+        """
+        Run primary; if it is still going after hedge_delay(), race a backup
+
+        If the primary fails or returns invalid output first, the backup is
+        launched at once. Returns the first valid result, or None if every
+        launched attempt failed. The losing attempt is cancelled.
+        """
+        self._stats["attempts"] += 1
+        started = time.monotonic()
+        primary_task = asyncio.ensure_future(primary())
+        tasks = {primary_task}
+        backup_launched = False
+
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay())
+            if not done:
+                self._stats["hedged"] += 1
+                print(f"[HEDGE] No result after {time.monotonic() - started:.1f}s - launching backup on {self.backup_model}")
+                tasks.add(asyncio.ensure_future(backup()))
+                backup_launched = True
+
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = self._result(task)
+                    if result:
+                        self._stats["primary_wins" if task is primary_task else "backup_wins"] += 1
+                        self.record(time.monotonic() - started)
+                        return result
+                if not tasks and not backup_launched:
+                    # The primary failed before the hedge delay: the backup is the fallback
+                    self._stats["early_backups"] += 1
+                    print(f"[HEDGE] Primary failed after {time.monotonic() - started:.1f}s - launching backup on {self.backup_model}")
+                    tasks.add(asyncio.ensure_future(backup()))
+                    backup_launched = True
+            return None
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def _result(task: asyncio.Task) -> Optional[str]:
+        """A finished attempt's code, or None if it was cancelled, raised or was invalid"""
+        if task.cancelled():
+            return None
+        if task.exception() is not None:
+            print(f"[HEDGE] Attempt failed: {task.exception()}")
+            return None
+        return task.result()
+
+    def get_stats(self) -> Dict:
+        """Hedging counters and the current hedge delay"""
+        return {
+            **self._stats,
+            "enabled": self.enabled,
+            "percentile": self.percentile,
+            "backup_model": self.backup_model,
+            "hedge_delay": round(self.hedge_delay(), 2),
+            "samples": len(self._latencies)
+        }
+
+
+# Singleton instance
+hedge_policy = HedgePolicy()
@@ -0,0 +1,180 @@
+"""
+Job Store - Background page generations with resumable event logs
+A job runs a generation in the background, independent of any HTTP
+response, and records every event it produces under an increasing id.
+Clients read the log over SSE and, after a dropped connection, resume
+with Last-Event-ID: completed sections are replayed from memory, so a
+reconnect costs no extra LLM calls.
+
+Bounded: at most JOB_STORE_MAX_JOBS jobs are kept. Finished jobs expire
+after JOB_TTL_SECONDS and the oldest finished job is evicted first; when
+every slot holds a running job, new jobs are rejected.
+"""
+
+import os
+import time
+import uuid
+import asyncio
+from bisect import bisect_right
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+JOB_STORE_MAX_JOBS = int(os.getenv("JOB_STORE_MAX_JOBS", "100"))
+JOB_TTL_SECONDS = float(os.getenv("JOB_TTL_SECONDS", "3600"))  # Finished jobs are kept this long
+
+
+class JobLimitError(Exception):
+    """Every job slot is held by a running job"""
+
+
+class Job:
+    """One background generation and its event log"""
+
+    def __init__(self, job_id: str):
+        self.id = job_id
+        self.status = "running"  # running, completed, failed or cancelled
+        self.created = time.time()
+        self.finished_at: Optional[float] = None  # Monotonic, for expiry
+        self.events: List[Tuple[int, Dict]] = []  # (event id, event), ids ascending
+        self.last_event_id = 0
+        self.changed = asyncio.Condition()
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status != "running"
+
+    async def append(self, event: Dict):
+        """Record an event and wake up every reader"""
+        async with self.changed:
+            if event.get("type") == "section_complete":
+                # The final code supersedes the section's token deltas
+                self.events = [
+                    (event_id, logged) for event_id, logged in self.events
+                    if not (logged.get("type") == "section_delta" and logged.get("section") == event.get("section"))
+                ]
+            self.last_event_id += 1
+            self.events.append((self.last_event_id, event))
+            self.changed.notify_all()
+
+    async def finish(self, status: str):
+        async with self.changed:
+            self.status = status
+            self.finished_at = time.monotonic()
+            self.changed.notify_all()
+
+    async def events_after(self, last_event_id: int = 0) -> AsyncIterator[Tuple[int, Dict]]:
+        """Replay logged events after last_event_id, then tail the log until the job is done"""
+        position = last_event_id
+        while True:
+            async with self.changed:
+                await self.changed.wait_for(lambda: self.last_event_id > position or self.done)
+                start = bisect_right(self.events, position, key=lambda logged: logged[0])
+                batch = self.events[start:]
+                finished = self.done
+            for event_id, event in batch:
+                position = event_id
+                yield event_id, event
+            if finished:
+                break
+
+    def to_dict(self) -> Dict:
+        return {
+            "jobId": self.id,
+            "status": self.status,
+            "lastEventId": self.last_event_id,
+            "eventsUrl": f"/api/jobs/{self.id}/events"
+        }
+
+
+class JobStore:
+    """Bounded in-memory registry of background jobs"""
+
+    def __init__(self, max_jobs: int = JOB_STORE_MAX_JOBS, ttl: float = JOB_TTL_SECONDS):
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self._jobs: Dict[str, Job] = {}  # Insertion order = creation order
+        self._stats = {
+            "created": 0,
+            "rejected": 0,
+            "evicted": 0,
+            "expired": 0,
+            "resumed": 0,  # Event streams opened with a Last-Event-ID
+            "replayed_events": 0  # Events served from the log on resumed streams
+        }
+
+    def create(self, make_events: Callable[[str], AsyncIterator[Dict]]) -> Job:
+        """
+        Start a job that logs every event of make_events(job_id)
+
+        Raises JobLimitError if the store is full of running jobs.
+        """
+        self._expire()
+        if len(self._jobs) >= self.max_jobs and not self._evict_oldest_finished():
+            self._stats["rejected"] += 1
+            raise JobLimitError(f"{len(self._jobs)} jobs are still running")
+
+        job = Job(str(uuid.uuid4()))
+        self._jobs[job.id] = job
+        self._stats["created"] += 1
+        job.task = asyncio.create_task(self._run(job, make_events(job.id)))
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._expire()
+        return self._jobs.get(job_id)
+
+    def record_replay(self, events: int):
+        """Count a resumed event stream and how many events it was sent from the log"""
+        self._stats["resumed"] += 1
+        self._stats["replayed_events"] += events
+
+    async def _run(self, job: Job, events: AsyncIterator[Dict]):
+        """Drain the generation into the job's log"""
+        status = "completed"
+        try:
+            async for event in events:
+                await job.append(event)
+        except asyncio.CancelledError:
+            status = "cancelled"
+            raise
+        except Exception as e:
+            print(f"[JOBS] Job {job.id} failed: {e}")
+            status = "failed"
+            await job.append({"type": "error", "message": str(e)})
+        finally:
+            await job.finish(status)
+            print(f"[JOBS] Job {job.id} {status} ({job.last_event_id} events)")
+
+    def _expire(self):
+        now = time.monotonic()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and now - job.finished_at > self.ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+        self._stats["expired"] += len(expired)
+
+    def _evict_oldest_finished(self) -> bool:
+        for job_id, job in self._jobs.items():
+            if job.done:
+                del self._jobs[job_id]
+                self._stats["evicted"] += 1
+                return True
+        return False
+
+    def get_stats(self) -> Dict:
+        """Job counts and replay counters for monitoring"""
+        return {
+            **self._stats,
+            "jobs": len(self._jobs),
+            "running": sum(1 for job in self._jobs.values() if not job.done),
+            "max_jobs": self.max_jobs
+        }
+
+
+# Singleton instance
+job_store = JobStore()
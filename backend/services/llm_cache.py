@@ -0,0 +1,254 @@
+"""
+LLM Response Cache - Content-addressed cache for completions
+Identical section prompts (same model, prompts and sampling settings)
+are served from cache instead of being regenerated from scratch.
+
+Two tiers:
+- Memory: bounded LRU, per process, no I/O
+- Disk: SQLite file with TTL, survives restarts
+"""
+
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import asyncio
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Dict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+CACHE_DISK_ENABLED = os.getenv("LLM_CACHE_DISK", "true").lower() in ("1", "true", "yes")
+CACHE_PATH = os.getenv("LLM_CACHE_PATH", str(Path(__file__).parent.parent / ".cache" / "llm_cache.sqlite3"))
+CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "256"))
+CACHE_MAX_DISK_ENTRIES = int(os.getenv("LLM_CACHE_MAX_DISK_ENTRIES", "5000"))
+CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "86400"))  # seconds
+
+
+def make_cache_key(
+    model_id: str,
+    system_prompt: str,
+    prompt: str,
+    temperature: float,
+    max_tokens: int
+) -> str:
+    """Hash everything that determines a completion into a stable key"""
+    material = json.dumps(
+        [model_id, system_prompt, prompt, round(float(temperature), 4), int(max_tokens)],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """Memory LRU in front of an optional SQLite tier, both with TTL"""
+
+    def __init__(
+        self,
+        enabled: bool = CACHE_ENABLED,
+        disk_enabled: bool = CACHE_DISK_ENABLED,
+        path: str = CACHE_PATH,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        max_disk_entries: int = CACHE_MAX_DISK_ENTRIES,
+        ttl: float = CACHE_TTL
+    ):
+        self.enabled = enabled
+        self.disk_enabled = enabled and disk_enabled
+        self.path = path
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl = ttl
+
+        # key -> (stored_at, content)
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0
+        }
+
+    # ---- Public API -------------------------------------------------------
+
+    async def start(self):
+        """Open the SQLite tier before the first request (called on FastAPI startup)"""
+        if self.disk_enabled:
+            await asyncio.to_thread(self._open)
+
+    def is_ready(self) -> bool:
+        """True once every enabled tier can serve requests"""
+        return not self.disk_enabled or self._db is not None
+
+    async def get(
+        self,
+        model_id: str,
+        system_prompt: str,
+        prompt: str,
+        temperature: float,
+        max_tokens: int
+    ) -> Optional[str]:
+        """Return a cached completion or None"""
+        if not self.enabled:
+            return None
+
+        key = make_cache_key(model_id, system_prompt, prompt, temperature, max_tokens)
+
+        entry = self._memory.get(key)
+        if entry is not None:
+            stored_at, content = entry
+            if time.time() - stored_at < self.ttl:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                print(f"[CACHE] Memory hit for {model_id} ({len(content)} chars)")
+                return content
+            del self._memory[key]
+
+        if self.disk_enabled:
+            row = await asyncio.to_thread(self._disk_get, key)
+            if row is not None:
+                stored_at, content = row
+                self._remember(key, stored_at, content)
+                self._stats["disk_hits"] += 1
+                print(f"[CACHE] Disk hit for {model_id} ({len(content)} chars)")
+                return content
+
+        self._stats["misses"] += 1
+        return None
+
+    async def set(
+        self,
+        model_id: str,
+        system_prompt: str,
+        prompt: str,
+        temperature: float,
+        max_tokens: int,
+        content: str
+    ):
+        """Store a completion in both tiers"""
+        if not self.enabled or not content:
+            return
+
+        key = make_cache_key(model_id, system_prompt, prompt, temperature, max_tokens)
+        stored_at = time.time()
+        self._remember(key, stored_at, content)
+        self._stats["stores"] += 1
+
+        if self.disk_enabled:
+            await asyncio.to_thread(self._disk_set, key, stored_at, content)
+
+    async def evict(
+        self,
+        model_id: str,
+        system_prompt: str,
+        prompt: str,
+        temperature: float,
+        max_tokens: int
+    ):
+        """Drop an entry, e.g. when the cached completion failed validation"""
+        if not self.enabled:
+            return
+
+        key = make_cache_key(model_id, system_prompt, prompt, temperature, max_tokens)
+        self._memory.pop(key, None)
+        if self.disk_enabled:
+            await asyncio.to_thread(self._disk_delete, key)
+
+    def get_stats(self) -> Dict:
+        """Hit/miss counters for monitoring"""
+        hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+        lookups = hits + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_ratio": round(hits / lookups, 3) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "enabled": self.enabled,
+            "disk_enabled": self.disk_enabled
+        }
+
+    # ---- Memory tier ------------------------------------------------------
+
+    def _remember(self, key: str, stored_at: float, content: str):
+        """Insert into the LRU, evicting the least recently used entries"""
+        self._memory[key] = (stored_at, content)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    # ---- Disk tier (runs in a worker thread) ------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS completions ("
+                "key TEXT PRIMARY KEY, stored_at REAL NOT NULL, content TEXT NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_stored_at ON completions(stored_at)")
+            self._db.commit()
+        return self._db
+
+    def _open(self):
+        try:
+            with self._db_lock:
+                self._connect()
+        except (sqlite3.Error, OSError) as e:
+            print(f"[WARN] LLM cache disk tier unavailable, using memory only: {e}")
+            self.disk_enabled = False
+
+    def _disk_get(self, key: str) -> Optional[tuple]:
+        try:
+            with self._db_lock:
+                row = self._connect().execute(
+                    "SELECT stored_at, content FROM completions WHERE key = ? AND stored_at > ?",
+                    (key, time.time() - self.ttl)
+                ).fetchone()
+            return row
+        except sqlite3.Error as e:
+            print(f"[WARN] LLM cache read failed: {e}")
+            return None
+
+    def _disk_set(self, key: str, stored_at: float, content: str):
+        try:
+            with self._db_lock:
+                db = self._connect()
+                db.execute(
+                    "INSERT OR REPLACE INTO completions (key, stored_at, content) VALUES (?, ?, ?)",
+                    (key, stored_at, content)
+                )
+                # Prune expired rows and keep the table bounded
+                db.execute("DELETE FROM completions WHERE stored_at <= ?", (time.time() - self.ttl,))
+                db.execute(
+                    "DELETE FROM completions WHERE key NOT IN "
+                    "(SELECT key FROM completions ORDER BY stored_at DESC LIMIT ?)",
+                    (self.max_disk_entries,)
+                )
+                db.commit()
+        except sqlite3.Error as e:
+            print(f"[WARN] LLM cache write failed: {e}")
+
+    def _disk_delete(self, key: str):
+        try:
+            with self._db_lock:
+                db = self._connect()
+                db.execute("DELETE FROM completions WHERE key = ?", (key,))
+                db.commit()
+        except sqlite3.Error as e:
+            print(f"[WARN] LLM cache delete failed: {e}")
+
+
+# Singleton instance
+llm_cache = LLMCache()
@@ -0,0 +1,226 @@
+"""
+Model Router - Latency-aware model selection for OpenRouter
+Tracks rolling TTFB, tokens/sec, error rate and validation pass rate
+per model and picks the model for each request from a policy:
+
+- static: always "auto" (let OpenRouter choose, previous behaviour)
+- fastest_quality_floor: fastest healthy model at or above a quality floor
+- cheapest_under_slo: cheapest healthy model expected to finish within the SLO
+"""
+
+import os
+import random
+from collections import deque
+from typing import Dict, Iterable, Optional, Tuple
+from dotenv import load_dotenv
+
+from .circuit_breaker import circuit_breakers
+
+load_dotenv()
+
+ROUTING_POLICY = os.getenv("MODEL_ROUTING_POLICY", "static")
+ROUTING_QUALITY_FLOOR = os.getenv("MODEL_ROUTING_QUALITY_FLOOR", "excellent")
+ROUTING_LATENCY_SLO = float(os.getenv("MODEL_ROUTING_LATENCY_SLO", "20"))  # seconds per section
+ROUTING_MAX_ERROR_RATE = float(os.getenv("MODEL_ROUTING_MAX_ERROR_RATE", "0.5"))
+ROUTING_MIN_PASS_RATE = float(os.getenv("MODEL_ROUTING_MIN_PASS_RATE", "0.5"))
+ROUTING_EXPLORE_RATE = float(os.getenv("MODEL_ROUTING_EXPLORE_RATE", "0.05"))
+ROUTING_WINDOW = int(os.getenv("MODEL_ROUTING_WINDOW", "50"))
+
+POLICIES = ("static", "fastest_quality_floor", "cheapest_under_slo")
+
+# Static metadata from OpenRouterClient.MODELS turned into comparable ranks
+QUALITY_RANK = {"good": 1, "excellent": 2, "best": 3}
+COST_RANK = {"free": 0, "low": 1, "medium": 2, "varies": 2, "high": 3, "highest": 4}
+# Expected section latency (seconds) before a model has any samples
+SPEED_PRIOR = {"fast": 8.0, "medium": 15.0, "varies": 15.0, "slow": 30.0}
+EXPECTED_SECTION_TOKENS = 1500
+TTFB_PRIOR = 2.0  # seconds to first token before a model has any samples
+
+
+class ModelStats:
+    """Rolling window of call samples for one model"""
+
+    def __init__(self, window: int = ROUTING_WINDOW):
+        self.ttfb = deque(maxlen=window)          # seconds to first token
+        self.tokens_per_sec = deque(maxlen=window)
+        self.latency = deque(maxlen=window)       # seconds for the whole call
+        self.errors = deque(maxlen=window)        # True if the call failed
+        self.validations = deque(maxlen=window)   # True if output passed validation
+
+    @staticmethod
+    def _mean(values) -> Optional[float]:
+        return sum(values) / len(values) if values else None
+
+    def error_rate(self) -> float:
+        return self._mean(self.errors) or 0.0
+
+    def pass_rate(self) -> Optional[float]:
+        return self._mean(self.validations)
+
+    def to_dict(self) -> Dict:
+        ttfb = self._mean(self.ttfb)
+        tps = self._mean(self.tokens_per_sec)
+        latency = self._mean(self.latency)
+        pass_rate = self.pass_rate()
+        return {
+            "samples": len(self.errors),
+            "avg_ttfb": round(ttfb, 3) if ttfb is not None else None,
+            "avg_tokens_per_sec": round(tps, 1) if tps is not None else None,
+            "avg_latency": round(latency, 3) if latency is not None else None,
+            "error_rate": round(self.error_rate(), 3),
+            "validation_pass_rate": round(pass_rate, 3) if pass_rate is not None else None
+        }
+
+
+class ModelRouter:
+    """Pick a model key per request from live stats and static metadata"""
+
+    def __init__(
+        self,
+        policy: str = ROUTING_POLICY,
+        quality_floor: str = ROUTING_QUALITY_FLOOR,
+        latency_slo: float = ROUTING_LATENCY_SLO,
+        explore_rate: float = ROUTING_EXPLORE_RATE
+    ):
+        if policy not in POLICIES:
+            print(f"[WARN] Unknown MODEL_ROUTING_POLICY '{policy}' - using static")
+            policy = "static"
+        self.policy = policy
+        self.quality_floor = quality_floor
+        self.latency_slo = latency_slo
+        self.explore_rate = explore_rate
+        self._stats: Dict[str, ModelStats] = {}
+        self._model_table: Optional[Dict[str, Dict]] = None  # OpenRouterClient.MODELS, resolved on first use
+
+    # ---- Recording --------------------------------------------------------
+
+    def _model_stats(self, model: str) -> ModelStats:
+        if model not in self._stats:
+            self._stats[model] = ModelStats()
+        return self._stats[model]
+
+    def record_call(
+        self,
+        model: str,
+        latency: float,
+        ttfb: Optional[float] = None,
+        completion_tokens: Optional[int] = None,
+        error: bool = False
+    ):
+        """Record one provider call (ttfb defaults to latency for non-streamed calls)"""
+        stats = self._model_stats(model)
+        stats.errors.append(error)
+        if error:
+            return
+        ttfb = latency if ttfb is None else ttfb
+        stats.latency.append(latency)
+        stats.ttfb.append(ttfb)
+        if completion_tokens:
+            # Streamed calls measure generation speed after the first token
+            generation_time = latency - ttfb if latency - ttfb > 0.05 else latency
+            stats.tokens_per_sec.append(completion_tokens / max(generation_time, 0.001))
+
+    def record_validation(self, model: str, passed: bool):
+        """Record whether a model's output passed validate_component_code"""
+        self._model_stats(model).validations.append(passed)
+
+    # ---- Selection --------------------------------------------------------
+
+    def _models(self) -> Dict[str, Dict]:
+        if self._model_table is None:
+            from .openrouter_client import OpenRouterClient  # Avoid import cycle
+            self._model_table = OpenRouterClient.MODELS
+        return self._model_table
+
+    def expected_latency(self, model: str) -> float:
+        """Observed mean latency, or an estimate from TTFB/tokens-per-sec or the speed prior"""
+        stats = self._stats.get(model)
+        if stats and stats.latency:
+            return sum(stats.latency) / len(stats.latency)
+        if stats and stats.ttfb and stats.tokens_per_sec:
+            return (
+                sum(stats.ttfb) / len(stats.ttfb)
+                + EXPECTED_SECTION_TOKENS / (sum(stats.tokens_per_sec) / len(stats.tokens_per_sec))
+            )
+        speed = self._models().get(model, {}).get("speed", "varies")
+        return SPEED_PRIOR.get(speed, SPEED_PRIOR["varies"])
+
+    def expected_speed(self, model: str) -> Tuple[float, float]:
+        """(ttfb seconds, tokens/sec) from live stats, falling back to the speed prior"""
+        stats = self._stats.get(model)
+        ttfb = sum(stats.ttfb) / len(stats.ttfb) if stats and stats.ttfb else TTFB_PRIOR
+        if stats and stats.tokens_per_sec:
+            return ttfb, sum(stats.tokens_per_sec) / len(stats.tokens_per_sec)
+        speed = self._models().get(model, {}).get("speed", "varies")
+        prior = SPEED_PRIOR.get(speed, SPEED_PRIOR["varies"])
+        return ttfb, EXPECTED_SECTION_TOKENS / max(prior - TTFB_PRIOR, 1.0)
+
+    def is_healthy(self, model: str) -> bool:
+        """Error rate and validation pass rate within limits"""
+        stats = self._stats.get(model)
+        if not stats:
+            return True
+        pass_rate = stats.pass_rate()
+        return (
+            stats.error_rate() <= ROUTING_MAX_ERROR_RATE
+            and (pass_rate is None or pass_rate >= ROUTING_MIN_PASS_RATE)
+        )
+
+    def select(self, policy: Optional[str] = None, exclude: Iterable[str] = ()) -> str:
+        """Return the MODELS key to use for the next request"""
+        policy = policy or self.policy
+        # Models whose circuit breaker is open would only fail fast
+        exclude = set(exclude) | set(circuit_breakers.open_models("openrouter"))
+        if policy == "static":
+            return "auto" if "auto" not in exclude else self._fallback(exclude)
+
+        models = self._models()
+        floor = QUALITY_RANK.get(self.quality_floor, 0)
+        candidates = [
+            key for key, config in models.items()
+            if key != "auto" and key not in exclude
+            and QUALITY_RANK.get(config["quality"], 0) >= floor
+        ]
+        if not candidates:
+            return self._fallback(exclude)
+
+        # Occasionally try a random candidate so stats stay fresh
+        if random.random() < self.explore_rate:
+            return random.choice(candidates)
+
+        healthy = [key for key in candidates if self.is_healthy(key)] or candidates
+
+        if policy == "cheapest_under_slo":
+            within_slo = [key for key in healthy if self.expected_latency(key) <= self.latency_slo]
+            if within_slo:
+                return min(
+                    within_slo,
+                    key=lambda k: (COST_RANK.get(models[k]["cost"], 2), self.expected_latency(k))
+                )
+
+        # fastest_quality_floor (and cheapest_under_slo when nothing meets the SLO)
+        return min(healthy, key=self.expected_latency)
+
+    def _fallback(self, exclude: Iterable[str]) -> str:
+        """Any model not excluded, preferring OpenRouter's auto-select"""
+        for key in ["auto", *self._models().keys()]:
+            if key not in exclude:
+                return key
+        return "auto"
+
+    def get_model_stats(self, model: str) -> Dict:
+        """Live stats for one model (empty window if never used)"""
+        return (self._stats.get(model) or ModelStats()).to_dict()
+
+    def get_stats(self) -> Dict:
+        """Routing configuration plus live stats for every model seen so far"""
+        return {
+            "policy": self.policy,
+            "quality_floor": self.quality_floor,
+            "latency_slo": self.latency_slo,
+            "models": {model: stats.to_dict() for model, stats in self._stats.items()}
+        }
+
+
+# Singleton instance
+model_router = ModelRouter()
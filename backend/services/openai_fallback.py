@@ -0,0 +1,140 @@
+"""
+OpenAI Fallback - Direct OpenAI access when OpenRouter fails
+Shared AsyncOpenAI client plus a cached chat-completion helper
+"""
+
+import os
+from typing import Optional, Tuple
+from dotenv import load_dotenv
+
+from .llm_cache import llm_cache, make_cache_key
+from .single_flight import single_flight
+from .rate_limiter import openai_limiter, RateLimitError, RATE_LIMIT_MAX_RETRIES
+from .circuit_breaker import circuit_breakers
+from .deadline import Deadline
+from .model_router import model_router
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Initialize OpenAI client (optional - callers fall back to mocks if not available)
+openai_api_key = os.getenv("OPENAI_API_KEY")
+if openai_api_key:
+    # The SDK is the slowest import of the API (~0.3 s) - only loaded when OpenAI is configured
+    import openai
+    from openai import AsyncOpenAI
+    print("[OK] OpenAI API key found and loaded")
+    openai_client: Optional["AsyncOpenAI"] = AsyncOpenAI(api_key=openai_api_key)
+else:
+    print("[WARN] No OpenAI API key found - will use mock generation")
+    openai_client = None
+
+
+async def generate_with_openai(
+    prompt: str,
+    system_prompt: str,
+    model: str = "gpt-4",
+    temperature: float = 0.7,
+    max_tokens: int = 3000,
+    use_cache: bool = True,
+    deadline: Optional[Deadline] = None
+) -> str:
+    """
+    Generate content with OpenAI directly, served from the LLM cache when possible
+
+    With a deadline, max_tokens and the timeout shrink to fit the remaining
+    budget. Raises ValueError if no OpenAI key is configured and
+    DeadlineExceeded if the call cannot finish in time.
+    """
+    if openai_client is None:
+        raise ValueError("OpenAI API not available - check API key")
+
+    if use_cache:
+        cached = await llm_cache.get(model, system_prompt, prompt, temperature, max_tokens)
+        if cached is not None:
+            return cached
+
+    fitted_tokens, timeout = max_tokens, None
+    if deadline is not None:
+        fitted_tokens = deadline.fit_max_tokens(max_tokens, *model_router.expected_speed(model))
+        timeout = deadline.timeout()
+
+    # Identical concurrent requests share one upstream call (keyed like the cache)
+    cache_fields = (model, system_prompt, prompt, temperature, fitted_tokens)
+    completion = single_flight.do(
+        make_cache_key(*cache_fields),
+        lambda: _create_completion(prompt, system_prompt, model, temperature, fitted_tokens, timeout)
+    )
+    content, finish_reason = await (deadline.run(completion) if deadline is not None else completion)
+
+    # Only complete answers to the full budget are replayed: not truncated
+    # ones (finish_reason "length") nor ones whose budget the deadline shrank
+    if use_cache and finish_reason == "stop" and fitted_tokens == max_tokens:
+        await llm_cache.set(*cache_fields, content)
+
+    return content
+
+
+async def _create_completion(
+    prompt: str,
+    system_prompt: str,
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    timeout: Optional[float] = None
+) -> Tuple[str, Optional[str]]:
+    """One chat completion through the shared OpenAI limiter, waiting out 429s; (content, finish_reason)"""
+    # Fail fast (CircuitOpenError) while OpenAI or this model is down
+    probes = circuit_breakers.check("openai", model)
+    try:
+        estimated_tokens = (len(system_prompt) + len(prompt)) // 4 + max_tokens
+        # The SDK's own retries would bypass the shared limiter
+        client = openai_client.with_options(max_retries=0)
+        if timeout is not None:
+            client = client.with_options(timeout=timeout)
+
+        for rate_attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+            try:
+                async with openai_limiter.slot(estimated_tokens):
+                    raw = await client.chat.completions.with_raw_response.create(
+                        model=model,
+                        messages=[
+                            {"role": "system", "content": system_prompt},
+                            {"role": "user", "content": prompt}
+                        ],
+                        temperature=temperature,
+                        max_tokens=max_tokens
+                    )
+                    openai_limiter.update_from_headers(raw.headers)
+            except openai.RateLimitError as e:
+                openai_limiter.update_from_headers(e.response.headers, 429)
+                if rate_attempt == RATE_LIMIT_MAX_RETRIES:
+                    raise RateLimitError(f"OpenAI API error: 429 - {e}") from e
+                continue
+            except Exception as e:
+                circuit_breakers.record_failure(
+                    "openai", model, timeout=isinstance(e, openai.APITimeoutError)
+                )
+                raise
+
+            circuit_breakers.record_success("openai", model)
+
+            response = raw.parse()
+            usage = getattr(response, "usage", None)
+            openai_limiter.record_usage(estimated_tokens, usage.total_tokens if usage else None)
+            choice = response.choices[0]
+            return choice.message.content, choice.finish_reason
+    finally:
+        # 429s and cancellation give no verdict: free a claimed half-open probe
+        circuit_breakers.release(probes)
+
+
+async def evict_openai_cached(
+    prompt: str,
+    system_prompt: str,
+    model: str = "gpt-4",
+    temperature: float = 0.7,
+    max_tokens: int = 3000
+):
+    """Forget a cached OpenAI completion (e.g. it failed validation)"""
+    await llm_cache.evict(model, system_prompt, prompt, temperature, max_tokens)
@@ -12,12 +12,30 @@ OpenRouter provides a unified API to access multiple LLMs:
 """
 
 import os
+import json
+import time
+import asyncio
+import importlib.util
 from typing import Optional, Dict, List
 import httpx
 from dotenv import load_dotenv
 
+from .llm_cache import llm_cache, make_cache_key
+from .single_flight import single_flight
+from .model_router import model_router
+from .rate_limiter import openrouter_limiter, RateLimitError, RATE_LIMIT_MAX_RETRIES
+from .circuit_breaker import circuit_breakers
+from .deadline import Deadline
+
 load_dotenv()
 
+# Connection pool settings - one pooled client is shared by every request
+POOL_MAX_CONNECTIONS = int(os.getenv("OPENROUTER_MAX_CONNECTIONS", "20"))
+POOL_MAX_KEEPALIVE = int(os.getenv("OPENROUTER_MAX_KEEPALIVE", "10"))
+POOL_KEEPALIVE_EXPIRY = float(os.getenv("OPENROUTER_KEEPALIVE_EXPIRY", "60"))
+HTTP2_ENABLED = os.getenv("OPENROUTER_HTTP2", "true").lower() in ("1", "true", "yes")
+REQUEST_TIMEOUT = float(os.getenv("OPENROUTER_TIMEOUT", "60"))
+
 class OpenRouterClient:
     """Client for OpenRouter API - unified access to multiple LLMs"""
     
@@ -101,6 +119,73 @@ class OpenRouterClient:
         else:
             print("[OK] OpenRouter API key found")
             self.available = True
+        
+        # Shared HTTP client (created on startup, reused for every call)
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self.http2 = HTTP2_ENABLED and importlib.util.find_spec("h2") is not None
+        if HTTP2_ENABLED and not self.http2:
+            print("[WARN] OPENROUTER_HTTP2 enabled but 'h2' is not installed - using HTTP/1.1")
+        self.limits = httpx.Limits(
+            max_connections=POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=POOL_MAX_KEEPALIVE,
+            keepalive_expiry=POOL_KEEPALIVE_EXPIRY
+        )
+        
+        # Pool statistics (connections opened vs requests sent = reuse)
+        self._pool_stats = {
+            "requests": 0,
+            "in_flight": 0,
+            "connections_opened": 0
+        }
+    
+    async def start(self):
+        """Create the pooled HTTP client (called on FastAPI startup)"""
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(
+                timeout=REQUEST_TIMEOUT,
+                limits=self.limits,
+                http2=self.http2
+            )
+            print(f"[OK] OpenRouter HTTP pool ready (max {POOL_MAX_CONNECTIONS} connections, HTTP/2: {self.http2})")
+    
+    def is_ready(self) -> bool:
+        """True when the pooled client is open (or OpenRouter is not configured)"""
+        return not self.available or self._http_client is not None
+    
+    async def close(self):
+        """Close the pooled HTTP client (called on FastAPI shutdown)"""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+            print("[OK] OpenRouter HTTP pool closed")
+    
+    async def _get_http_client(self) -> httpx.AsyncClient:
+        """Return the shared client, creating it lazily outside the FastAPI lifecycle"""
+        if self._http_client is None:
+            await self.start()
+        return self._http_client
+    
+    async def _trace(self, event_name: str, info: Dict):
+        """httpcore trace hook - counts new TCP connections to measure reuse"""
+        if event_name == "connection.connect_tcp.complete":
+            self._pool_stats["connections_opened"] += 1
+    
+    def get_pool_stats(self) -> Dict:
+        """Connection pool statistics for monitoring reuse under load"""
+        requests = self._pool_stats["requests"]
+        opened = self._pool_stats["connections_opened"]
+        return {
+            "requests": requests,
+            "in_flight": self._pool_stats["in_flight"],
+            "connections_opened": opened,
+            "reused_requests": max(requests - opened, 0),
+            "reuse_ratio": round(max(requests - opened, 0) / requests, 3) if requests else 0.0,
+            "http2": self.http2,
+            "max_connections": POOL_MAX_CONNECTIONS,
+            "max_keepalive_connections": POOL_MAX_KEEPALIVE,
+            "keepalive_expiry": POOL_KEEPALIVE_EXPIRY,
+            "client_open": self._http_client is not None
+        }
     
     async def generate(
         self,
@@ -108,7 +193,9 @@ class OpenRouterClient:
         system_prompt: str,
         model: str = "auto",
         temperature: float = 0.7,
-        max_tokens: int = 4000
+        max_tokens: int = 4000,
+        use_cache: bool = True,
+        deadline: Optional[Deadline] = None
     ) -> str:
         """
         Generate content using specified LLM via OpenRouter
@@ -119,10 +206,169 @@ class OpenRouterClient:
             model: Model key from MODELS dict
             temperature: Creativity (0-1)
             max_tokens: Max response length
+            use_cache: Serve/store identical requests from the LLM cache
+            deadline: Request deadline; shrinks max_tokens and the timeout to fit
             
         Returns:
             Generated content
+        
+        Raises DeadlineExceeded if the request cannot finish before the deadline.
         """
+        model_config, headers, payload = self._build_request(
+            prompt, system_prompt, model, temperature, max_tokens
+        )
+        
+        if use_cache:
+            cached = await llm_cache.get(model_config["id"], system_prompt, prompt, temperature, max_tokens)
+            if cached is not None:
+                return cached
+        
+        timeout = httpx.USE_CLIENT_DEFAULT
+        if deadline is not None:
+            payload["max_tokens"] = deadline.fit_max_tokens(max_tokens, *model_router.expected_speed(model))
+            timeout = deadline.timeout(REQUEST_TIMEOUT)
+        
+        print(f"[AI] Generating with {model_config['name']}...")
+        
+        # Identical concurrent requests share one upstream call (keyed like the cache)
+        cache_fields = (model_config["id"], system_prompt, prompt, temperature, payload["max_tokens"])
+        completion = single_flight.do(
+            make_cache_key(*cache_fields), lambda: self._post_completion(model, headers, payload, timeout)
+        )
+        result = await (deadline.run(completion) if deadline is not None else completion)
+        content = result["choices"][0]["message"]["content"]
+        
+        # Only complete answers to the full budget are cached: not truncated
+        # ones nor ones whose max_tokens the deadline shrank
+        if (
+            use_cache
+            and result["choices"][0].get("finish_reason") == "stop"
+            and payload["max_tokens"] == max_tokens
+        ):
+            await llm_cache.set(*cache_fields, content)
+        
+        return content
+    
+    async def _post_completion(
+        self,
+        model: str,
+        headers: Dict,
+        payload: Dict,
+        timeout=httpx.USE_CLIENT_DEFAULT
+    ) -> Dict:
+        """Send one non-streaming chat completion request and return the JSON body"""
+        # Fail fast (CircuitOpenError) while OpenRouter or this model is down
+        probes = circuit_breakers.check("openrouter", model)
+        try:
+            client = await self._get_http_client()
+            estimated_tokens = estimate_tokens(payload)
+        
+            # 429s pause the shared limiter and the request waits in line to retry
+            for rate_attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+                async with openrouter_limiter.slot(estimated_tokens):
+                    self._pool_stats["requests"] += 1
+                    self._pool_stats["in_flight"] += 1
+                    started = time.monotonic()
+                    try:
+                        response = await client.post(
+                            f"{self.base_url}/chat/completions",
+                            headers=headers,
+                            json=payload,
+                            timeout=timeout,
+                            extensions={"trace": self._trace}
+                        )
+                    except Exception as e:
+                        model_router.record_call(model, time.monotonic() - started, error=True)
+                        circuit_breakers.record_failure(
+                            "openrouter", model, timeout=isinstance(e, httpx.TimeoutException)
+                        )
+                        raise
+                    finally:
+                        self._pool_stats["in_flight"] -= 1
+                    openrouter_limiter.update_from_headers(response.headers, response.status_code)
+                if response.status_code != 429:
+                    break
+        
+            if response.status_code == 429:
+                raise RateLimitError(f"OpenRouter API error: 429 - {response.text}")
+        
+            if response.status_code != 200:
+                model_router.record_call(model, time.monotonic() - started, error=True)
+                circuit_breakers.record_failure("openrouter", model)
+                error_detail = response.text
+                raise Exception(f"OpenRouter API error: {response.status_code} - {error_detail}")
+        
+            result = response.json()
+            usage = result.get("usage") or {}
+            openrouter_limiter.record_usage(estimated_tokens, usage.get("total_tokens"))
+            model_router.record_call(
+                model, time.monotonic() - started, completion_tokens=usage.get("completion_tokens")
+            )
+            circuit_breakers.record_success("openrouter", model)
+        
+            # Log token usage for cost tracking
+            if "usage" in result:
+                print(f"[STATS] Tokens: {usage.get('prompt_tokens', 0)} prompt + {usage.get('completion_tokens', 0)} completion")
+        
+            return result
+        finally:
+            # 429s and cancellation give no verdict: free a claimed half-open probe
+            circuit_breakers.release(probes)
+    
+    def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: str,
+        model: str = "auto",
+        temperature: float = 0.7,
+        max_tokens: int = 4000,
+        use_cache: bool = True,
+        deadline: Optional[Deadline] = None
+    ) -> "GenerationStream":
+        """
+        Stream content token-by-token using specified LLM via OpenRouter
+        
+        Same arguments as generate(). Returns a GenerationStream that yields
+        text deltas as they arrive; `usage` and `finish_reason` are set once
+        the stream is exhausted. Closing the stream early aborts the upstream request.
+        A cache hit is yielded as a single delta. With a deadline, max_tokens and
+        the HTTP timeout shrink to fit it (DeadlineExceeded if nothing fits); the
+        caller bounds the total stream time, e.g. with deadline.run().
+        """
+        model_config, headers, payload = self._build_request(
+            prompt, system_prompt, model, temperature, max_tokens
+        )
+        payload["stream"] = True
+        payload["usage"] = {"include": True}  # OpenRouter sends usage in the final chunk
+        
+        print(f"[AI] Streaming with {model_config['name']}...")
+        
+        return GenerationStream(
+            self, model, headers, payload, use_cache=use_cache, coalesce=True, deadline=deadline
+        )
+    
+    async def evict_cached(
+        self,
+        prompt: str,
+        system_prompt: str,
+        model: str = "auto",
+        temperature: float = 0.7,
+        max_tokens: int = 4000
+    ):
+        """Forget a cached completion (e.g. it failed validation) so retries hit the API"""
+        model_config = self.MODELS.get(model)
+        if model_config:
+            await llm_cache.evict(model_config["id"], system_prompt, prompt, temperature, max_tokens)
+    
+    def _build_request(
+        self,
+        prompt: str,
+        system_prompt: str,
+        model: str,
+        temperature: float,
+        max_tokens: int
+    ):
+        """Resolve model and build (model_config, headers, payload) for a chat completion"""
         if not self.available:
             raise ValueError("OpenRouter API not available - check API key")
         
@@ -131,10 +377,6 @@ class OpenRouterClient:
         if not model_config:
             raise ValueError(f"Unknown model: {model}")
         
-        model_id = model_config["id"]
-        
-        print(f"[AI] Generating with {model_config['name']}...")
-        
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "HTTP-Referer": self.site_url,
@@ -143,7 +385,7 @@ class OpenRouterClient:
         }
         
         payload = {
-            "model": model_id,
+            "model": model_config["id"],
             "messages": [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": prompt}
@@ -155,29 +397,10 @@ class OpenRouterClient:
             "presence_penalty": 0
         }
         
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                f"{self.base_url}/chat/completions",
-                headers=headers,
-                json=payload
-            )
-            
-            if response.status_code != 200:
-                error_detail = response.text
-                raise Exception(f"OpenRouter API error: {response.status_code} - {error_detail}")
-            
-            result = response.json()
-            content = result["choices"][0]["message"]["content"]
-            
-            # Log token usage for cost tracking
-            if "usage" in result:
-                usage = result["usage"]
-                print(f"[STATS] Tokens: {usage.get('prompt_tokens', 0)} prompt + {usage.get('completion_tokens', 0)} completion")
-            
-            return content
+        return model_config, headers, payload
     
     def get_model_list(self) -> List[Dict]:
-        """Get list of available models for UI selection"""
+        """Get list of available models for UI selection (with live router stats)"""
         return [
             {
                 "id": key,
@@ -185,7 +408,8 @@ class OpenRouterClient:
                 "strength": config["strength"],
                 "speed": config["speed"],
                 "quality": config["quality"],
-                "cost": config["cost"]
+                "cost": config["cost"],
+                "stats": model_router.get_model_stats(key)
             }
             for key, config in self.MODELS.items()
         ]
@@ -195,6 +419,213 @@ class OpenRouterClient:
         return self.available
 
 
+class GenerationStream:
+    """
+    Async iterator over text deltas of a streamed OpenRouter completion
+    
+    Usage:
+        stream = openrouter_client.generate_stream(prompt, system_prompt)
+        async for delta in stream:
+            ...
+        print(stream.usage, stream.finish_reason)
+    """
+    
+    def __init__(
+        self,
+        client: OpenRouterClient,
+        model: str,
+        headers: Dict,
+        payload: Dict,
+        use_cache: bool = True,
+        coalesce: bool = False,
+        deadline: Optional[Deadline] = None
+    ):
+        self._client = client
+        self.model = model
+        self._headers = headers
+        self._payload = payload
+        self._use_cache = use_cache
+        self._coalesce = coalesce
+        self._deadline = deadline
+        self._iterator = self._iterate()
+        self.text = ""  # Accumulated completion so far
+        self.usage: Optional[Dict] = None
+        self.finish_reason: Optional[str] = None
+        self.ttfb: Optional[float] = None  # Seconds until the first token
+        self.cached = False
+    
+    def _cache_fields(self):
+        """(model_id, system_prompt, prompt, temperature, max_tokens) for the LLM cache"""
+        messages = self._payload["messages"]
+        return (
+            self._payload["model"],
+            messages[0]["content"],
+            messages[1]["content"],
+            self._payload["temperature"],
+            self._payload["max_tokens"]
+        )
+    
+    def __aiter__(self):
+        return self
+    
+    async def __anext__(self) -> str:
+        return await self._iterator.__anext__()
+    
+    async def aclose(self):
+        """Stop streaming and abort the upstream request"""
+        await self._iterator.aclose()
+    
+    async def _iterate(self):
+        """Open the upstream SSE stream and yield content deltas"""
+        if self._use_cache:
+            cached = await llm_cache.get(*self._cache_fields())
+            if cached is not None:
+                self.text = cached
+                self.finish_reason = "stop"
+                self.cached = True
+                yield cached
+                return
+        
+        payload = self._payload
+        if self._deadline is not None and self._coalesce:  # Coalesced upstreams get the fitted payload
+            fitted = self._deadline.fit_max_tokens(
+                payload["max_tokens"], *model_router.expected_speed(self.model)
+            )
+            payload = {**payload, "max_tokens": fitted}
+        
+        if self._coalesce:
+            # Identical concurrent streams share one upstream request
+            messages = payload["messages"]
+            source, deltas = single_flight.stream(
+                make_cache_key(
+                    payload["model"], messages[0]["content"], messages[1]["content"],
+                    payload["temperature"], payload["max_tokens"]
+                ),
+                lambda: GenerationStream(
+                    self._client, self.model, self._headers, payload, use_cache=False, deadline=self._deadline
+                )
+            )
+            try:
+                async for delta in deltas:
+                    self.text += delta
+                    yield delta
+            finally:
+                await deltas.aclose()
+            self.usage = source.usage
+            self.finish_reason = source.finish_reason
+            self.ttfb = source.ttfb
+        else:
+            async for delta in self._upstream(payload):
+                yield delta
+        
+        # Only complete streams to the full budget are cached (not truncated,
+        # aborted or deadline-shrunk ones)
+        if self._use_cache and self.finish_reason == "stop" and payload["max_tokens"] == self._payload["max_tokens"]:
+            await llm_cache.set(*self._cache_fields(), self.text)
+    
+    async def _upstream(self, payload: Dict):
+        """Stream directly from OpenRouter (no cache, no coalescing)"""
+        http_client = await self._client._get_http_client()
+        stats = self._client._pool_stats
+        estimated_tokens = estimate_tokens(payload)
+        timeout = self._deadline.timeout(REQUEST_TIMEOUT) if self._deadline is not None else httpx.USE_CLIENT_DEFAULT
+        started: Optional[float] = None  # Set once a limiter slot is held
+        completed = False
+        failure: Optional[Exception] = None
+        # Fail fast (CircuitOpenError) while OpenRouter or this model is down
+        probes = circuit_breakers.check("openrouter", self.model)
+        try:
+            # 429s pause the shared limiter and the request waits in line to retry
+            for rate_attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+                async with openrouter_limiter.slot(estimated_tokens):
+                    # TTFB and latency exclude the time spent queued in the limiter
+                    started = time.monotonic()
+                    stats["requests"] += 1
+                    stats["in_flight"] += 1
+                    try:
+                        async with http_client.stream(
+                            "POST",
+                            f"{self._client.base_url}/chat/completions",
+                            headers=self._headers,
+                            json=payload,
+                            timeout=timeout,
+                            extensions={"trace": self._client._trace}
+                        ) as response:
+                            openrouter_limiter.update_from_headers(response.headers, response.status_code)
+                            if response.status_code != 200:
+                                error_detail = (await response.aread()).decode(errors="replace")
+                                if response.status_code == 429:
+                                    if rate_attempt < RATE_LIMIT_MAX_RETRIES:
+                                        continue
+                                    raise RateLimitError(f"OpenRouter API error: 429 - {error_detail}")
+                                raise Exception(f"OpenRouter API error: {response.status_code} - {error_detail}")
+                            
+                            async for line in response.aiter_lines():
+                                # SSE: skip blank keep-alives and ": OPENROUTER PROCESSING" comments
+                                if not line.startswith("data:"):
+                                    continue
+                                data = line[5:].strip()
+                                if data == "[DONE]":
+                                    break
+                                
+                                chunk = json.loads(data)
+                                if "error" in chunk:
+                                    raise Exception(f"OpenRouter stream error: {chunk['error']}")
+                                if chunk.get("usage"):
+                                    self.usage = chunk["usage"]
+                                
+                                for choice in chunk.get("choices", []):
+                                    if choice.get("finish_reason"):
+                                        self.finish_reason = choice["finish_reason"]
+                                    delta = (choice.get("delta") or {}).get("content")
+                                    if delta:
+                                        if self.ttfb is None:
+                                            self.ttfb = time.monotonic() - started
+                                        self.text += delta
+                                        yield delta
+                    finally:
+                        stats["in_flight"] -= 1
+                completed = True
+                break
+        except (GeneratorExit, asyncio.CancelledError):
+            completed = None  # Closed or cancelled by the consumer - not a provider error
+            raise
+        except Exception as e:
+            failure = e
+            raise
+        finally:
+            if completed is not None:
+                # Like the breaker, the router ignores 429s: throttling says nothing about the model
+                if started is not None and not isinstance(failure, RateLimitError):
+                    model_router.record_call(
+                        self.model,
+                        time.monotonic() - started,
+                        ttfb=self.ttfb,
+                        completion_tokens=(self.usage or {}).get("completion_tokens") or len(self.text) // 4,
+                        error=not completed
+                    )
+                if completed:
+                    circuit_breakers.record_success("openrouter", self.model)
+                elif not isinstance(failure, RateLimitError):  # 429s are the limiter's job
+                    circuit_breakers.record_failure(
+                        "openrouter", self.model, timeout=isinstance(failure, httpx.TimeoutException)
+                    )
+            # 429s and cancellation give no verdict: free a claimed half-open probe
+            circuit_breakers.release(probes)
+        
+        openrouter_limiter.record_usage(estimated_tokens, (self.usage or {}).get("total_tokens"))
+        
+        # Log token usage for cost tracking
+        if self.usage:
+            print(f"[STATS] Tokens: {self.usage.get('prompt_tokens', 0)} prompt + {self.usage.get('completion_tokens', 0)} completion (streamed, {self.finish_reason})")
+
+
+def estimate_tokens(payload: Dict) -> int:
+    """Rough token budget of a request (~4 chars per token) for TPM limiting"""
+    prompt_chars = sum(len(message["content"]) for message in payload["messages"])
+    return prompt_chars // 4 + payload.get("max_tokens", 0)
+
+
 # Singleton instance
 openrouter_client = OpenRouterClient()
 
@@ -0,0 +1,66 @@
+"""
+Single-Call Page Stream - Every section of a page from one completion
+The per-section fan-out resends the component system prompt with every
+section call. In single-call mode the page is requested once: the system
+prompt is sent a single time and the model writes all sections in order,
+separated by delimiter lines (utils/section_delimiters.py). Sections are
+cut out of the stream as each delimiter arrives.
+
+Trade-off: fewer prompt tokens and one upstream request per page, but
+the sections are generated one after another instead of in parallel.
+"""
+
+import os
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+from utils.section_delimiters import SectionStreamSplitter, build_page_prompt
+from .openrouter_client import openrouter_client
+from .model_router import model_router
+from .section_pipeline import build_system_prompt
+from .deadline import Deadline
+
+load_dotenv()
+
+# "sections" (one call per section, in parallel) or "single-call"
+PAGE_GENERATION_MODE = os.getenv("PAGE_GENERATION_MODE", "sections")
+SINGLE_CALL_MAX_TOKENS = int(os.getenv("SINGLE_CALL_MAX_TOKENS", "12000"))
+PAGE_GENERATION_MODES = ("sections", "single-call")
+
+
+async def stream_page_sections(
+    sections: List[Dict],
+    output_format: str,
+    use_cache: bool = True,
+    deadline: Optional[Deadline] = None,
+    temperature: float = 0.7
+) -> AsyncIterator[Tuple[str, str, str]]:
+    """
+    Stream one completion for all sections, yielding splitter events
+
+    Yields ("delta", section, text) as section text arrives and
+    ("complete", section, text) when a section's delimiter block ends.
+    Sections the model skipped are simply never completed; the caller
+    generates those separately. Raises on upstream errors like
+    OpenRouterClient.generate_stream().
+    """
+    splitter = SectionStreamSplitter([section["name"] for section in sections])
+    stream = openrouter_client.generate_stream(
+        prompt=build_page_prompt(sections),
+        system_prompt=build_system_prompt(output_format),
+        model=model_router.select(),
+        temperature=temperature,
+        max_tokens=SINGLE_CALL_MAX_TOKENS,
+        use_cache=use_cache,
+        deadline=deadline
+    )
+    try:
+        async for delta in stream:
+            for event in splitter.feed(delta):
+                yield event
+    finally:
+        await stream.aclose()  # Aborts the upstream request if the consumer stops early
+
+    for event in splitter.close():
+        yield event
+    print(f"[SINGLE-CALL] {len(splitter.completed)}/{len(sections)} sections in one completion ({stream.usage or 'no usage reported'})")
@@ -0,0 +1,284 @@
+"""
+Rate Limiter - Per-provider concurrency and token-bucket limits
+Parallel section fan-out (7 tasks per request x N users) would otherwise
+trip upstream rate limits. Each provider gets:
+
+- max-in-flight: at most N concurrent requests, waiters served FIFO
+- requests/minute and tokens/minute token buckets
+- 429 handling: Retry-After / x-ratelimit-* headers pause the provider
+
+Queued work waits for capacity instead of failing. Limits are enforced per
+process; serve.py splits them between its processes.
+"""
+
+import os
+import time
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Dict, Mapping, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Attempts made for a request that keeps getting 429s before giving up
+RATE_LIMIT_MAX_RETRIES = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "3"))
+# Pause used when a 429 carries no usable Retry-After / reset header
+RATE_LIMIT_DEFAULT_BACKOFF = float(os.getenv("RATE_LIMIT_DEFAULT_BACKOFF", "2"))
+# Provider limits (env var -> default); 0 turns an RPM/TPM bucket off
+PROVIDER_LIMITS = {
+    "OPENROUTER_MAX_IN_FLIGHT": "16",
+    "OPENROUTER_RPM": "200",
+    "OPENROUTER_TPM": "0",
+    "OPENAI_MAX_IN_FLIGHT": "8",
+    "OPENAI_RPM": "500",
+    "OPENAI_TPM": "30000",
+}
+
+
+def provider_limit(name: str) -> float:
+    return float(os.getenv(name, PROVIDER_LIMITS[name]))
+
+
+class RateLimitError(Exception):
+    """Provider answered 429; retry_after is the suggested pause in seconds"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """Seconds to wait from Retry-After (seconds or HTTP date) or x-ratelimit reset headers"""
+    value = headers.get("retry-after")
+    if value:
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            try:
+                return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+            except (TypeError, ValueError):
+                pass
+
+    reset = headers.get("x-ratelimit-reset-requests") or headers.get("x-ratelimit-reset")
+    if reset:
+        return _parse_reset(reset)
+    return None
+
+
+def _parse_reset(value: str) -> Optional[float]:
+    """Parse reset values like '12', '1.5s', '250ms', '1m30s' or an epoch timestamp (ms or s)"""
+    try:
+        number = float(value)
+        if number > 1e12:  # epoch milliseconds (OpenRouter)
+            return max(number / 1000 - time.time(), 0.0)
+        if number > 1e9:  # epoch seconds
+            return max(number - time.time(), 0.0)
+        return max(number, 0.0)
+    except ValueError:
+        pass
+
+    total, number = 0.0, ""
+    units = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+    i = 0
+    while i < len(value):
+        char = value[i]
+        if char.isdigit() or char == ".":
+            number += char
+            i += 1
+            continue
+        unit = "ms" if value.startswith("ms", i) else char
+        if unit not in units or not number:
+            return None
+        total += float(number) * units[unit]
+        number = ""
+        i += len(unit)
+    return total if not number else None
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at capacity per minute"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.tokens = per_minute
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)"""
+        self._refill()
+        amount = min(amount, self.capacity)  # Oversized requests wait for a full bucket
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def refund(self, amount: float):
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class ProviderLimiter:
+    """Concurrency + RPM/TPM limits for one provider with FIFO waiting"""
+
+    def __init__(
+        self,
+        name: str,
+        max_in_flight: int,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None
+    ):
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.in_flight = 0
+        self.paused_until = 0.0  # monotonic time set by 429s / exhausted headers
+        self._waiters: deque = deque()  # FIFO tickets of queued callers
+        self._changed = asyncio.Condition()
+        self._stats = {
+            "acquired": 0,
+            "queued": 0,
+            "rate_limited": 0,
+            "total_wait": 0.0,
+            "max_wait": 0.0
+        }
+
+    @asynccontextmanager
+    async def slot(self, estimated_tokens: int = 0):
+        """
+        Hold one request slot for the duration of the block
+
+        Usage:
+            async with openrouter_limiter.slot(estimated_tokens=3000):
+                response = await client.post(...)
+        """
+        await self.acquire(estimated_tokens)
+        try:
+            yield
+        finally:
+            await self.release()
+
+    async def acquire(self, estimated_tokens: int = 0):
+        """Wait (FIFO) until concurrency, buckets and any 429 pause allow a request"""
+        started = time.monotonic()
+        async with self._changed:
+            if self._waiters or not self._try_acquire(estimated_tokens):
+                self._stats["queued"] += 1
+                ticket = object()
+                self._waiters.append(ticket)
+                try:
+                    # Only the head of the queue may take capacity
+                    while not (self._waiters[0] is ticket and self._try_acquire(estimated_tokens)):
+                        delay = self._next_delay(estimated_tokens) if self._waiters[0] is ticket else None
+                        try:
+                            await asyncio.wait_for(self._changed.wait(), timeout=delay)
+                        except asyncio.TimeoutError:
+                            pass
+                finally:
+                    self._waiters.remove(ticket)
+                    self._changed.notify_all()
+
+        waited = time.monotonic() - started
+        self._stats["acquired"] += 1
+        self._stats["total_wait"] += waited
+        self._stats["max_wait"] = max(self._stats["max_wait"], waited)
+        if waited > 0.5:
+            print(f"[RATE-LIMIT] {self.name}: waited {waited:.1f}s for capacity")
+
+    async def release(self):
+        """Return a concurrency slot and wake the queue"""
+        async with self._changed:
+            self.in_flight -= 1
+            self._changed.notify_all()
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        """Correct the TPM bucket once real token usage is known"""
+        if self.tokens and actual_tokens is not None:
+            difference = estimated_tokens - actual_tokens
+            if difference > 0:
+                self.tokens.refund(difference)
+            elif difference < 0:
+                self.tokens.take(-difference)
+
+    def update_from_headers(self, headers: Mapping[str, str], status_code: int = 200):
+        """Honour 429 Retry-After and pause when x-ratelimit-remaining hits zero"""
+        pause = None
+        if status_code == 429:
+            self._stats["rate_limited"] += 1
+            pause = parse_retry_after(headers)
+            if pause is None:
+                pause = RATE_LIMIT_DEFAULT_BACKOFF
+        else:
+            remaining = headers.get("x-ratelimit-remaining-requests") or headers.get("x-ratelimit-remaining")
+            if remaining is not None and remaining.strip() in ("0", "0.0"):
+                pause = parse_retry_after(headers)
+
+        if pause:
+            self.paused_until = max(self.paused_until, time.monotonic() + pause)
+            print(f"[RATE-LIMIT] {self.name}: pausing {pause:.1f}s (status {status_code})")
+
+    def get_stats(self) -> Dict:
+        """Queue and wait-time counters for monitoring"""
+        acquired = self._stats["acquired"]
+        return {
+            **self._stats,
+            "total_wait": round(self._stats["total_wait"], 3),
+            "max_wait": round(self._stats["max_wait"], 3),
+            "avg_wait": round(self._stats["total_wait"] / acquired, 3) if acquired else 0.0,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queue_depth": len(self._waiters),
+            "paused_for": round(max(self.paused_until - time.monotonic(), 0.0), 2)
+        }
+
+    # ---- Internals --------------------------------------------------------
+
+    def _try_acquire(self, estimated_tokens: int) -> bool:
+        if self._next_delay(estimated_tokens) != 0.0:
+            return False
+        self.in_flight += 1
+        if self.requests:
+            self.requests.take(1)
+        if self.tokens and estimated_tokens:
+            self.tokens.take(estimated_tokens)
+        return True
+
+    def _next_delay(self, estimated_tokens: int) -> Optional[float]:
+        """0 if a request may start now, seconds to wait, or None to wait for a release"""
+        pause = self.paused_until - time.monotonic()
+        if pause > 0:
+            return pause
+        if self.in_flight >= self.max_in_flight:
+            return None
+        delay = 0.0
+        if self.requests:
+            delay = max(delay, self.requests.wait_time(1))
+        if self.tokens and estimated_tokens:
+            delay = max(delay, self.tokens.wait_time(estimated_tokens))
+        return delay
+
+
+# Shared limiters (one per provider, per process)
+openrouter_limiter = ProviderLimiter(
+    "openrouter",
+    max_in_flight=int(provider_limit("OPENROUTER_MAX_IN_FLIGHT")),
+    requests_per_minute=provider_limit("OPENROUTER_RPM") or None,
+    tokens_per_minute=provider_limit("OPENROUTER_TPM") or None
+)
+openai_limiter = ProviderLimiter(
+    "openai",
+    max_in_flight=int(provider_limit("OPENAI_MAX_IN_FLIGHT")),
+    requests_per_minute=provider_limit("OPENAI_RPM") or None,
+    tokens_per_minute=provider_limit("OPENAI_TPM") or None
+)
@@ -0,0 +1,571 @@
+"""
+Section Pipeline - One generation engine for every endpoint
+Each section (or single component) runs through explicit stages:
+
+    prompt -> call -> extract -> validate -> repair -> (next attempt / fallback) -> clean
+
+Providers are tried in order, each for its own number of attempts (e.g.
+OpenRouter x2, then OpenAI, then the mock). Caching, coalescing, rate
+limiting, circuit breakers and deadlines live in the provider clients;
+hedging and streaming deltas are applied here, once for all endpoints.
+
+Every stage reports its duration to timing hooks. The built-in
+PipelineStats hook aggregates them for /api/stats.
+
+A cancelled job (e.g. the SSE client went away) aborts its in-flight
+upstream request and reports a "cancelled" stage, from which
+PipelineStats estimates the tokens and seconds of work that were saved.
+Streamed attempts that fail a StreamGuard check (refusal, prose without
+code, Next.js imports in vanilla output) are aborted the same way and
+reported as "early_abort" before the next attempt starts.
+"""
+
+import time
+import asyncio
+from typing import Callable, Dict, Iterable, List, Optional
+
+from prompts.landing_page_prompts import get_component_system_prompt
+from prompts.typescript_prompts import get_typescript_component_prompt
+from utils.code_validator import validate_component_code, clean_and_validate_code
+from utils.code_extractor import extract_code
+from utils.component_utils import generate_mock_component
+from utils.stream_guard import StreamGuard, StreamRejected, STREAM_GUARD_ENABLED
+from .openrouter_client import openrouter_client
+from .openai_fallback import openai_client, generate_with_openai, evict_openai_cached
+from .model_router import model_router
+from .hedging import hedge_policy
+from .circuit_breaker import circuit_breakers
+from .deadline import Deadline, DeadlineExceeded
+from .code_repair import CodeRepairer
+
+# on_delta(attempt, text) receives streamed tokens of the current attempt
+DeltaCallback = Callable[[int, str], None]
+# hook(stage, seconds, job, info) is called after every stage
+TimingHook = Callable[[str, float, "SectionJob", Dict], None]
+
+
+class SectionJob:
+    """One section (or single component) to generate"""
+
+    def __init__(
+        self,
+        name: str,
+        prompt: str,
+        output_format: str = "jsx",
+        system_prompt: Optional[str] = None,
+        use_cache: bool = True,
+        deadline: Optional[Deadline] = None,
+        on_delta: Optional[DeltaCallback] = None,
+        prefetched: Optional[str] = None
+    ):
+        self.name = name
+        self.prompt = prompt
+        self.output_format = output_format
+        self.system_prompt = system_prompt  # Built by the prompt stage when None
+        self.use_cache = use_cache
+        self.deadline = deadline
+        self.on_delta = on_delta
+        self.streamed_chars = 0  # Completion text received so far, over all attempts
+        self.prefetched = prefetched  # Raw text already generated elsewhere (single-call page mode)
+
+
+class PipelineResult:
+    """Final code plus where it came from"""
+
+    def __init__(self, code: str, provider: str, model: Optional[str], attempts: int, elapsed: float):
+        self.code = code
+        self.provider = provider  # "none" if every provider failed and a placeholder was used
+        self.model = model
+        self.attempts = attempts
+        self.elapsed = elapsed
+
+
+# ---- Providers ------------------------------------------------------------
+
+class Provider:
+    """A source of completions tried by the pipeline, max_attempts times in a row"""
+
+    name = "provider"
+    hedge = False  # Race a backup model when an attempt is slower than usual
+    instant = False  # Local providers run even after the deadline (degraded result)
+
+    def __init__(self, max_attempts: int = 1, max_tokens: int = 3000, temperature: float = 0.7, temperature_step: float = 0.0):
+        self.max_attempts = max_attempts
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.temperature_step = temperature_step
+
+    def temperature_for(self, attempt: int) -> float:
+        """Retries run slightly hotter when temperature_step is set"""
+        return self.temperature + attempt * self.temperature_step
+
+    def is_available(self) -> bool:
+        return True
+
+    def is_open(self) -> bool:
+        """True while the provider's circuit breaker rejects calls"""
+        return circuit_breakers.is_open(self.name)
+
+    def select_model(self, exclude: Iterable[str] = ()) -> Optional[str]:
+        return None
+
+    async def call(self, job: SectionJob, model: Optional[str], attempt: int, stream_deltas: bool) -> str:
+        """Return the raw completion text"""
+        raise NotImplementedError
+
+    async def discard(self, job: SectionJob, model: Optional[str], attempt: int):
+        """Forget a cached completion that failed validation"""
+
+    def record_validation(self, model: Optional[str], passed: bool):
+        """Feed validation results back into model selection"""
+
+
+class OpenRouterProvider(Provider):
+    """OpenRouter via the shared client; streams and hedges when asked to"""
+
+    name = "openrouter"
+
+    def __init__(self, stream: bool = False, hedge: bool = False, guard: bool = STREAM_GUARD_ENABLED, **kwargs):
+        super().__init__(**kwargs)
+        self.stream = stream
+        self.hedge = hedge
+        self.guard = guard  # Abort streams that StreamGuard rejects
+
+    def is_available(self) -> bool:
+        return openrouter_client.is_available()
+
+    def select_model(self, exclude: Iterable[str] = ()) -> str:
+        return model_router.select(exclude=exclude)
+
+    async def call(self, job: SectionJob, model: str, attempt: int, stream_deltas: bool) -> str:
+        if not self.stream:
+            return await openrouter_client.generate(
+                prompt=job.prompt,
+                system_prompt=job.system_prompt,
+                model=model,
+                temperature=self.temperature_for(attempt),
+                max_tokens=self.max_tokens,
+                use_cache=job.use_cache,
+                deadline=job.deadline
+            )
+
+        stream = openrouter_client.generate_stream(
+            prompt=job.prompt,
+            system_prompt=job.system_prompt,
+            model=model,
+            temperature=self.temperature_for(attempt),
+            max_tokens=self.max_tokens,
+            use_cache=job.use_cache,
+            deadline=job.deadline
+        )
+        guard = StreamGuard(job.output_format) if self.guard else None
+        # Forward tokens to the client as they arrive (hedge backups stay silent)
+        try:
+            async for delta in stream:
+                job.streamed_chars += len(delta)
+                if guard is not None:
+                    guard.feed(delta)  # Raises StreamRejected; aclose() below aborts the upstream request
+                if stream_deltas and job.on_delta is not None:
+                    job.on_delta(attempt, delta)
+        finally:
+            await stream.aclose()  # Aborts the upstream request if cancelled
+        return stream.text
+
+    async def discard(self, job: SectionJob, model: str, attempt: int):
+        await openrouter_client.evict_cached(
+            job.prompt, job.system_prompt, model, self.temperature_for(attempt), self.max_tokens
+        )
+
+    def record_validation(self, model: str, passed: bool):
+        model_router.record_validation(model, passed)
+
+
+class OpenAIProvider(Provider):
+    """Direct OpenAI fallback"""
+
+    name = "openai"
+
+    def __init__(self, model: str = "gpt-4", **kwargs):
+        super().__init__(**kwargs)
+        self.model = model
+
+    def is_available(self) -> bool:
+        return openai_client is not None
+
+    def select_model(self, exclude: Iterable[str] = ()) -> str:
+        return self.model
+
+    async def call(self, job: SectionJob, model: str, attempt: int, stream_deltas: bool) -> str:
+        return await generate_with_openai(
+            prompt=job.prompt,
+            system_prompt=job.system_prompt,
+            model=model,
+            temperature=self.temperature_for(attempt),
+            max_tokens=self.max_tokens,
+            use_cache=job.use_cache,
+            deadline=job.deadline
+        )
+
+    async def discard(self, job: SectionJob, model: str, attempt: int):
+        await evict_openai_cached(
+            job.prompt, job.system_prompt, model, self.temperature_for(attempt), self.max_tokens
+        )
+
+
+class MockProvider(Provider):
+    """Template-based last resort - always available, never slow"""
+
+    name = "mock"
+    instant = True
+
+    def is_open(self) -> bool:
+        return False
+
+    async def call(self, job: SectionJob, model: Optional[str], attempt: int, stream_deltas: bool) -> str:
+        return generate_mock_component(job.prompt)
+
+
+class PrefetchedProvider(Provider):
+    """Section text cut out of a single whole-page completion (job.prefetched)"""
+
+    name = "single-call"
+    instant = True
+
+    def is_open(self) -> bool:
+        return False
+
+    async def call(self, job: SectionJob, model: Optional[str], attempt: int, stream_deltas: bool) -> str:
+        if not job.prefetched:
+            raise ValueError("Section missing from the page completion")
+        return job.prefetched
+
+
+# ---- Stages ----------------------------------------------------------------
+
+def build_system_prompt(output_format: str) -> str:
+    """Section system prompt for the requested output format"""
+    if output_format == "typescript":
+        return get_typescript_component_prompt()
+    return get_component_system_prompt()
+
+
+def placeholder_component(section_name: str) -> str:
+    """Minimal valid section used when even the mock fails validation"""
+    return f"""export function {section_name.replace(' ', '')}Section() {{
+  return (
+    <div className="py-16 px-4 text-center bg-gray-50">
+      <h2 className="text-3xl font-bold mb-4">{section_name}</h2>
+      <p className="text-gray-600">Content generation in progress...</p>
+    </div>
+  )
+}}"""
+
+
+# ---- Engine -----------------------------------------------------------------
+
+CHARS_PER_TOKEN = 4  # Same rough ratio as the rate limiter's estimate
+
+
+class PipelineStats:
+    """Timing hook that aggregates per-stage durations and provider outcomes"""
+
+    def __init__(self):
+        self._stages: Dict[str, Dict[str, float]] = {}
+        self._results: Dict[str, int] = {}
+        self._generated_chars = 0  # Code length of results from real (non-instant) providers
+        self._generated_count = 0
+        self._cancelled = {
+            "jobs": 0,
+            "upstream_aborted": 0,  # Cancelled while a provider call was in flight
+            "streamed_tokens": 0,  # Received before the cancel, thrown away
+            "est_tokens_saved": 0,
+            "est_seconds_saved": 0.0
+        }
+        self._early_aborts = {
+            "attempts": 0,
+            "by_reason": {},
+            "streamed_tokens": 0,  # Received before the abort
+            "est_tokens_saved": 0,
+            "est_seconds_saved": 0.0
+        }
+
+    def _expected_tokens(self, max_tokens: int) -> int:
+        """Typical completion size of a finished job (max_tokens until one has finished)"""
+        if not self._generated_count:
+            return max_tokens
+        return self._generated_chars // self._generated_count // CHARS_PER_TOKEN
+
+    def _record_cancelled(self, seconds: float, info: Dict):
+        """Estimate the work a cancelled job did not do: typical job minus what it had done"""
+        cancelled = self._cancelled
+        cancelled["jobs"] += 1
+        if not info.get("upstream"):
+            return
+        cancelled["upstream_aborted"] += 1
+        streamed = info.get("streamed_chars", 0) // CHARS_PER_TOKEN
+        cancelled["streamed_tokens"] += streamed
+        cancelled["est_tokens_saved"] += max(self._expected_tokens(info.get("max_tokens", 0)) - streamed, 0)
+        total = self._stages.get("total")
+        if total and total["count"]:
+            cancelled["est_seconds_saved"] += max(total["total"] / total["count"] - seconds, 0.0)
+
+    def _record_early_abort(self, seconds: float, info: Dict):
+        """Estimate the rest of a rejected attempt that was not generated: typical call minus what it had done"""
+        aborts = self._early_aborts
+        aborts["attempts"] += 1
+        reason = info.get("reason", "unknown")
+        aborts["by_reason"][reason] = aborts["by_reason"].get(reason, 0) + 1
+        streamed = info.get("streamed_chars", 0) // CHARS_PER_TOKEN
+        aborts["streamed_tokens"] += streamed
+        aborts["est_tokens_saved"] += max(self._expected_tokens(info.get("max_tokens", 0)) - streamed, 0)
+        call = self._stages.get("call")
+        if call and call["count"]:
+            aborts["est_seconds_saved"] += max(call["total"] / call["count"] - seconds, 0.0)
+
+    def __call__(self, stage: str, seconds: float, job: SectionJob, info: Dict):
+        stats = self._stages.setdefault(stage, {"count": 0, "total": 0.0, "max": 0.0})
+        stats["count"] += 1
+        stats["total"] += seconds
+        stats["max"] = max(stats["max"], seconds)
+        if stage == "total":
+            provider = info.get("provider", "unknown")
+            self._results[provider] = self._results.get(provider, 0) + 1
+            if info.get("generated"):
+                self._generated_chars += info.get("chars", 0)
+                self._generated_count += 1
+        elif stage == "cancelled":
+            self._record_cancelled(seconds, info)
+        elif stage == "early_abort":
+            self._record_early_abort(seconds, info)
+
+    def get_stats(self) -> Dict:
+        """Per-stage count/avg/max seconds and which provider produced each result"""
+        return {
+            "stages": {
+                stage: {
+                    "count": int(stats["count"]),
+                    "avg": round(stats["total"] / stats["count"], 4) if stats["count"] else 0.0,
+                    "max": round(stats["max"], 4)
+                }
+                for stage, stats in self._stages.items()
+            },
+            "results_by_provider": dict(self._results),
+            "cancelled": {**self._cancelled, "est_seconds_saved": round(self._cancelled["est_seconds_saved"], 2)},
+            "early_aborts": {
+                **self._early_aborts,
+                "by_reason": dict(self._early_aborts["by_reason"]),
+                "est_seconds_saved": round(self._early_aborts["est_seconds_saved"], 2)
+            }
+        }
+
+
+class SectionPipeline:
+    """Run SectionJobs through the providers with validation, retries and fallback"""
+
+    def __init__(
+        self,
+        providers: List[Provider],
+        extract: bool = True,
+        validate: bool = True,
+        clean: bool = True,
+        hooks: Optional[List[TimingHook]] = None,
+        repairer: Optional[CodeRepairer] = None
+    ):
+        self.providers = providers
+        self.extract = extract
+        self.validate = validate
+        self.clean = clean
+        self.repairer = repairer  # Fixes invalid code before another full attempt
+        self.hooks: List[TimingHook] = list(hooks or [])
+
+    def add_hook(self, hook: TimingHook):
+        """Register hook(stage, seconds, job, info), called after every stage"""
+        self.hooks.append(hook)
+
+    def _emit(self, stage: str, started: float, job: SectionJob, **info):
+        elapsed = time.monotonic() - started
+        for hook in self.hooks:
+            try:
+                hook(stage, elapsed, job, info)
+            except Exception as e:
+                print(f"[WARN] Pipeline hook failed on {stage}: {e}")
+
+    async def run(self, job: SectionJob) -> PipelineResult:
+        """Generate code for one job; always returns something renderable"""
+        run_started = time.monotonic()
+
+        started = time.monotonic()
+        if job.system_prompt is None:
+            job.system_prompt = build_system_prompt(job.output_format)
+        self._emit("prompt", started, job)
+
+        code, provider_name, model, attempts = None, "none", None, 0
+        current: Optional[Provider] = None
+        try:
+            for provider in self.providers:
+                if not provider.is_available():
+                    continue
+                if provider.is_open():
+                    print(f"[CIRCUIT] {provider.name} circuit open - skipping to fallback for {job.name}")
+                    continue
+
+                for attempt in range(1, provider.max_attempts + 1):
+                    if job.deadline is not None and job.deadline.expired() and not provider.instant:
+                        print(f"[DEADLINE] No time left for {job.name} on {provider.name}")
+                        break
+                    attempts += 1
+                    model = provider.select_model()
+                    current = provider
+                    try:
+                        code = await self._run_attempt(provider, job, model, attempt, attempts)
+                    except DeadlineExceeded as e:
+                        # Out of budget for this provider - the next one gets whatever is left
+                        print(f"[DEADLINE] {job.name}: {e}")
+                        break
+                    if code:
+                        provider_name = provider.name
+                        break
+                if code:
+                    break
+        except asyncio.CancelledError:
+            # Cancelling the attempt already closed its upstream request (streams abort in aclose)
+            print(f"[CANCELLED] {job.name} after {attempts} attempt(s) ({job.streamed_chars} chars streamed)")
+            self._emit(
+                "cancelled", run_started, job,
+                provider=current.name if current else None,
+                upstream=current is not None and not current.instant,
+                max_tokens=current.max_tokens if current else 0,
+                streamed_chars=job.streamed_chars
+            )
+            raise
+
+        started = time.monotonic()
+        if self.clean:
+            code = self._clean(code, job.name)
+        elif not code:
+            code = placeholder_component(job.name)
+        self._emit("clean", started, job)
+
+        self._emit(
+            "total", run_started, job, provider=provider_name, model=model, attempts=attempts,
+            generated=current is not None and not current.instant and provider_name != "none", chars=len(code)
+        )
+        return PipelineResult(code, provider_name, model, attempts, time.monotonic() - run_started)
+
+    async def _run_attempt(
+        self,
+        provider: Provider,
+        job: SectionJob,
+        model: Optional[str],
+        attempt: int,
+        attempt_number: int
+    ) -> Optional[str]:
+        """One attempt (raced against a backup model when hedging applies)"""
+        if provider.hedge and hedge_policy.enabled:
+            backup_model = hedge_policy.backup_model
+            if backup_model == model:
+                backup_model = provider.select_model(exclude={model})
+            race = hedge_policy.run(
+                lambda: self._attempt(provider, job, model, attempt, attempt_number),
+                lambda: self._attempt(provider, job, backup_model, attempt, attempt_number, stream_deltas=False)
+            )
+            return await (job.deadline.run(race) if job.deadline is not None else race)
+
+        started = time.monotonic()
+        single = self._attempt(provider, job, model, attempt, attempt_number)
+        bounded = job.deadline is not None and not provider.instant
+        code = await (job.deadline.run(single) if bounded else single)
+        if code and provider.hedge:
+            hedge_policy.record(time.monotonic() - started)
+        return code
+
+    async def _attempt(
+        self,
+        provider: Provider,
+        job: SectionJob,
+        model: Optional[str],
+        attempt: int,
+        attempt_number: int,
+        stream_deltas: bool = True
+    ) -> Optional[str]:
+        """call -> extract -> validate -> repair. Returns valid code or None"""
+        label = f"{provider.name}/{model}" if model else provider.name
+        print(f"[DEBUG] Generating {job.name} with {label} (attempt {attempt_number})...")
+
+        started = time.monotonic()
+        try:
+            raw_response = await provider.call(job, model, attempt, stream_deltas)
+        except asyncio.CancelledError:
+            raise
+        except DeadlineExceeded as e:
+            print(f"[DEADLINE] Skipping {label} attempt {attempt_number} for {job.name}: {e}")
+            return None
+        except StreamRejected as e:
+            # Counts as a failed validation, without waiting for the rest of the completion
+            print(f"[ABORT] {label} for {job.name} (attempt {attempt_number}): {e}")
+            self._emit(
+                "early_abort", started, job, provider=provider.name, model=model,
+                reason=e.reason, streamed_chars=e.streamed_chars, max_tokens=provider.max_tokens
+            )
+            provider.record_validation(model, False)
+            return None
+        except Exception as e:
+            print(f"[WARN] {label} failed for {job.name} (attempt {attempt_number}): {e}")
+            return None
+        finally:
+            self._emit("call", started, job, provider=provider.name, model=model)
+
+        started = time.monotonic()
+        code = extract_code(raw_response) if self.extract else raw_response
+        self._emit("extract", started, job, provider=provider.name)
+
+        if not self.validate:
+            return code or None
+
+        started = time.monotonic()
+        is_valid, error_msg = self._validate(code, job.name)
+        self._emit("validate", started, job, provider=provider.name, valid=is_valid)
+        provider.record_validation(model, is_valid)  # The model's own output, before any repair
+
+        if not is_valid:
+            started = time.monotonic()
+            repaired = await self.repair(code, error_msg, job)
+            self._emit("repair", started, job, provider=provider.name, repaired=repaired is not None)
+            if repaired is not None:
+                code, is_valid = repaired, True
+
+        if is_valid:
+            print(f"[OK] Generated {job.name} with {label} - attempt {attempt_number} ({len(code)} chars)")
+            return code
+
+        print(f"[WARN] Invalid code from {label} (attempt {attempt_number}): {error_msg}")
+        await provider.discard(job, model, attempt)
+        return None
+
+    async def repair(self, code: str, error_msg: str, job: SectionJob) -> Optional[str]:
+        """Fix invalid code without another full generation (None = cannot repair)"""
+        if self.repairer is None:
+            return None
+        # What another attempt would cost: both prompts again plus a completion of this size
+        regeneration_tokens = (len(job.system_prompt or "") + len(job.prompt) + len(code)) // CHARS_PER_TOKEN
+        return await self.repairer.repair(
+            code, error_msg, job.name, job.output_format, regeneration_tokens,
+            use_cache=job.use_cache, deadline=job.deadline
+        )
+
+    @staticmethod
+    def _validate(code: str, section_name: str):
+        return validate_component_code(code, section_name)
+
+    @staticmethod
+    def _clean(code: Optional[str], section_name: str) -> str:
+        """Final cleaning/validation; falls back to a placeholder section"""
+        try:
+            return clean_and_validate_code(code or "", section_name)
+        except ValueError as e:
+            print(f"[ERROR] Final validation failed for {section_name}: {e}")
+            return placeholder_component(section_name)
+
+
+# Shared stage timings for every pipeline
+pipeline_stats = PipelineStats()
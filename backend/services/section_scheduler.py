@@ -0,0 +1,151 @@
+"""
+Section Scheduler - Process-wide worker pool for section generation
+Every request used to launch all of its sections at once, so under load
+a Footer for one user could hold a slot while another user's Hero
+waited. Sections now wait for one of SECTION_WORKERS slots:
+
+- within a request, lower `order` goes first (Navigation, Hero, ...)
+- across requests, free slots are handed out round-robin, so one large
+  page cannot starve the others
+- background work (the warm pool) only gets a slot while no live
+  request's section is waiting
+
+Queue depth and wait times are reported for /api/stats.
+"""
+
+import os
+import time
+import heapq
+import asyncio
+import itertools
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Dict, List, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SECTION_WORKERS = int(os.getenv("SECTION_WORKERS", "8"))
+WAIT_SAMPLES = 500  # Recent waits kept for percentiles
+
+
+class SectionScheduler:
+    """Bounded pool of section slots with per-request priority and round-robin fairness"""
+
+    def __init__(self, workers: int = SECTION_WORKERS):
+        self.workers = max(workers, 1)
+        self.active = 0
+        # request id -> heap of (order, sequence, future); key order is the round-robin turn
+        self._queues: "OrderedDict[str, List[Tuple[int, int, asyncio.Future]]]" = OrderedDict()
+        self._background: List[Tuple[int, int, asyncio.Future]] = []  # Served after every live section
+        self._sequence = itertools.count()
+        self._waits: deque = deque(maxlen=WAIT_SAMPLES)
+        self._wait_by_order: Dict[int, List[float]] = {}  # order -> [count, total seconds]
+        self._stats = {
+            "granted": 0,
+            "queued": 0,  # Had to wait for a slot
+            "max_queue_depth": 0
+        }
+
+    @asynccontextmanager
+    async def slot(self, request_id: str, order: int = 0, background: bool = False):
+        """
+        Hold one worker slot for a section of request_id (lower order runs first)
+
+        Background sections wait until no live section is queued.
+        """
+        started = time.monotonic()
+        if self.active < self.workers and not self._queues and not (background and self._background):
+            self.active += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            queue = self._background if background else self._queues.setdefault(request_id, [])
+            heapq.heappush(queue, (order, next(self._sequence), future))
+            self._stats["queued"] += 1
+            self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], self.queue_depth())
+            self._dispatch()  # A slot may be free behind cancelled waiters
+            try:
+                await future  # Resolved by _dispatch() once a slot is ours
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    self._release()  # Granted just as we were cancelled
+                raise
+
+        self._record_wait(order, time.monotonic() - started)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def queue_depth(self) -> int:
+        """Sections waiting for a slot"""
+        return sum(
+            1 for queue in [*self._queues.values(), self._background]
+            for _, _, future in queue if not future.done()
+        )
+
+    def _release(self):
+        self.active -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        """Hand free slots to the next request in turn, highest priority section first"""
+        while self.active < self.workers and (self._queues or self._background):
+            if self._queues:
+                request_id, queue = next(iter(self._queues.items()))
+                future = self._pop_waiter(queue)
+                # Move the request to the back of the line (or drop it once empty)
+                del self._queues[request_id]
+                if queue:
+                    self._queues[request_id] = queue
+            else:
+                future = self._pop_waiter(self._background)
+            if future is not None:
+                self.active += 1
+                future.set_result(None)
+
+    @staticmethod
+    def _pop_waiter(queue: List[Tuple[int, int, asyncio.Future]]):
+        """Highest priority waiter still waiting (cancelled ones are dropped), or None"""
+        while queue:
+            _, _, candidate = heapq.heappop(queue)
+            if not candidate.done():
+                return candidate
+        return None
+
+    def _record_wait(self, order: int, seconds: float):
+        self._stats["granted"] += 1
+        self._waits.append(seconds)
+        by_order = self._wait_by_order.setdefault(order, [0, 0.0])
+        by_order[0] += 1
+        by_order[1] += seconds
+
+    def get_stats(self) -> Dict:
+        """Slot usage, queue depth and wait-time percentiles"""
+        waits = sorted(self._waits)
+
+        def percentile(p: float) -> float:
+            return round(waits[min(int(len(waits) * p), len(waits) - 1)], 3) if waits else 0.0
+
+        return {
+            **self._stats,
+            "workers": self.workers,
+            "active": self.active,
+            "queue_depth": self.queue_depth(),
+            "waiting_requests": len(self._queues),
+            "background_waiting": sum(1 for _, _, future in self._background if not future.done()),
+            "wait": {
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "max": round(waits[-1], 3) if waits else 0.0,
+                "samples": len(waits)
+            },
+            "avg_wait_by_order": {
+                order: round(total / count, 3)
+                for order, (count, total) in sorted(self._wait_by_order.items())
+            }
+        }
+
+
+# Singleton instance
+section_scheduler = SectionScheduler()
@@ -0,0 +1,170 @@
+"""
+Single-Flight - Coalesce identical in-flight LLM requests
+When several callers ask for the same completion at the same moment,
+only the first one reaches the provider; the others await its result.
+
+Cancellation: a waiter that disconnects only stops waiting. The shared
+upstream call is cancelled only when every waiter has gone away. A stream
+subscriber counts once it starts iterating, so one that never does cannot
+keep the upstream alive.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+class _Flight:
+    """One shared upstream call and the number of callers waiting on it"""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class _SharedStream:
+    """One shared upstream stream, replayed to every subscriber"""
+
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self.changed = asyncio.Condition()
+        self.task: Optional[asyncio.Task] = None
+        self.source: Any = None  # Underlying stream object (for usage/finish_reason)
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls that share a key"""
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self._streams: Dict[str, _SharedStream] = {}
+        self._stats = {
+            "calls": 0,
+            "coalesced": 0,
+            "upstream_cancelled": 0
+        }
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn() once per key among concurrent callers and share its result
+
+        Exceptions from fn() are raised to every waiter.
+        """
+        self._stats["calls"] += 1
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget_flight(key, flight))
+        else:
+            self._stats["coalesced"] += 1
+            print(f"[SINGLE-FLIGHT] Joined in-flight request ({flight.waiters + 1} waiters)")
+
+        flight.waiters += 1
+        try:
+            # shield(): cancelling this waiter must not cancel the shared task
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                self._stats["upstream_cancelled"] += 1
+                self._forget_flight(key, flight)
+                flight.task.cancel()
+
+    def stream(
+        self,
+        key: str,
+        open_stream: Callable[[], Any]
+    ) -> Tuple[Any, AsyncIterator[str]]:
+        """
+        Share one upstream text stream among concurrent subscribers
+
+        open_stream() must return an async iterator of text deltas. Returns
+        (source, deltas): the shared upstream object (for metadata such as
+        usage) and this subscriber's iterator. Late subscribers first receive
+        everything streamed so far, then tail it.
+        """
+        self._stats["calls"] += 1
+        shared = self._streams.get(key)
+        if shared is None:
+            shared = _SharedStream()
+            shared.source = open_stream()
+            shared.task = asyncio.ensure_future(self._pump(shared))
+            self._streams[key] = shared
+            shared.task.add_done_callback(lambda _: self._forget_stream(key, shared))
+        else:
+            self._stats["coalesced"] += 1
+            print(f"[SINGLE-FLIGHT] Joined in-flight stream ({shared.subscribers + 1} subscribers)")
+
+        return shared.source, self._subscribe(key, shared)
+
+    async def _subscribe(self, key: str, shared: _SharedStream) -> AsyncIterator[str]:
+        """Replay buffered chunks, then tail the shared stream until it ends"""
+        # Counted here, not in stream(): the finally below only runs once iteration starts
+        shared.subscribers += 1
+        position = 0
+        try:
+            while True:
+                async with shared.changed:
+                    await shared.changed.wait_for(
+                        lambda: position < len(shared.chunks) or shared.done
+                    )
+                    chunks = shared.chunks[position:]
+                    finished = shared.done
+                position += len(chunks)
+                for chunk in chunks:
+                    yield chunk
+                if finished and position >= len(shared.chunks):
+                    break
+            if shared.error is not None:
+                raise shared.error
+        finally:
+            shared.subscribers -= 1
+            if shared.subscribers == 0 and not shared.task.done():
+                self._stats["upstream_cancelled"] += 1
+                self._forget_stream(key, shared)
+                shared.task.cancel()
+
+    def get_stats(self) -> Dict:
+        """Coalescing counters for monitoring"""
+        return {
+            **self._stats,
+            "in_flight": len(self._flights) + len(self._streams)
+        }
+
+    async def _pump(self, shared: _SharedStream):
+        """Read the upstream stream into the shared buffer"""
+        try:
+            async for chunk in shared.source:
+                async with shared.changed:
+                    shared.chunks.append(chunk)
+                    shared.changed.notify_all()
+        except asyncio.CancelledError:
+            shared.error = asyncio.CancelledError()
+            raise
+        except Exception as e:
+            shared.error = e
+        finally:
+            aclose = getattr(shared.source, "aclose", None)
+            if aclose is not None:
+                try:
+                    await aclose()
+                except Exception:
+                    pass
+            async with shared.changed:
+                shared.done = True
+                shared.changed.notify_all()
+
+    def _forget_flight(self, key: str, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def _forget_stream(self, key: str, shared: _SharedStream):
+        if self._streams.get(key) is shared:
+            del self._streams[key]
+
+
+# Singleton instance
+single_flight = SingleFlight()
@@ -4,14 +4,11 @@ Generates context-aware UI/UX improvement suggestions based on what element the
 """
 
 import os
+import json
 from typing import Dict, List, Optional
-from openai import AsyncOpenAI
 
-# Initialize OpenAI client
-openai_client = None
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-if OPENAI_API_KEY:
-    openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+# Shared OpenAI client (None without OPENAI_API_KEY)
+from .openai_fallback import openai_client
 
 async def generate_suggestions(
     element_type: str,
@@ -84,7 +81,6 @@ Be specific with CSS values (e.g., "fontSize": "1.25rem" not "bigger")."""
                 max_tokens=1000
             )
             
-            import json
             suggestions_text = response.choices[0].message.content.strip()
             
             # Clean markdown code fences if present
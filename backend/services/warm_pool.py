@@ -0,0 +1,201 @@
+"""
+Warm Pool - Pre-generated sections for predictable prompts
+get_section_prompts() fills fixed templates with the context found in
+the user's prompt. When none is found (and for templates that take no
+context at all) the section prompt is fully predictable, so its result
+can be generated ahead of time.
+
+When enabled, the pool generates and validates WARM_POOL_VARIANTS
+variants of every such section at startup and refreshes them on a
+schedule. Requests whose section prompt matches exactly are served a
+pooled variant instantly (rotating through the variants).
+
+Limits:
+- at most WARM_POOL_MAX_ENTRIES variants in total (above-the-fold
+  sections are filled first)
+- variants expire after WARM_POOL_TTL seconds and are regenerated by the
+  next refresh (every WARM_POOL_REFRESH_INTERVAL seconds; 0 = only at
+  startup)
+"""
+
+import os
+import time
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+from utils.section_splitter import get_section_prompts
+
+load_dotenv()
+
+WARM_POOL_ENABLED = os.getenv("WARM_POOL_ENABLED", "false").lower() in ("1", "true", "yes")
+WARM_POOL_PAGE_TYPES = [t.strip() for t in os.getenv("WARM_POOL_PAGE_TYPES", "saas,portfolio,agency").split(",") if t.strip()]
+WARM_POOL_OUTPUT_FORMATS = [f.strip() for f in os.getenv("WARM_POOL_OUTPUT_FORMATS", "vanilla").split(",") if f.strip()]
+WARM_POOL_VARIANTS = int(os.getenv("WARM_POOL_VARIANTS", "2"))  # Variants per section prompt
+WARM_POOL_MAX_ENTRIES = int(os.getenv("WARM_POOL_MAX_ENTRIES", "100"))  # Variants in total
+WARM_POOL_TTL = float(os.getenv("WARM_POOL_TTL", "21600"))  # seconds
+WARM_POOL_REFRESH_INTERVAL = float(os.getenv("WARM_POOL_REFRESH_INTERVAL", "3600"))  # seconds, 0 = startup only
+WARM_POOL_CONCURRENCY = int(os.getenv("WARM_POOL_CONCURRENCY", "2"))
+
+# generate(section_info, output_format) -> validated code, or None if only a fallback was produced
+VariantGenerator = Callable[[Dict, str], Awaitable[Optional[str]]]
+
+
+def _format_key(output_format: Optional[str]) -> str:
+    """Output formats that share a system prompt share pool entries"""
+    return "typescript" if output_format == "typescript" else "vanilla"
+
+
+class WarmPool:
+    """Bounded pool of validated section variants keyed by exact section prompt"""
+
+    def __init__(
+        self,
+        enabled: bool = WARM_POOL_ENABLED,
+        page_types: List[str] = WARM_POOL_PAGE_TYPES,
+        output_formats: List[str] = WARM_POOL_OUTPUT_FORMATS,
+        variants: int = WARM_POOL_VARIANTS,
+        max_entries: int = WARM_POOL_MAX_ENTRIES,
+        ttl: float = WARM_POOL_TTL,
+        refresh_interval: float = WARM_POOL_REFRESH_INTERVAL,
+        concurrency: int = WARM_POOL_CONCURRENCY
+    ):
+        self.enabled = enabled
+        self.page_types = page_types
+        self.output_formats = [_format_key(output_format) for output_format in output_formats]
+        self.variants = variants
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self.concurrency = max(concurrency, 1)
+
+        # (output format, section prompt) -> [(created, code)]
+        self._pool: Dict[Tuple[str, str], List[Tuple[float, str]]] = {}
+        self._turn: Dict[Tuple[str, str], int] = {}  # Next variant to serve per key
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "generated": 0,
+            "failed": 0,
+            "expired": 0,
+            "refreshes": 0,
+            "last_refresh": None
+        }
+
+    def targets(self) -> List[Tuple[str, Dict]]:
+        """(output format, section) for every predictable section prompt, above-the-fold first"""
+        seen, targets = set(), []
+        for output_format in self.output_formats:
+            for page_type in self.page_types:
+                # An empty prompt yields the default context, as extract_context() does for vague prompts
+                for section in get_section_prompts("", page_type):
+                    if (output_format, section["prompt"]) not in seen:
+                        seen.add((output_format, section["prompt"]))
+                        targets.append((output_format, section))
+        return sorted(targets, key=lambda target: target[1]["order"])
+
+    def get(self, prompt: str, output_format: Optional[str]) -> Optional[str]:
+        """A pooled variant for this exact section prompt, or None"""
+        if not self.enabled:
+            return None
+        key = (_format_key(output_format), prompt)
+        variants = [variant for variant in self._pool.get(key, []) if time.time() - variant[0] < self.ttl]
+        if not variants:
+            self._stats["misses"] += 1
+            return None
+        turn = self._turn.get(key, 0)
+        self._turn[key] = turn + 1
+        self._stats["hits"] += 1
+        return variants[turn % len(variants)][1]
+
+    def size(self) -> int:
+        return sum(len(variants) for variants in self._pool.values())
+
+    async def refresh(self, generate: VariantGenerator) -> int:
+        """Drop expired variants and generate missing ones within the size limit; returns variants added"""
+        now = time.time()
+        for key, variants in list(self._pool.items()):
+            fresh = [variant for variant in variants if now - variant[0] < self.ttl]
+            self._stats["expired"] += len(variants) - len(fresh)
+            self._pool[key] = fresh
+
+        # Plan missing variants in priority order until the pool would be full. Each round
+        # holds at most one variant per prompt: identical in-flight requests are coalesced
+        # by single-flight and would come back as the same variant
+        budget = self.max_entries - self.size()
+        rounds: List[List[Tuple[str, Dict]]] = []
+        for output_format, section in self.targets():
+            missing = min(self.variants - len(self._pool.get((output_format, section["prompt"]), [])), budget)
+            for variant in range(max(missing, 0)):
+                if variant == len(rounds):
+                    rounds.append([])
+                rounds[variant].append((output_format, section))
+            budget -= max(missing, 0)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fill(output_format: str, section: Dict) -> bool:
+            async with semaphore:
+                try:
+                    code = await generate(section, output_format)
+                except Exception as e:
+                    print(f"[WARM-POOL] {section['name']} failed: {e}")
+                    code = None
+            if not code:
+                self._stats["failed"] += 1
+                return False
+            self._pool.setdefault((output_format, section["prompt"]), []).append((time.time(), code))
+            self._stats["generated"] += 1
+            return True
+
+        added = 0
+        for batch in rounds:
+            added += sum(await asyncio.gather(*(fill(output_format, section) for output_format, section in batch)))
+        self._stats["refreshes"] += 1
+        self._stats["last_refresh"] = now
+        print(f"[WARM-POOL] Refreshed: {added}/{sum(map(len, rounds))} variants generated, {self.size()} pooled")
+        return added
+
+    def start(self, generate: VariantGenerator):
+        """Warm the pool in the background now, then refresh it on schedule"""
+        if not self.enabled or self._task is not None:
+            return
+
+        async def run():
+            while True:
+                try:
+                    await self.refresh(generate)
+                except Exception as e:
+                    print(f"[WARM-POOL] Refresh failed: {e}")
+                if self.refresh_interval <= 0:
+                    return
+                await asyncio.sleep(self.refresh_interval)
+
+        print(f"[WARM-POOL] Warming {len(self.targets())} section prompts x {self.variants} variants")
+        self._task = asyncio.create_task(run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_stats(self) -> Dict:
+        """Pool size, hit rate and refresh counters"""
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "enabled": self.enabled,
+            "entries": self.size(),
+            "max_entries": self.max_entries,
+            "prompts": len(self._pool),
+            "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else 0.0
+        }
+
+
+# Singleton instance
+warm_pool = WarmPool()
@@ -0,0 +1,12 @@
+"""
+Test setup - keep the module singletons off the network and the disk
+Services read their configuration from the environment at import time.
+"""
+
+import os
+
+os.environ.setdefault("LLM_CACHE_DISK", "false")
+os.environ.setdefault("WARM_POOL_ENABLED", "false")
+os.environ.setdefault("AGENTS_ENABLED", "false")
+os.environ.pop("OPENAI_API_KEY", None)
+os.environ.pop("OPENROUTER_API_KEY", None)
@@ -0,0 +1,120 @@
+import pytest
+
+from services.circuit_breaker import (
+    CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitBreakers, CircuitOpenError
+)
+
+
+def breakers_with(provider: CircuitBreaker, model: CircuitBreaker) -> CircuitBreakers:
+    breakers = CircuitBreakers(enabled=True)
+    breakers._providers["openrouter"] = provider
+    breakers._models["openrouter"] = {"model": model}
+    return breakers
+
+
+def test_error_rate_opens_the_breaker():
+    breaker = CircuitBreaker("test", failure_rate=0.5, min_calls=4)
+    breaker.record_success()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    assert breaker.get_stats()["rejected"] == 1
+
+
+def test_consecutive_timeouts_open_the_breaker():
+    breaker = CircuitBreaker("test", min_calls=100, consecutive_timeouts=2)
+    breaker.record_failure(timeout=True)
+    breaker.record_success()
+    breaker.record_failure(timeout=True)
+    assert breaker.state == CLOSED
+    breaker.record_failure(timeout=True)
+    assert breaker.state == OPEN
+
+
+def test_half_open_lets_one_probe_through():
+    breaker = CircuitBreaker("test", min_calls=1, open_seconds=60)
+    breaker.record_failure()
+    assert not breaker.allow()
+    breaker.opened_at -= 60  # The pause is over
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+
+
+def test_probe_success_closes_and_probe_failure_reopens():
+    breaker = CircuitBreaker("test", min_calls=1, open_seconds=0)
+    breaker.record_failure()
+    breaker.check()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+    breaker = CircuitBreaker("test", min_calls=1, open_seconds=60)
+    breaker.record_failure()
+    breaker.opened_at -= 60
+    breaker.check()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.retry_in() > 0
+
+
+def test_released_probe_lets_the_next_call_probe():
+    breaker = CircuitBreaker("test", min_calls=1, open_seconds=60)
+    breaker.record_failure()
+    breaker.opened_at -= 60
+    breaker.check()
+    assert not breaker.available()
+    breaker.release(breaker.probe_started)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+
+
+def test_model_rejection_does_not_strand_the_provider_probe():
+    provider = CircuitBreaker("openrouter", min_calls=1, open_seconds=60)
+    model = CircuitBreaker("openrouter/model", min_calls=1, open_seconds=60)
+    breakers = breakers_with(provider, model)
+    provider.record_failure()
+    provider.opened_at -= 60  # Provider is due a probe
+    model.record_failure()  # Model is still open
+
+    with pytest.raises(CircuitOpenError):
+        breakers.check("openrouter", "model")
+    assert provider.state == HALF_OPEN
+    assert provider.probe_started is None
+
+
+def test_release_after_a_call_without_verdict():
+    provider = CircuitBreaker("openrouter", min_calls=1, open_seconds=60)
+    breakers = breakers_with(provider, CircuitBreaker("openrouter/model"))
+    provider.record_failure()
+    provider.opened_at -= 60
+
+    probes = breakers.check("openrouter", "model")
+    assert probes == [(provider, provider.probe_started)]
+    with pytest.raises(CircuitOpenError):
+        breakers.check("openrouter", "model")
+    breakers.release(probes)  # e.g. the probe got a 429
+    assert breakers.check("openrouter", "model")
+
+
+def test_release_after_a_verdict_is_a_no_op():
+    provider = CircuitBreaker("openrouter", min_calls=1, open_seconds=60)
+    breakers = breakers_with(provider, CircuitBreaker("openrouter/model"))
+    provider.record_failure()
+    provider.opened_at -= 60
+
+    probes = breakers.check("openrouter", "model")
+    breakers.record_failure("openrouter", "model")
+    breakers.release(probes)
+    assert provider.state == OPEN
+
+
+def test_disabled_registry_never_rejects():
+    breakers = CircuitBreakers(enabled=False)
+    for _ in range(10):
+        breakers.record_failure("openrouter", "model", timeout=True)
+    assert breakers.check("openrouter", "model") == []
+    assert not breakers.is_open("openrouter")
@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+from services.deadline import DEADLINE_HEADER, DEADLINE_MAX, Deadline, DeadlineExceeded
+
+
+def test_fit_max_tokens_shrinks_to_the_usable_budget():
+    deadline = Deadline(100, reserve=0)
+    assert 790 < deadline.fit_max_tokens(1000, 0.0, 10.0) <= 800  # 80% of 100s at 10 tokens/s
+    assert deadline.fit_max_tokens(500, 0.0, 10.0) == 500
+
+
+def test_fit_max_tokens_raises_when_too_little_fits():
+    deadline = Deadline(10, reserve=0)
+    with pytest.raises(DeadlineExceeded):
+        deadline.fit_max_tokens(1000, 5.0, 10.0)
+
+
+def test_timeout_is_capped_by_the_stage_timeout():
+    deadline = Deadline(100, reserve=2)
+    assert deadline.timeout(30) == 30
+    assert 97 < deadline.timeout() <= 98
+
+
+def test_run_cuts_off_a_stage_at_the_deadline():
+    deadline = Deadline(0.05, reserve=0)
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(deadline.run(asyncio.sleep(1)))
+
+
+def test_header_overrides_the_endpoint_budget():
+    assert Deadline.for_endpoint("jobs", "30").budget == 30
+    assert Deadline.for_endpoint("jobs", str(DEADLINE_MAX * 2)).budget == DEADLINE_MAX
+    assert Deadline.for_endpoint("jobs", "soon").budget == Deadline.for_endpoint("jobs").budget
+    assert DEADLINE_HEADER == "X-Request-Deadline"
+
+
+def test_non_finite_header_values_are_ignored():
+    default = Deadline.for_endpoint("generate-multi-section-stream").budget
+    for value in ("nan", "inf", "-inf", "NaN"):
+        deadline = Deadline.for_endpoint("generate-multi-section-stream", value)
+        assert deadline.budget == default
+        assert 0 < deadline.remaining() <= default
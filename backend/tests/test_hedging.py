@@ -0,0 +1,67 @@
+import asyncio
+
+from services.hedging import HedgePolicy
+
+
+def attempt(result=None, delay=0.0, error=None, calls=None):
+    async def run():
+        if calls is not None:
+            calls.append(result)
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return result
+    return run
+
+
+def test_fast_primary_wins_without_a_backup():
+    policy = HedgePolicy(default_delay=1)
+    calls = []
+    result = asyncio.run(policy.run(attempt("primary"), attempt("backup", calls=calls)))
+    assert result == "primary"
+    assert calls == []
+
+
+def test_slow_primary_is_hedged_and_the_backup_wins():
+    policy = HedgePolicy(default_delay=0.01)
+    result = asyncio.run(policy.run(attempt("primary", delay=1), attempt("backup")))
+    assert result == "backup"
+    stats = policy.get_stats()
+    assert (stats["hedged"], stats["backup_wins"]) == (1, 1)
+
+
+def test_primary_error_before_the_delay_launches_the_backup():
+    policy = HedgePolicy(default_delay=10)
+    result = asyncio.run(policy.run(attempt(error=RuntimeError("502")), attempt("backup")))
+    assert result == "backup"
+    assert policy.get_stats()["early_backups"] == 1
+
+
+def test_invalid_primary_before_the_delay_launches_the_backup():
+    policy = HedgePolicy(default_delay=10)
+    assert asyncio.run(policy.run(attempt(None), attempt("backup"))) == "backup"
+
+
+def test_backup_runs_once_and_none_when_both_fail():
+    policy = HedgePolicy(default_delay=10)
+    calls = []
+    result = asyncio.run(policy.run(attempt(None), attempt(None, calls=calls)))
+    assert result is None
+    assert calls == [None]
+
+
+def test_cancelled_attempt_counts_as_a_failure():
+    policy = HedgePolicy(default_delay=10)
+
+    async def cancelled():
+        raise asyncio.CancelledError()
+
+    assert asyncio.run(policy.run(cancelled, attempt("backup"))) == "backup"
+
+
+def test_hedge_delay_uses_the_latency_percentile():
+    policy = HedgePolicy(percentile=0.9, min_samples=10, default_delay=15)
+    assert policy.hedge_delay() == 15
+    for latency in range(1, 11):
+        policy.record(latency)
+    assert policy.hedge_delay() == 10
@@ -0,0 +1,126 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+import main
+from services.job_store import JobLimitError, JobStore
+
+
+def page_events(*events, wait=None):
+    async def make_events(job_id):
+        for event in events:
+            yield event
+        if wait is not None:
+            await wait.wait()
+    return make_events
+
+
+SECTION_EVENTS = (
+    {"type": "init"},
+    {"type": "section_delta", "section": "Hero", "delta": "export"},
+    {"type": "section_delta", "section": "Footer", "delta": "export"},
+    {"type": "section_complete", "section": "Hero", "code": "export function Hero() {}"},
+    {"type": "complete"},
+)
+
+
+async def drain(job, last_event_id=0):
+    return [(event_id, event["type"]) async for event_id, event in job.events_after(last_event_id)]
+
+
+def test_events_replay_after_the_last_event_id():
+    async def run():
+        store = JobStore()
+        job = store.create(page_events(*SECTION_EVENTS))
+        await job.task
+        return job, await drain(job), await drain(job, 3)
+
+    job, everything, resumed = asyncio.run(run())
+    assert job.status == "completed"
+    # The Hero deltas are superseded by its section_complete
+    assert everything == [(1, "init"), (3, "section_delta"), (4, "section_complete"), (5, "complete")]
+    assert resumed == [(4, "section_complete"), (5, "complete")]
+
+
+def test_readers_tail_a_running_job():
+    async def run():
+        store = JobStore()
+        release = asyncio.Event()
+        job = store.create(page_events({"type": "init"}, wait=release))
+        reader = asyncio.create_task(drain(job))
+        await asyncio.sleep(0.01)
+        assert not reader.done()
+        release.set()
+        return await reader
+
+    assert asyncio.run(run()) == [(1, "init")]
+
+
+def test_failed_job_logs_an_error_event():
+    async def failing(job_id):
+        yield {"type": "init"}
+        raise RuntimeError("upstream down")
+
+    async def run():
+        job = JobStore().create(failing)
+        await job.task
+        return job, await drain(job)
+
+    job, events = asyncio.run(run())
+    assert job.status == "failed"
+    assert events == [(1, "init"), (2, "error")]
+
+
+def test_full_store_evicts_finished_jobs_and_rejects_when_all_run():
+    async def run():
+        store = JobStore(max_jobs=1)
+        finished = store.create(page_events({"type": "init"}))
+        await finished.task
+        release = asyncio.Event()
+        running = store.create(page_events(wait=release))
+        assert store.get(finished.id) is None
+        with pytest.raises(JobLimitError):
+            store.create(page_events())
+        release.set()
+        await running.task
+        return store.get_stats()
+
+    stats = asyncio.run(run())
+    assert (stats["created"], stats["evicted"], stats["rejected"]) == (2, 1, 1)
+
+
+def test_finished_jobs_expire_after_the_ttl():
+    async def run():
+        store = JobStore(ttl=0)
+        job = store.create(page_events())
+        await job.task
+        await asyncio.sleep(0.01)
+        return store.get(job.id), store.get_stats()["expired"]
+
+    assert asyncio.run(run()) == (None, 1)
+
+
+def test_events_endpoint_resumes_from_the_last_event_id_header(monkeypatch):
+    store = JobStore()
+    monkeypatch.setattr(main, "job_store", store)
+
+    async def run():
+        job = store.create(page_events(*SECTION_EVENTS))
+        await job.task
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get(f"/api/jobs/{job.id}/events", headers={"Last-Event-ID": "3"})
+            missing = await client.get("/api/jobs/unknown/events")
+        return response, missing
+
+    response, missing = asyncio.run(run())
+    messages = [block.split("\n") for block in response.text.strip().split("\n\n")]
+    assert [(ids, json.loads(data[len("data: "):])["type"]) for ids, data in messages] == [
+        ("id: 4", "section_complete"),
+        ("id: 5", "complete"),
+    ]
+    assert missing.status_code == 404
+    stats = store.get_stats()
+    assert (stats["resumed"], stats["replayed_events"]) == (1, 2)
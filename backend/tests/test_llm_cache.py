@@ -0,0 +1,48 @@
+import asyncio
+
+from services.llm_cache import LLMCache, make_cache_key
+
+
+def test_cache_key_covers_every_sampling_input():
+    base = make_cache_key("model", "system", "prompt", 0.7, 1000)
+    assert base == make_cache_key("model", "system", "prompt", 0.7, 1000)
+    assert base != make_cache_key("other", "system", "prompt", 0.7, 1000)
+    assert base != make_cache_key("model", "system", "prompt", 0.2, 1000)
+    assert base != make_cache_key("model", "system", "prompt", 0.7, 500)
+
+
+def test_memory_hit_and_eviction():
+    cache = LLMCache(disk_enabled=False)
+
+    async def run():
+        await cache.set("model", "system", "prompt", 0.7, 1000, "code")
+        hit = await cache.get("model", "system", "prompt", 0.7, 1000)
+        other_budget = await cache.get("model", "system", "prompt", 0.7, 500)
+        await cache.evict("model", "system", "prompt", 0.7, 1000)
+        evicted = await cache.get("model", "system", "prompt", 0.7, 1000)
+        return hit, other_budget, evicted
+
+    assert asyncio.run(run()) == ("code", None, None)
+
+
+def test_expired_entries_are_misses():
+    cache = LLMCache(disk_enabled=False, ttl=0)
+
+    async def run():
+        await cache.set("model", "system", "prompt", 0.7, 1000, "code")
+        return await cache.get("model", "system", "prompt", 0.7, 1000)
+
+    assert asyncio.run(run()) is None
+
+
+def test_disk_tier_survives_a_new_process(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+
+    async def store():
+        await LLMCache(disk_enabled=True, path=path).set("model", "system", "prompt", 0.7, 1000, "code")
+
+    async def load():
+        return await LLMCache(disk_enabled=True, path=path).get("model", "system", "prompt", 0.7, 1000)
+
+    asyncio.run(store())
+    assert asyncio.run(load()) == "code"
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from services import openai_fallback
+from services.deadline import Deadline
+from services.llm_cache import LLMCache
+
+
+@pytest.fixture
+def fallback(monkeypatch):
+    """generate_with_openai against a fresh memory cache and a fake completion call"""
+    cache = LLMCache(disk_enabled=False)
+    calls = []
+
+    def complete(finish_reason):
+        async def create_completion(prompt, system_prompt, model, temperature, max_tokens, timeout=None):
+            calls.append(max_tokens)
+            return "export function Hero() {}", finish_reason
+        monkeypatch.setattr(openai_fallback, "_create_completion", create_completion)
+
+    monkeypatch.setattr(openai_fallback, "llm_cache", cache)
+    monkeypatch.setattr(openai_fallback, "openai_client", object())
+    return cache, calls, complete
+
+
+def generate(**kwargs):
+    return asyncio.run(openai_fallback.generate_with_openai("prompt", "system", max_tokens=1000, **kwargs))
+
+
+def cached(cache, max_tokens=1000):
+    return asyncio.run(cache.get("gpt-4", "system", "prompt", 0.7, max_tokens))
+
+
+def test_complete_answers_are_cached(fallback):
+    cache, calls, complete = fallback
+    complete("stop")
+    assert generate() == "export function Hero() {}"
+    assert cached(cache) == "export function Hero() {}"
+    generate()
+    assert len(calls) == 1
+
+
+def test_truncated_answers_are_not_cached(fallback):
+    cache, calls, complete = fallback
+    complete("length")
+    generate()
+    assert cached(cache) is None
+    generate()
+    assert len(calls) == 2
+
+
+def test_deadline_shrunk_answers_are_not_cached(fallback, monkeypatch):
+    cache, calls, complete = fallback
+    complete("stop")
+    monkeypatch.setattr(openai_fallback.model_router, "expected_speed", lambda model: (0.0, 10.0))
+    generate(deadline=Deadline(100, reserve=0))  # ~800 of the 1000 tokens fit
+    fitted = calls[0]
+    assert 790 < fitted <= 800
+    assert cached(cache) is None
+    assert cached(cache, max_tokens=fitted) is None
+
+    # A request without a deadline gets the full budget, not the shrunk answer
+    generate()
+    assert calls == [fitted, 1000]
+    assert cached(cache) == "export function Hero() {}"
+
+
+def test_deadline_with_room_for_the_full_budget_is_cached(fallback, monkeypatch):
+    cache, calls, complete = fallback
+    complete("stop")
+    monkeypatch.setattr(openai_fallback.model_router, "expected_speed", lambda model: (0.0, 10.0))
+    generate(deadline=Deadline(600, reserve=0))
+    assert calls == [1000]
+    assert cached(cache) == "export function Hero() {}"
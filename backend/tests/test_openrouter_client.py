@@ -0,0 +1,81 @@
+import asyncio
+import importlib
+import json
+
+import httpx
+import pytest
+
+from services.circuit_breaker import CircuitBreakers
+from services.llm_cache import LLMCache
+from services.model_router import ModelRouter
+from services.rate_limiter import ProviderLimiter
+from services.single_flight import SingleFlight
+
+# The package re-exports the singleton under the module's name
+module = importlib.import_module("services.openrouter_client")
+
+CODE = "export function Hero() { return <section /> }"
+
+
+def sse_body() -> bytes:
+    chunk = {"choices": [{"delta": {"content": CODE}, "finish_reason": "stop"}], "usage": {"completion_tokens": 12}}
+    return f"data: {json.dumps(chunk)}\n\ndata: [DONE]\n\n".encode()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """OpenRouterClient against a mock transport with fresh limiter, router and breakers"""
+    limiter = ProviderLimiter("openrouter", max_in_flight=1)
+    router = ModelRouter()
+    monkeypatch.setattr(module, "openrouter_limiter", limiter)
+    monkeypatch.setattr(module, "model_router", router)
+    monkeypatch.setattr(module, "circuit_breakers", CircuitBreakers())
+    monkeypatch.setattr(module, "llm_cache", LLMCache(enabled=False))
+    monkeypatch.setattr(module, "single_flight", SingleFlight())
+
+    client = module.OpenRouterClient()
+    client.available = True
+    client.api_key = "test"
+    client._http_client = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, content=sse_body()))
+    )
+    return client, limiter, router
+
+
+def test_stream_ttfb_excludes_time_queued_in_the_limiter(client):
+    client, limiter, router = client
+
+    async def run():
+        async def hold_slot():
+            async with limiter.slot():
+                await asyncio.sleep(0.3)
+
+        holder = asyncio.ensure_future(hold_slot())
+        await asyncio.sleep(0.01)
+        stream = client.generate_stream("prompt", "system", model="gpt-4o", use_cache=False)
+        text = "".join([delta async for delta in stream])
+        await holder
+        return text, stream.ttfb
+
+    text, ttfb = asyncio.run(run())
+    assert text == CODE
+    assert ttfb < 0.2
+    stats = router.get_model_stats("gpt-4o")
+    assert stats["avg_ttfb"] < 0.2 and stats["avg_latency"] < 0.2
+
+
+def test_throttled_stream_does_not_count_as_a_model_error(client, monkeypatch):
+    client, limiter, router = client
+    monkeypatch.setattr(module, "RATE_LIMIT_MAX_RETRIES", 0)
+    client._http_client = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(429, headers={"retry-after": "0"}))
+    )
+
+    async def run():
+        stream = client.generate_stream("prompt", "system", model="gpt-4o", use_cache=False)
+        return [delta async for delta in stream]
+
+    with pytest.raises(module.RateLimitError):
+        asyncio.run(run())
+    stats = router.get_model_stats("gpt-4o")
+    assert (stats["samples"], stats["error_rate"]) == (0, 0)
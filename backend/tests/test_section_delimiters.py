@@ -0,0 +1,80 @@
+from utils.section_delimiters import END_MARKER, SECTION_MARKER, SectionStreamSplitter, build_page_prompt
+
+PAGE = (
+    "Sure, here is the page:\n"
+    "<<<SECTION Hero>>>\n"
+    "export function Hero() {}\n"
+    "<<<SECTION Features>>>\n"
+    "export function Features() {}\n"
+    "<<<END>>>\n"
+    "Hope this helps!\n"
+)
+
+
+def split(text, names=("Hero", "Features"), chunk=None):
+    splitter = SectionStreamSplitter(list(names))
+    events = []
+    chunks = [text] if chunk is None else [text[i:i + chunk] for i in range(0, len(text), chunk)]
+    for piece in chunks:
+        events.extend(splitter.feed(piece))
+    events.extend(splitter.close())
+    return splitter, events
+
+
+def completed(events):
+    return [(section, text) for kind, section, text in events if kind == "complete"]
+
+
+def test_sections_are_split_at_delimiter_lines():
+    splitter, events = split(PAGE)
+    assert completed(events) == [
+        ("Hero", "export function Hero() {}\n"),
+        ("Features", "export function Features() {}\n"),
+    ]
+    assert splitter.ended
+
+
+def test_delimiters_split_across_chunks_are_recognised():
+    for chunk in (1, 3, 7):
+        _, events = split(PAGE, chunk=chunk)
+        assert completed(events) == completed(split(PAGE)[1])
+        deltas = "".join(text for kind, section, text in events if kind == "delta" and section == "Hero")
+        assert deltas == "export function Hero() {}\n"
+
+
+def test_a_section_completes_when_the_next_delimiter_arrives():
+    splitter = SectionStreamSplitter(["Hero", "Features"])
+    assert splitter.feed("<<<SECTION Hero>>>\nexport function Hero() {}\n") == [
+        ("delta", "Hero", "export function Hero() {}\n")
+    ]
+    assert splitter.feed("<<<SECTION Features>>>\n") == [("complete", "Hero", "export function Hero() {}\n")]
+    assert splitter.current == "Features"
+
+
+def test_names_match_ignoring_case_spaces_and_dashes():
+    _, events = split("<<<SECTION call to-action >>>\ncode\n", names=["Call To Action"])
+    assert completed(events) == [("Call To Action", "code\n")]
+
+
+def test_unknown_and_repeated_sections_are_dropped():
+    text = "<<<SECTION Hero>>>\na\n<<<SECTION Pricing>>>\nb\n<<<SECTION Hero>>>\nc\n"
+    _, events = split(text, names=["Hero"])
+    assert completed(events) == [("Hero", "a\n")]
+
+
+def test_marker_like_text_stays_in_the_section():
+    text = "<<<SECTION Hero>>>\nconst a = b <<< 2\n<<<not a delimiter\n"
+    _, events = split(text, names=["Hero"], chunk=2)
+    assert completed(events) == [("Hero", "const a = b <<< 2\n<<<not a delimiter\n")]
+
+
+def test_close_completes_the_last_section_without_an_end_marker():
+    _, events = split("<<<SECTION Hero>>>\nexport function Hero() {}", names=["Hero"])
+    assert completed(events) == [("Hero", "export function Hero() {}")]
+
+
+def test_page_prompt_lists_sections_and_markers():
+    prompt = build_page_prompt([{"name": "Hero", "prompt": "A hero"}, {"name": "Footer", "prompt": "A footer"}])
+    assert "1. Hero\nA hero" in prompt and "2. Footer\nA footer" in prompt
+    assert SECTION_MARKER.format(name="Hero") in prompt
+    assert END_MARKER in prompt
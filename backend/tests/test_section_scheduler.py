@@ -0,0 +1,85 @@
+import asyncio
+
+from services.section_scheduler import SectionScheduler
+
+
+async def hold(scheduler, request_id, order, granted, release, background=False):
+    async with scheduler.slot(request_id, order, background=background):
+        granted.append(request_id)
+        await release.wait()
+
+
+def test_round_robin_across_requests_and_priority_within_one():
+    async def run():
+        scheduler = SectionScheduler(workers=1)
+        granted, release = [], asyncio.Event()
+        blocker = asyncio.create_task(hold(scheduler, "blocker", 0, granted, release))
+        await asyncio.sleep(0)
+        order = []
+
+        async def section(request_id, position):
+            async with scheduler.slot(request_id, position):
+                order.append((request_id, position))
+
+        tasks = [
+            asyncio.create_task(section("a", 2)),
+            asyncio.create_task(section("a", 1)),
+            asyncio.create_task(section("b", 5)),
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(blocker, *tasks)
+        return order
+
+    assert asyncio.run(run()) == [("a", 1), ("b", 5), ("a", 2)]
+
+
+def test_background_sections_wait_for_every_live_section():
+    async def run():
+        scheduler = SectionScheduler(workers=1)
+        granted, release = [], asyncio.Event()
+        blocker = asyncio.create_task(hold(scheduler, "blocker", 0, granted, release))
+        await asyncio.sleep(0)
+        order = []
+
+        async def section(request_id, background=False):
+            async with scheduler.slot(request_id, 0, background=background):
+                order.append(request_id)
+                await asyncio.sleep(0)
+
+        warm = asyncio.create_task(section("warm-pool", background=True))
+        await asyncio.sleep(0)
+        live = [asyncio.create_task(section(name)) for name in ("a", "b")]
+        await asyncio.sleep(0)
+        assert scheduler.get_stats()["background_waiting"] == 1
+        release.set()
+        await asyncio.gather(blocker, warm, *live)
+        return order, scheduler.active
+
+    assert asyncio.run(run()) == (["a", "b", "warm-pool"], 0)
+
+
+def test_background_uses_free_slots_right_away():
+    async def run():
+        scheduler = SectionScheduler(workers=2)
+        async with scheduler.slot("warm-pool", 0, background=True):
+            return scheduler.active
+
+    assert asyncio.run(run()) == 1
+
+
+def test_cancelled_waiters_are_skipped():
+    async def run():
+        scheduler = SectionScheduler(workers=1)
+        granted, release = [], asyncio.Event()
+        blocker = asyncio.create_task(hold(scheduler, "blocker", 0, granted, release))
+        await asyncio.sleep(0)
+        cancelled = asyncio.create_task(hold(scheduler, "gone", 0, granted, release, background=True))
+        waiting = asyncio.create_task(hold(scheduler, "warm-pool", 1, granted, release, background=True))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        release.set()
+        await asyncio.gather(blocker, waiting)
+        return granted, scheduler.active
+
+    assert asyncio.run(run()) == (["blocker", "warm-pool"], 0)
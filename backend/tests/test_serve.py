@@ -0,0 +1,36 @@
+import serve
+from services.agent_host_client import agent_bureau_port
+
+
+def test_bureau_port_defaults_off_the_api_port(monkeypatch):
+    monkeypatch.delenv("AGENT_BUREAU_PORT", raising=False)
+    assert agent_bureau_port(8000) == 8010
+    assert agent_bureau_port(9000) == 9010
+
+
+def test_bureau_port_never_equals_the_api_port(monkeypatch):
+    monkeypatch.setenv("AGENT_BUREAU_PORT", "8000")
+    assert agent_bureau_port(8000) == 8010
+    monkeypatch.setenv("AGENT_BUREAU_PORT", "8500")
+    assert agent_bureau_port(8000) == 8500
+
+
+def test_limits_are_split_between_processes(monkeypatch):
+    monkeypatch.setenv("OPENROUTER_RPM", "200")
+    monkeypatch.setenv("OPENROUTER_TPM", "0")
+    monkeypatch.setenv("OPENROUTER_MAX_IN_FLIGHT", "16")
+    monkeypatch.setenv("OPENAI_MAX_IN_FLIGHT", "3")
+    monkeypatch.setenv("OPENAI_TPM", "30000")
+    limits = serve.per_process_limits(5)
+    assert limits["OPENROUTER_RPM"] == "40"
+    assert limits["OPENROUTER_TPM"] == "0"  # Still off
+    assert limits["OPENROUTER_MAX_IN_FLIGHT"] == "3"
+    assert limits["OPENAI_MAX_IN_FLIGHT"] == "1"  # Never below one
+    assert limits["OPENAI_TPM"] == "6000"
+
+
+def test_one_process_keeps_the_configured_limits(monkeypatch):
+    monkeypatch.setenv("OPENAI_RPM", "500")
+    monkeypatch.setenv("OPENAI_MAX_IN_FLIGHT", "8")
+    limits = serve.per_process_limits(1)
+    assert (limits["OPENAI_RPM"], limits["OPENAI_MAX_IN_FLIGHT"]) == ("500", "8")
@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+from services.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_upstream_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def upstream():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "code"
+
+    async def run():
+        return await asyncio.gather(*(flight.do("key", upstream) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["code"] * 5
+    assert len(calls) == 1
+    assert flight.get_stats()["coalesced"] == 4
+
+
+def test_errors_reach_every_waiter():
+    flight = SingleFlight()
+
+    async def upstream():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream failed")
+
+    async def run():
+        return await asyncio.gather(*(flight.do("key", upstream) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in asyncio.run(run()))
+
+
+def test_cancelled_waiter_leaves_the_shared_call_running():
+    flight = SingleFlight()
+
+    async def upstream():
+        await asyncio.sleep(0.05)
+        return "code"
+
+    async def run():
+        leaving = asyncio.ensure_future(flight.do("key", upstream))
+        staying = asyncio.ensure_future(flight.do("key", upstream))
+        await asyncio.sleep(0.01)
+        leaving.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leaving
+        return await staying
+
+    assert asyncio.run(run()) == "code"
+    assert flight.get_stats()["upstream_cancelled"] == 0
+
+
+def test_upstream_is_cancelled_when_every_waiter_leaves():
+    flight = SingleFlight()
+    cancelled = []
+
+    async def upstream():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def run():
+        waiters = [asyncio.ensure_future(flight.do("key", upstream)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert cancelled == [True]
+    assert flight.get_stats() == {"calls": 2, "coalesced": 1, "upstream_cancelled": 1, "in_flight": 0}
+
+
+def test_late_stream_subscriber_gets_the_buffered_chunks():
+    flight = SingleFlight()
+
+    async def upstream():
+        for chunk in ("<section>", "Hero", "</section>"):
+            await asyncio.sleep(0.01)
+            yield chunk
+
+    async def collect(deltas):
+        return "".join([chunk async for chunk in deltas])
+
+    async def run():
+        _, first = flight.stream("key", upstream)
+        first_task = asyncio.ensure_future(collect(first))
+        await asyncio.sleep(0.025)
+        _, late = flight.stream("key", upstream)
+        return await first_task, await collect(late)
+
+    assert asyncio.run(run()) == ("<section>Hero</section>", "<section>Hero</section>")
+
+
+def test_subscriber_that_never_iterates_does_not_keep_the_upstream_alive():
+    flight = SingleFlight()
+    finished = []
+
+    async def upstream():
+        for chunk in ("<section>", "Hero", "</section>"):
+            await asyncio.sleep(0.01)
+            yield chunk
+        finished.append(True)
+
+    async def run():
+        _, abandoned = flight.stream("key", upstream)  # e.g. its caller was cancelled before iterating
+        _, reader = flight.stream("key", upstream)
+        first = await reader.__anext__()
+        await reader.aclose()
+        await asyncio.sleep(0.05)
+        return first
+
+    assert asyncio.run(run()) == "<section>"
+    assert finished == []
+    assert flight.get_stats()["upstream_cancelled"] == 1
+    assert flight.get_stats()["in_flight"] == 0
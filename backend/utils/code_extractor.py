@@ -0,0 +1,156 @@
+"""
+Code Extractor - Pull component code out of LLM responses
+All patterns are compiled once at import and start with a literal
+("```" or a newline) so the regex engine can skip ahead instead of trying
+every position. The code start (first fenced block or first
+`export function/const` line) is found without splitting the text into
+lines - the declaration scan stops at the first fence - and
+StreamingCodeExtractor does the same incrementally on streamed text so
+the code is known the moment the stream ends.
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+_FENCE = "```"
+_FENCE_OPEN = re.compile(r'```(?:tsx?|jsx?|typescript|javascript)?\n')
+# A function/const declaration at the start of the text / of a line
+_DECLARATION = re.compile(r'[^\S\n]*(?:export\s+)?(?:function|const)\s+\w+')
+_DECLARATION_LINE = re.compile(r'\n[^\S\n]*(?:export\s+)?(?:function|const)\s+\w+')
+
+# Lines that look like explanations rather than code (last resort filter)
+_PROSE_LINE = re.compile(
+    r'^(?:Apologies|Here|This|Note:|Please|You|We|I|The|As|For|In|On|At|To|From|With|Without'
+    r'|Using|When|Where|Why|How|What|Which|That|These|Those)[^\n]*(?:\n|$)',
+    re.MULTILINE | re.IGNORECASE
+)
+
+
+def _find_code_start(text: str) -> Optional[Tuple[str, int]]:
+    """
+    ("fence", index after the opening fence) or ("decl", index of the
+    declaration line), whichever comes first. None if neither appears.
+    """
+    fence = _FENCE_OPEN.search(text)
+    if _DECLARATION.match(text):
+        return "decl", 0
+    # Declarations only matter if they come before the fence
+    declaration = _DECLARATION_LINE.search(text, 0, fence.start() if fence else len(text))
+    if declaration:
+        return "decl", declaration.start() + 1
+    if fence:
+        return "fence", fence.end()
+    return None
+
+
+def extract_code(raw_response: str) -> str:
+    """
+    Return the component code from an LLM response
+
+    Takes the body of the first fenced block, or everything from the first
+    function/const declaration, whichever comes first. Responses with
+    neither only get explanation-looking lines removed.
+    """
+    found = _find_code_start(raw_response)
+    if found is None:
+        return _PROSE_LINE.sub('', raw_response).strip()
+
+    mode, start = found
+    if mode == "fence":
+        end = raw_response.find(_FENCE, start)
+        return raw_response[start:end if end != -1 else None].strip()
+    return raw_response[start:].strip()
+
+
+class StreamingCodeExtractor:
+    """
+    Incremental extract_code() for streamed responses
+
+    Usage:
+        extractor = StreamingCodeExtractor()
+        async for delta in stream:
+            code_delta = extractor.feed(delta)
+        code = extractor.result()
+
+    feed() returns the code text that became available with that delta
+    (empty until the code start has been seen). Only the last incomplete
+    line is rescanned, and deltas are kept as a list rather than
+    concatenated, so a feed costs O(len(delta)) however long the response.
+    """
+
+    def __init__(self):
+        self.mode: Optional[str] = None  # None until found, then "fence" or "decl"
+        self.code_start: Optional[int] = None  # Index in the response where the code begins
+        self.length = 0  # Characters fed so far
+        self._parts: List[str] = []  # Every delta, joined only when the full text is needed
+        self._line = ""  # Text still being scanned for the code start (from the last line start)
+        self._line_offset = 0  # Index of _line in the response
+        self._code: List[str] = []  # Code returned by feed() so far
+        self._pending = ""  # Fence mode: fed code not returned yet (possible closing backticks)
+        self._done = False
+
+    @property
+    def started(self) -> bool:
+        """True once a fence or declaration has been seen"""
+        return self.mode is not None
+
+    @property
+    def done(self) -> bool:
+        """True once a fenced block has been closed (later text is ignored)"""
+        return self._done
+
+    @property
+    def prose_chars(self) -> int:
+        """Characters streamed before the code started (all of them if it has not)"""
+        return self.code_start if self.code_start is not None else self.length
+
+    @property
+    def text(self) -> str:
+        """Full response so far"""
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+
+    def feed(self, delta: str) -> str:
+        """Add streamed text; return newly available code"""
+        if self._done or not delta:
+            return ""
+        self._parts.append(delta)
+        self.length += len(delta)
+
+        if self.mode is None:
+            self._line += delta
+            found = _find_code_start(self._line)
+            if found is None:
+                # Only the last (incomplete) line can still turn into a match
+                newline = self._line.rfind("\n")
+                if newline != -1:
+                    self._line_offset += newline + 1
+                    self._line = self._line[newline + 1:]
+                return ""
+            self.mode, start = found
+            self.code_start = self._line_offset + start
+            delta = self._line[start:]
+            self._line = ""
+
+        if self.mode == "decl":
+            self._code.append(delta)
+            return delta
+
+        pending = self._pending + delta
+        end = pending.find(_FENCE)
+        if end != -1:
+            self._done = True
+            code, self._pending = pending[:end], ""
+        else:
+            # Hold back up to two trailing backticks that may start the closing fence
+            split = len(pending.rstrip("`")) if pending.endswith("`") else len(pending)
+            code, self._pending = pending[:split], pending[split:]
+        self._code.append(code)
+        return code
+
+    def result(self) -> str:
+        """Final code, identical to extract_code() on the full text"""
+        if self.mode is None:
+            return extract_code(self.text)
+        return ("".join(self._code) + self._pending).strip()
@@ -0,0 +1,131 @@
+"""
+Section Delimiters - One completion for a whole page, split per section
+The single-call page mode asks the model for every section in one
+response, each introduced by a delimiter line:
+
+    <<<SECTION Hero>>>
+    export function HeroSection() { ... }
+    <<<SECTION Features>>>
+    ...
+    <<<END>>>
+
+SectionStreamSplitter cuts the streamed response at those lines, so each
+section is complete (and can be validated and sent) as soon as the next
+delimiter arrives.
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+SECTION_MARKER = "<<<SECTION {name}>>>"
+END_MARKER = "<<<END>>>"
+_DELIMITER = re.compile(r'<<<(?:SECTION\s+(?P<name>[\w -]+?)|(?P<end>END))\s*>>>')
+_MARKER_START = "<<<"
+
+
+def build_page_prompt(sections: List[Dict]) -> str:
+    """User prompt asking for every section in one response, in order, with delimiters"""
+    section_list = "\n\n".join(
+        f"{position}. {section['name']}\n{section['prompt']}"
+        for position, section in enumerate(sections, 1)
+    )
+    return f"""Create ALL of the following landing page sections in ONE response, in this order.
+Each section is its own component and follows every rule of the system prompt.
+
+{section_list}
+
+OUTPUT FORMAT (machine-parsed, follow exactly):
+- Put the line {SECTION_MARKER.format(name="Name")} on its own line before each section's code (Name exactly as listed above)
+- After the last section, put the line {END_MARKER}
+- No markdown fences, no explanations between sections
+
+Example:
+{SECTION_MARKER.format(name=sections[0]['name'] if sections else "Hero")}
+export function ...
+{END_MARKER}"""
+
+
+class SectionStreamSplitter:
+    """
+    Split a streamed whole-page response into sections at delimiter lines
+
+    feed() returns (kind, section, text) events:
+    - ("delta", name, text): more text of the section being streamed
+    - ("complete", name, text): the section's full text (the next delimiter arrived)
+
+    Text before the first delimiter and sections not in `names` are dropped.
+    Delimiter names match case-insensitively, ignoring spaces and dashes.
+    """
+
+    def __init__(self, names: List[str]):
+        self._names = {self._normalize(name): name for name in names}
+        self.current: Optional[str] = None  # Section being streamed
+        self.completed: List[str] = []
+        self.ended = False  # END delimiter seen
+        self._parts: List[str] = []  # Text of the current section
+        self._line = ""  # Unterminated line held back while it may be a delimiter
+
+    @staticmethod
+    def _normalize(name: str) -> str:
+        return re.sub(r'[\s_-]', '', name).lower()
+
+    def feed(self, delta: str) -> List[Tuple[str, str, str]]:
+        """Add streamed text; return the section events it produced"""
+        events: List[Tuple[str, str, str]] = []
+        if self.ended:
+            return events
+        text = self._line + delta
+        self._line = ""
+        while text:
+            newline = text.find("\n")
+            if newline == -1:
+                # Hold back a line that could still become a delimiter
+                if text.lstrip().startswith(_MARKER_START[:len(text.lstrip())]):
+                    self._line = text
+                else:
+                    self._append(text, events)
+                break
+            line, text = text[:newline + 1], text[newline + 1:]
+            if not self._delimiter(line, events):
+                self._append(line, events)
+            if self.ended:
+                break
+        return events
+
+    def close(self) -> List[Tuple[str, str, str]]:
+        """End of stream: complete the last section (even without an END delimiter)"""
+        events: List[Tuple[str, str, str]] = []
+        if self._line:
+            line, self._line = self._line, ""
+            if not self._delimiter(line, events):
+                self._append(line, events)
+        self._complete(events)
+        return events
+
+    def _delimiter(self, line: str, events: List[Tuple[str, str, str]]) -> bool:
+        """Handle a delimiter line; False if the line is section text"""
+        stripped = line.strip()
+        if not stripped.startswith(_MARKER_START):
+            return False
+        match = _DELIMITER.fullmatch(stripped)
+        if match is None:
+            return False
+        self._complete(events)
+        if match.group("end"):
+            self.ended = True
+        else:
+            name = self._names.get(self._normalize(match.group("name")))
+            self.current = name if name not in self.completed else None
+        return True
+
+    def _append(self, text: str, events: List[Tuple[str, str, str]]):
+        if self.current is not None:
+            self._parts.append(text)
+            events.append(("delta", self.current, text))
+
+    def _complete(self, events: List[Tuple[str, str, str]]):
+        if self.current is not None and self.current not in self.completed:
+            self.completed.append(self.current)
+            events.append(("complete", self.current, "".join(self._parts)))
+        self.current = None
+        self._parts = []
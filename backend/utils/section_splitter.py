@@ -3,8 +3,16 @@ Section Splitter - Generate multi-section landing pages
 Splits "landing page" requests into individual section prompts
 """
 
+import re
 from typing import List, Dict
 
+# extract_context() patterns, most specific first
+_CONTEXT_PATTERNS = [
+    re.compile(r'for\s+(?:a|an)\s+(.+?)(?:\s+with|\s+that|$)', re.IGNORECASE),  # "for a project management tool"
+    re.compile(r'(?:about|showcasing|promoting)\s+(.+?)(?:\s+with|\s+that|$)', re.IGNORECASE),
+    re.compile(r'landing page\s+(.+?)(?:\s+with|\s+that|$)', re.IGNORECASE),
+]
+
 def detect_landing_page_request(prompt: str) -> bool:
     """Detect if user wants a full landing page vs single section"""
     landing_keywords = [
@@ -155,17 +163,8 @@ def extract_context(prompt: str) -> str:
     Extract business/product context from prompt
     e.g., "Create a landing page for a project management tool" -> "a project management tool"
     """
-    import re
-    
-    # Common patterns
-    patterns = [
-        r'for\s+(?:a|an)\s+(.+?)(?:\s+with|\s+that|$)',  # "for a project management tool"
-        r'(?:about|showcasing|promoting)\s+(.+?)(?:\s+with|\s+that|$)',
-        r'landing page\s+(.+?)(?:\s+with|\s+that|$)',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, prompt, re.IGNORECASE)
+    for pattern in _CONTEXT_PATTERNS:
+        match = pattern.search(prompt)
         if match:
             context = match.group(1).strip()
             # Clean up
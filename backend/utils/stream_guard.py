@@ -0,0 +1,86 @@
+"""
+Stream Guard - Reject clearly invalid generations while they stream
+validate_component_code() only runs once a completion has finished, so a
+refusal or a page of prose costs a full completion before the retry
+starts. StreamGuard checks the streamed text as it arrives and names the
+first problem it finds:
+
+- "refusal": the response opens with an apology/refusal
+- "no_code": STREAM_GUARD_MAX_PROSE_TOKENS of text without any code start
+  (fence or function/const declaration, as found by StreamingCodeExtractor)
+- "next_import": an import from 'next/...' in vanilla output (React via CDN)
+
+The caller aborts the upstream request and moves on to the next attempt.
+"""
+
+import os
+import re
+from typing import Optional
+from dotenv import load_dotenv
+
+from .code_extractor import StreamingCodeExtractor
+
+load_dotenv()
+
+STREAM_GUARD_ENABLED = os.getenv("STREAM_GUARD_ENABLED", "true").lower() in ("1", "true", "yes")
+STREAM_GUARD_MAX_PROSE_TOKENS = int(os.getenv("STREAM_GUARD_MAX_PROSE_TOKENS", "300"))
+CHARS_PER_TOKEN = 4
+
+_REFUSAL = re.compile(
+    r"\s*(?:I'm sorry|I am sorry|Sorry,|I apologi[sz]e|Unfortunately,? I|I can't|I cannot|I can not"
+    r"|I'm unable|I am unable|I won't|I will not|As an AI)",
+    re.IGNORECASE
+)
+_REFUSAL_WINDOW = 160  # Characters of the opening checked for a refusal
+_NEXT_IMPORT = re.compile(r'''(?:\bfrom|\bimport|\brequire\()\s*['"]next/''')
+_TAIL = 40  # Characters kept between deltas so a split import still matches
+
+
+class StreamRejected(Exception):
+    """A streamed generation failed a StreamGuard check"""
+
+    def __init__(self, reason: str, streamed_chars: int):
+        super().__init__(f"stream rejected ({reason}) after {streamed_chars} chars")
+        self.reason = reason
+        self.streamed_chars = streamed_chars
+
+
+class StreamGuard:
+    """Incremental sanity checks on one streamed completion"""
+
+    def __init__(self, output_format: str = "vanilla", max_prose_tokens: int = STREAM_GUARD_MAX_PROSE_TOKENS):
+        self.extractor = StreamingCodeExtractor()
+        self.check_next_imports = output_format != "typescript"
+        self.max_prose_chars = max_prose_tokens * CHARS_PER_TOKEN
+        self._opening: Optional[str] = ""  # Start of the response, None once checked for a refusal
+        self._tail = ""
+
+    def check(self, delta: str) -> Optional[str]:
+        """Feed a streamed delta; return the reason to abort, or None"""
+        extractor = self.extractor
+        extractor.feed(delta)
+
+        if self._opening is not None:
+            self._opening += delta
+            if extractor.started or len(self._opening) >= _REFUSAL_WINDOW:
+                # "Sorry, here is the fixed version: ```jsx" is not a refusal
+                refused = not extractor.started and _REFUSAL.match(self._opening)
+                self._opening = None
+                if refused:
+                    return "refusal"
+
+        if not extractor.started and extractor.prose_chars > self.max_prose_chars:
+            return "no_code"
+
+        if self.check_next_imports:
+            window = self._tail + delta
+            if _NEXT_IMPORT.search(window):
+                return "next_import"
+            self._tail = window[-_TAIL:]
+        return None
+
+    def feed(self, delta: str):
+        """check(), raising StreamRejected on failure"""
+        reason = self.check(delta)
+        if reason is not None:
+            raise StreamRejected(reason, self.extractor.length)
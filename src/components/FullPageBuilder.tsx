@@ -218,9 +218,15 @@ export function FullPageBuilder({
                 
                 try {
                   const data = JSON.parse(message.slice(6)) // Remove 'data: ' prefix
-                  console.log('📨 Received event:', data.type, data)
+                  if (data.type !== 'section_delta') {
+                    console.log('📨 Received event:', data.type, data)
+                  }
               
-              if (data.type === 'init') {
+              if (data.type === 'section_delta') {
+                // Tokens are streaming in for this section - show live progress
+                setGenerationProgress(`Writing ${data.section}...`)
+                
+              } else if (data.type === 'init') {
                 // Initialize section statuses with actual section names
                 setTotalSections(data.total_sections)
                 const statuses = data.section_names.map((name: string) => ({